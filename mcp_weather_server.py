@@ -1,14 +1,52 @@
 #!/usr/bin/env python3
 """
 Weather MCP Server - точка входа для MCP клиента
+
+По умолчанию сервер работает через stdio (клиент запускает его подпроцессом).
+С ``--transport http`` сервер слушает streamable HTTP на ``server_host:server_port``
+из настроек, и к одному процессу с общими кешами могут подключаться многие агенты.
+С ``--workers N`` на одном порту работают N процессов с общими SQLite кешами.
 """
 import sys
 import os
+import argparse
 
 # Добавляем src в Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.weather_mcp.server import mcp
+from src.utils.config import settings
+from src.weather_mcp.server import mcp, create_http_app
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Weather MCP Server")
+    parser.add_argument("--transport", choices=["stdio", "http"], default=settings.mcp_transport,
+                        help="Транспорт MCP (по умолчанию из MCP_TRANSPORT)")
+    parser.add_argument("--host", default=settings.server_host, help="Хост для режима HTTP")
+    parser.add_argument("--port", type=int, default=settings.server_port, help="Порт для режима HTTP")
+    parser.add_argument("--path", default=settings.mcp_path, help="Путь MCP эндпоинта для режима HTTP")
+    parser.add_argument("--workers", type=int, default=settings.server_workers,
+                        help="Число процессов сервера для режима HTTP")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    if args.transport == "http":
+        import uvicorn
+
+        print(f"🚀 MCP сервер: http://{args.host}:{args.port}{args.path}", file=sys.stderr)
+        if args.workers > 1:
+            # Воркеры импортируют приложение заново и читают настройки из окружения
+            os.environ["SERVER_WORKERS"] = str(args.workers)
+            os.environ["MCP_PATH"] = args.path
+            uvicorn.run("weather_mcp.asgi:app", host=args.host, port=args.port,
+                        workers=args.workers, log_level="warning")
+        else:
+            uvicorn.run(create_http_app(args.path), host=args.host, port=args.port, log_level="warning")
+    else:
+        mcp.run()
+
 
 if __name__ == "__main__":
-    mcp.run()
\ No newline at end of file
+    main()
@@ -0,0 +1,132 @@
+import time
+from typing import Any, NamedTuple, Optional, Sequence
+
+from src.agent.router import CURRENT, FORECAST, Route, is_tool_failure, match
+from src.weather_mcp.cache.memory import CacheEntry, LRUCache
+
+# Ответы, которые не кешируются: ошибки, таймауты и данные, отданные из-за сбоя апстрима
+_UNCACHEABLE_PREFIXES = ("❌", "⏱️")
+_UNCACHEABLE_MARKERS = ("Данные устарели",)
+
+
+class AnswerKey(NamedTuple):
+    """Ключ ответа и момент, когда данные под ним обновятся (unix time)."""
+
+    value: str
+    expires_at: float
+
+
+def is_cacheable(text: str) -> bool:
+    """Можно ли делиться ответом: не ошибка и не данные, отданные из-за сбоя апстрима."""
+    return bool(text) and not text.startswith(_UNCACHEABLE_PREFIXES) and not any(
+        marker in text for marker in _UNCACHEABLE_MARKERS
+    )
+
+
+def is_cacheable_data(outputs: Sequence[str]) -> bool:
+    """Можно ли делиться ответом, основанным на этих ответах инструментов.
+
+    Нужны данные хотя бы одного инструмента, и ни один не должен сообщать об
+    ошибке или отдавать устаревшие данные.
+    """
+    return bool(outputs) and all(is_cacheable(text) and not is_tool_failure(text) for text in outputs)
+
+
+def normalize_place(city: str) -> str:
+    return " ".join(city.casefold().replace("ё", "е").split())
+
+
+class AnswerCache:
+    """Кеш готовых ответов агента, общий для всех потоков.
+
+    Ключ — намерение запроса, распознанное ``router.match`` (вид запроса,
+    место, срок или даты), и окно свежести данных под ним: текущая погода
+    обновляется раз в ``current_interval`` секунд, прогнозы — с каждым
+    обновлением моделей (``forecast_interval``), история — раз в
+    ``history_interval``. Ответ живёт до конца своего окна, поэтому
+    "погода в Москве" и "Погода в москве сейчас?" из разных сессий получают
+    один ответ, пока данные не обновились. Запросы, которые роутер не
+    распознаёт, не кешируются: их смысл может зависеть от контекста беседы.
+    Сохранять стоит только ответы, данные под которыми прошли
+    ``is_cacheable_data``.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        current_interval: float = 900,
+        forecast_interval: float = 3600,
+        history_interval: float = 24 * 3600
+    ):
+        self.memory = LRUCache(max_entries)
+        self.current_interval = current_interval
+        self.forecast_interval = forecast_interval
+        self.history_interval = history_interval
+
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> Optional["AnswerCache"]:
+        """Создать кеш по настройкам агента или None, если кеш выключен."""
+        if not getattr(settings, 'answer_cache_enabled', False):
+            return None
+        return cls(
+            max_entries=settings.answer_cache_entries,
+            current_interval=settings.answer_cache_current_interval,
+            forecast_interval=settings.forecast_update_interval
+        )
+
+    def _interval(self, route: Route) -> float:
+        if route.intent == CURRENT:
+            return self.current_interval
+        if route.intent == FORECAST:
+            return self.forecast_interval
+        return self.history_interval
+
+    def key(self, text: str, now: Optional[float] = None) -> Optional[AnswerKey]:
+        """Ключ ответа на запрос или None, если запрос не кешируется."""
+        route = match(text)
+        if route is None:
+            return None
+        now = time.time() if now is None else now
+        interval = self._interval(route)
+        window = int(now // interval)
+        parts = [route.intent, normalize_place(route.city), route.days, route.start_date, route.end_date, window]
+        if route.intent == FORECAST:
+            # "завтра" меняет смысл в полночь, даже если окно данных то же
+            parts.append(time.strftime("%Y-%m-%d", time.localtime(now)))
+        return AnswerKey("|".join(map(str, parts)), (window + 1) * interval)
+
+    def get(self, key: AnswerKey) -> Optional[str]:
+        entry = self.memory.get(key.value)
+        if entry is not None and entry.is_fresh():
+            self.hits += 1
+            return entry.value
+        if entry is not None:
+            self.memory.pop(key.value)
+        self.misses += 1
+        return None
+
+    def set(self, key: AnswerKey, answer: str) -> bool:
+        """Сохранить ответ до конца окна свежести. Ошибки и устаревшие данные не сохраняются."""
+        if not is_cacheable(answer):
+            return False
+        self.memory.set(key.value, CacheEntry(answer, time.time(), key.expires_at))
+        return True
+
+    def invalidate(self, text: str) -> bool:
+        """Удалить ответ на запрос из кеша. Возвращает True, если он там был."""
+        key = self.key(text)
+        return key is not None and self.memory.pop(key.value) is not None
+
+    def clear(self) -> None:
+        self.memory.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self.memory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.memory.evictions
+        }
@@ -0,0 +1,65 @@
+from typing import Any
+
+from langchain_core.tools import BaseTool, StructuredTool, ToolException
+from langchain_mcp_adapters.tools import _convert_call_tool_result
+from mcp import types
+
+from src.agent.mcp_tools import remaining_budget
+
+# Режимы подключения агента к инструментам погоды
+MCP = "mcp"
+IN_PROCESS = "inprocess"
+
+
+class InProcessTools:
+    """Инструменты MCP сервера, вызываемые в процессе агента без транспорта MCP.
+
+    Когда агент и сервер развёрнуты вместе, stdio лишь добавляет
+    сериализацию и межпроцессный обмен, а кеши сервера живут в другом
+    процессе. Здесь функции инструментов из ``weather_mcp/server.py``
+    оборачиваются в инструменты LangChain с теми же именами, описаниями и
+    схемами аргументов, что отдаёт сервер по MCP, и с тем же форматом
+    ответа; дедлайн вызова соблюдается так же, как ``DeadlineMiddleware``.
+
+    Интерфейс совпадает с ``SessionPool``: ``start``, ``list_tools``, ``close``.
+    """
+
+    def __init__(self):
+        # Сервер импортируется лишь в этом режиме: в режиме MCP он живёт в другом процессе
+        from src.weather_mcp import server
+        # Модули сервера импортируют дедлайн как weather_mcp.deadline
+        from weather_mcp import deadline
+
+        self.server = server
+        self.deadline = deadline
+
+    async def start(self) -> None:
+        """Запустить общие сервисы сервера (пулы соединений, кеши, прогрев)."""
+        await self.server.services.start()
+
+    async def close(self) -> None:
+        await self.server.services.stop()
+
+    async def list_tools(self) -> list[BaseTool]:
+        tools = await self.server.mcp.get_tools()
+        return [self._bind(tool) for tool in tools.values() if tool.enabled]
+
+    def _bind(self, tool: Any) -> BaseTool:
+        deadline = self.deadline
+
+        async def invoke(**arguments: Any) -> Any:
+            budget = deadline.tool_budget(remaining_budget())
+            try:
+                result = await deadline.run_with_deadline(budget, lambda: tool.run(arguments))
+            except Exception as e:
+                raise ToolException(f"Ошибка вызова инструмента {tool.name}: {e}")
+            return _convert_call_tool_result(types.CallToolResult(content=result.content))
+
+        return StructuredTool(
+            name=tool.name,
+            description=tool.description or "",
+            args_schema=tool.parameters,
+            coroutine=invoke,
+            response_format="content_and_artifact",
+            metadata=tool.annotations.model_dump() if tool.annotations else None
+        )
@@ -0,0 +1,222 @@
+import asyncio
+import itertools
+import logging
+from typing import Any, Optional
+
+from langchain_core.tools import BaseTool, StructuredTool
+from langchain_mcp_adapters.sessions import Connection, create_session
+from langchain_mcp_adapters.tools import _convert_call_tool_result, load_mcp_tools
+from mcp import ClientSession
+from mcp import types
+from mcp.shared.exceptions import McpError
+
+from src.agent.mcp_tools import call_tool, remaining_budget
+from src.utils.config import settings
+
+
+def slot_connections(connection: Connection, size: int) -> list[Connection]:
+    """Подключения для ``size`` сессий пула.
+
+    Каждая сессия stdio — отдельный процесс сервера со своим планировщиком
+    Nominatim и своим прогревом кеша. Чтобы пул не умножал лимит Nominatim,
+    процессы делят ``nominatim_rate_limit`` поровну (как воркеры HTTP
+    сервера, см. ``server_workers``), а прогрев работает только в первом.
+    """
+    if connection.get("transport") != "stdio" or size <= 1:
+        return [connection] * size
+
+    connections = []
+    for index in range(size):
+        env = dict(connection.get("env") or {})
+        env["NOMINATIM_RATE_LIMIT"] = str(settings.nominatim_rate_limit / size)
+        if index > 0:
+            env["WARMER_ENABLED"] = "false"
+        connections.append({**connection, "env": env})
+    return connections
+
+
+class _Slot:
+    """Одна долгоживущая сессия MCP (для stdio — свой процесс сервера).
+
+    Сессия открывается и закрывается в собственной задаче: транспорты MCP
+    построены на группах задач anyio, которые нельзя покидать из другой
+    задачи. Задача раз в ``ping_interval`` секунд проверяет сервер пингом и
+    пересоздаёт сессию, если он не ответил, процесс упал или вызов
+    обнаружил обрыв соединения.
+    """
+
+    def __init__(self, pool: "SessionPool", connection: Connection):
+        self.pool = pool
+        self.connection = connection
+        self.session: Optional[ClientSession] = None
+        self.ready = asyncio.Event()
+        self._restart = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def restart(self) -> None:
+        self._restart.set()
+
+    async def _run(self) -> None:
+        pool = self.pool
+        while True:
+            try:
+                async with create_session(self.connection) as session:
+                    await asyncio.wait_for(session.initialize(), pool.connect_timeout)
+                    pool.spawned += 1
+                    self._restart.clear()
+                    self.session = session
+                    self.ready.set()
+                    await self._watch(session)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"Сессия MCP оборвалась: {e}")
+            finally:
+                self.session = None
+                self.ready.clear()
+            pool.restarts += 1
+            await asyncio.sleep(pool.respawn_delay)
+
+    async def _watch(self, session: ClientSession) -> None:
+        """Ждать запроса на перезапуск, проверяя сервер пингом."""
+        pool = self.pool
+        while True:
+            try:
+                await asyncio.wait_for(self._restart.wait(), pool.ping_interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await asyncio.wait_for(session.send_ping(), pool.ping_timeout)
+            except Exception as e:
+                pool.ping_failures += 1
+                logging.warning(f"MCP сервер не ответил на пинг: {e}")
+                return
+
+
+class SessionPool:
+    """Пул долгоживущих сессий MCP сервера для агента.
+
+    Вместо новой сессии (а для stdio — нового процесса сервера) на каждый
+    вызов инструмента агент держит ``size`` готовых сессий на всё время
+    работы, и вызов стоит одного обмена JSON-RPC. Вызовы распределяются по
+    сессиям по кругу; одна сессия обслуживает несколько вызовов
+    одновременно, поэтому ``size`` больше 1 нужен лишь, чтобы нагрузка
+    делилась между процессами stdio сервера. Лимит Nominatim процессы
+    делят между собой (см. ``slot_connections``).
+
+    Упавшая или не ответившая на пинг сессия пересоздаётся в фоне, пока
+    вызовы идут через остальные.
+    """
+
+    def __init__(
+        self,
+        connection: Connection,
+        size: int = 1,
+        ping_interval: float = 30.0,
+        ping_timeout: float = 5.0,
+        connect_timeout: float = 30.0,
+        respawn_delay: float = 1.0
+    ):
+        self.connection = connection
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.connect_timeout = connect_timeout
+        self.respawn_delay = respawn_delay
+        self._slots = [_Slot(self, slot) for slot in slot_connections(connection, max(1, size))]
+        self._order = itertools.cycle(self._slots)
+
+        self.spawned = 0
+        self.restarts = 0
+        self.ping_failures = 0
+
+    async def start(self) -> None:
+        """Открыть все сессии и дождаться, пока они будут готовы.
+
+        Raises:
+            TimeoutError: Сервер не ответил за ``connect_timeout`` секунд.
+        """
+        for slot in self._slots:
+            slot.start()
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(slot.ready.wait() for slot in self._slots)),
+                self.connect_timeout
+            )
+        except asyncio.TimeoutError:
+            await self.close()
+            raise TimeoutError("MCP сервер не ответил при подключении")
+
+    async def close(self) -> None:
+        await asyncio.gather(*(slot.stop() for slot in self._slots))
+
+    async def _ready_slot(self) -> _Slot:
+        for _ in range(len(self._slots)):
+            slot = next(self._order)
+            if slot.session is not None:
+                return slot
+
+        budget = remaining_budget()
+        waiters = [asyncio.ensure_future(slot.ready.wait()) for slot in self._slots]
+        try:
+            await asyncio.wait(
+                waiters,
+                timeout=self.connect_timeout if budget is None else min(budget, self.connect_timeout),
+                return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+        for slot in self._slots:
+            if slot.session is not None:
+                return slot
+        raise ConnectionError("MCP сервер недоступен")
+
+    async def list_tools(self) -> list[BaseTool]:
+        """Инструменты сервера, вызываемые через сессии пула."""
+        slot = await self._ready_slot()
+        return [bind_to_pool(tool, self) for tool in await load_mcp_tools(slot.session)]
+
+    async def call_tool(self, name: str, arguments: dict[str, Any]) -> types.CallToolResult:
+        """Вызвать инструмент через готовую сессию.
+
+        Обрыв соединения перезапускает сессию; таймаут ответа — нет: сервер
+        жив, просто не успел.
+        """
+        slot = await self._ready_slot()
+        try:
+            return await call_tool(slot.session, name, arguments)
+        except McpError as e:
+            if e.error.code == types.CONNECTION_CLOSED:
+                slot.restart()
+            raise
+        except Exception:
+            slot.restart()
+            raise
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": len(self._slots),
+            "ready": sum(1 for slot in self._slots if slot.session is not None),
+            "spawned": self.spawned,
+            "restarts": self.restarts,
+            "ping_failures": self.ping_failures
+        }
+
+
+def bind_to_pool(tool: StructuredTool, pool: SessionPool) -> BaseTool:
+    """Инструмент адаптера MCP, вызываемый через сессии пула."""
+
+    async def invoke(**arguments: Any) -> Any:
+        return _convert_call_tool_result(await pool.call_tool(tool.name, arguments))
+
+    return tool.model_copy(update={"coroutine": invoke})
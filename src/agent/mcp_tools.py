@@ -0,0 +1,61 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from typing import Any, Iterator, Optional
+
+from mcp import ClientSession
+from mcp import types
+
+# Момент (time.monotonic), к которому агент должен ответить на текущее сообщение
+_turn_deadline: ContextVar[Optional[float]] = ContextVar("turn_deadline", default=None)
+
+# Сколько клиент ждёт сверх бюджета, чтобы получить от сервера сообщение о таймауте
+RESPONSE_GRACE = 1.0
+
+
+@contextmanager
+def turn_scope(seconds: Optional[float]) -> Iterator[None]:
+    """Ограничить время ответа агента или вызова инструмента; внешний дедлайн не продлевается.
+
+    Вызовы инструментов внутри получают остаток времени.
+    """
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    current = _turn_deadline.get()
+    token = _turn_deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _turn_deadline.reset(token)
+
+
+def remaining_budget() -> Optional[float]:
+    """Сколько секунд осталось на ответ агента или None, если время не ограничено."""
+    deadline = _turn_deadline.get()
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+async def call_tool(session: ClientSession, name: str, arguments: dict[str, Any]) -> types.CallToolResult:
+    """Вызвать инструмент MCP, передав серверу остаток времени в ``_meta.timeout``.
+
+    ``ClientSession.call_tool`` не умеет передавать ``_meta``, поэтому запрос
+    собирается вручную. Сервер (``DeadlineMiddleware``) урезает по этому
+    остатку таймауты запросов к апстримам и отменяет вызов, когда время
+    выходит; клиент ждёт ответ лишь немного дольше.
+    """
+    budget = remaining_budget()
+    meta = None if budget is None else types.RequestParams.Meta(timeout=round(budget, 3))
+    return await session.send_request(
+        types.ClientRequest(
+            types.CallToolRequest(
+                method="tools/call",
+                params=types.CallToolRequestParams(name=name, arguments=arguments, _meta=meta)
+            )
+        ),
+        types.CallToolResult,
+        request_read_timeout_seconds=None if budget is None else timedelta(seconds=budget + RESPONSE_GRACE)
+    )
+
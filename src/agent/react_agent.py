@@ -6,12 +6,10 @@ from pathlib import Path
 from typing import Optional, Any
 
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
 from langgraph.prebuilt import create_react_agent
 from langgraph.checkpoint.memory import InMemorySaver
 
-from langchain_mcp_adapters.client import MultiServerMCPClient
-
 if sys.platform == "win32":
     try:
         sys.stdout.reconfigure(encoding='utf-8')
@@ -30,21 +28,42 @@ except ImportError:
 
     settings = Settings()
 
+from src.agent.answer_cache import AnswerCache, is_cacheable_data
+from src.agent.local_tools import IN_PROCESS, MCP, InProcessTools
+from src.agent.mcp_pool import SessionPool
+from src.agent.mcp_tools import turn_scope
+from src.agent.router import FastAnswer, FastPathRouter
+from src.agent.tool_node import create_tool_node
+
 
 class ModernLangChainReActAgent:
     """
-    Современный ReAct агент с MultiServerMCPClient
+    Современный ReAct агент с пулом долгоживущих сессий MCP
+
+    В режиме ``tool_mode="inprocess"`` инструменты сервера вызываются прямо
+    в процессе агента, без MCP; набор инструментов тот же.
+
+    Простые запросы ("погода в Москве на завтра") перед агентом пробует
+    ``router`` — любой объект с методом ``answer(text)``, возвращающим
+    ``FastAnswer``, строку или None, по умолчанию ``FastPathRouter``; None
+    отключает быстрый путь. Строка считается и ответом, и данными под ним.
+
+    Ответы на такие запросы хранятся в ``answer_cache``, общем для всех
+    потоков, до обновления данных под ними.
     """
 
     def __init__(self, api_key: Optional[str] = None, max_iterations: int = 20,
-                 server_path: str = "weather_mcp/server.py"):
+                 server_path: str = "weather_mcp/server.py", tool_mode: Optional[str] = None):
         # Инициализируем атрибуты
         self.server_path = server_path
+        self.tool_mode = tool_mode or getattr(settings, 'agent_tool_mode', MCP)
         self.max_iterations = max_iterations
         self.agent = None
         self.tools: list = []
+        self.router: Optional[FastPathRouter] = None
+        self.answer_cache: Optional[AnswerCache] = AnswerCache.from_settings(settings)
         self.initialized = False
-        self.mcp_client: Optional[MultiServerMCPClient] = None
+        self.tool_source: Optional[SessionPool | InProcessTools] = None
 
         self.memory = InMemorySaver()
 
@@ -90,33 +109,63 @@ class ModernLangChainReActAgent:
         print(f"⚠️ MCP сервер не найден, используем: {server_path}")
         return Path(server_path).resolve()
 
+    def _server_connection(self) -> dict[str, Any]:
+        """Параметры подключения к MCP серверу.
+
+        Если задан ``mcp_server_url``, агент подключается к общему серверу
+        по streamable HTTP; иначе запускает собственный подпроцесс через stdio.
+        """
+        server_url = getattr(settings, 'mcp_server_url', None)
+        if server_url:
+            print(f"🚀 Подключение к MCP серверу по HTTP: {server_url}")
+            return {"url": server_url, "transport": "streamable_http"}
+
+        server_path_abs = self._resolve_server_path(self.server_path)
+        print(f"🚀 Подключение к MCP серверу через stdio: {server_path_abs}")
+        return {
+            "command": sys.executable,
+            "args": [str(server_path_abs)],
+            "transport": "stdio"
+        }
+
     async def initialize_mcp(self) -> bool:
-        """Современная инициализация MCP с MultiServerMCPClient"""
+        """Инициализация MCP: открыть пул сессий и загрузить инструменты
+
+        Сессии (для stdio — процессы сервера) живут всё время работы агента,
+        поэтому вызов инструмента не запускает сервер заново. В режиме
+        ``inprocess`` вместо пула запускаются сервисы сервера в этом процессе.
+        """
         if self.initialized:
             print("ℹ️ MCP уже инициализирован, пропускаем")
             return True
 
         try:
-            server_path_abs = self._resolve_server_path(self.server_path)
-            print(f"🚀 Подключение к MCP серверу через MultiServerMCPClient: {server_path_abs}")
-
-            self.mcp_client = MultiServerMCPClient({
-                "weather": {
-                    "command": sys.executable,
-                    "args": [str(server_path_abs)],
-                    "transport": "stdio"
-                }
-            })
+            if self.tool_mode == IN_PROCESS:
+                print("🚀 Инструменты погоды подключены в процессе агента, без MCP")
+                self.tool_source = InProcessTools()
+            else:
+                self.tool_source = SessionPool(
+                    self._server_connection(),
+                    size=getattr(settings, 'mcp_pool_size', 1),
+                    ping_interval=getattr(settings, 'mcp_ping_interval', 30.0)
+                )
+            await self.tool_source.start()
 
             print("🔧 Загрузка MCP инструментов...")
 
-            self.tools = await self.mcp_client.get_tools()
+            self.tools = await self.tool_source.list_tools()
             print(f"✅ Загружено {len(self.tools)} MCP инструментов: {[t.name for t in self.tools]}")
 
             print("🤖 Создание ReAct агента...")
             self.agent = create_react_agent(
                 model=self.model,
-                tools=self.tools,
+                tools=create_tool_node(
+                    self.tools,
+                    max_concurrency=getattr(settings, 'agent_max_concurrent_tools', 8),
+                    call_timeout=getattr(settings, 'agent_tool_call_timeout', 30.0)
+                ),
+                # v1: все вызовы инструментов одного хода выполняет один узел параллельно
+                version="v1",
                 checkpointer=self.memory,
                 state_modifier=(
                     "Ты умный ассистент для работы с погодными данными. "
@@ -128,21 +177,32 @@ class ModernLangChainReActAgent:
                     "3. get_city_current_weather(city) - текущая погода по названию города\n\n"
                     "📈 ПРОГНОЗ ПОГОДЫ:\n"
                     "4. get_weather(lat, lon, count_days) - прогноз по координатам (1-16 дней)\n"
-                    "5. get_city_weather(city, count_days) - прогноз по названию города (1-16 дней)\n\n"
+                    "5. get_city_weather(city, count_days) - прогноз по названию города (1-16 дней)\n"
+                    "6. get_weather_batch(points, count_days) - прогноз сразу для списка координат\n\n"
                     "📊 ИСТОРИЧЕСКИЕ ДАННЫЕ:\n"
-                    "6. get_historical_weather(lat, lon, start_date, end_date) - история по координатам\n"
-                    "7. get_city_historical_weather(city, start_date, end_date) - история по названию города\n\n"
+                    "7. get_historical_weather(lat, lon, start_date, end_date) - история по координатам\n"
+                    "8. get_city_historical_weather(city, start_date, end_date) - история по названию города\n"
+                    "9. get_weather_statistics(lat, lon, start_date, end_date, group_by) - статистика за период\n"
+                    "10. get_city_weather_statistics(city, start_date, end_date, group_by) - статистика по городу\n\n"
                     "🎯 ЛОГИКА ВЫБОРА ИНСТРУМЕНТОВ:\n"
                     "- Только координаты → get_coord\n"
                     "- Текущая погода → get_current_weather или get_city_current_weather\n"
                     "- Прогноз на дни → get_weather или get_city_weather\n"
+                    "- Сравнение нескольких мест → get_weather_batch одним вызовом\n"
                     "- История → get_historical_weather или get_city_historical_weather\n"
+                    "- Средние, экстремумы, суммы осадков за период → get_weather_statistics или get_city_weather_statistics\n"
                     "- Даты в формате YYYY-MM-DD (пример: 2024-01-15)\n\n"
                     "ВАЖНО: Всегда отвечай на русском языке! "
                     "Будь дружелюбным и подробно объясняй информацию о погоде."
                 )
             )
 
+            if getattr(settings, 'agent_fast_path', False):
+                self.router = FastPathRouter(
+                    self.tools,
+                    model=self.model if getattr(settings, 'agent_fast_path_llm', False) else None
+                )
+
             self.initialized = True
             print("🎉 ReAct агент готов к работе!")
             return True
@@ -152,8 +212,16 @@ class ModernLangChainReActAgent:
             await self.cleanup_mcp()
             return False
 
-    async def chat(self, user_input: str, thread_id: Optional[str] = None) -> str:
-        """Отправка сообщения агенту"""
+    async def chat(self, user_input: str, thread_id: Optional[str] = None, use_cache: bool = True) -> str:
+        """Отправка сообщения агенту
+
+        Ответ ограничен ``agent_turn_timeout`` секундами: остаток времени
+        передаётся каждому вызову инструмента, а по истечении вся работа
+        над ответом отменяется.
+
+        С ``use_cache=False`` ответ не берётся из кеша ответов и не
+        сохраняется в него.
+        """
         if not self.initialized:
             print("🔄 Инициализация MCP...")
             success = await self.initialize_mcp()
@@ -171,24 +239,91 @@ class ModernLangChainReActAgent:
 
             print(f"💭 Обработка: {user_input[:50]}{'...' if len(user_input) > 50 else ''}")
 
-            response = await self.agent.ainvoke(
-                {"messages": [HumanMessage(content=user_input)]},
-                config=config
-            )
-
-            if response and "messages" in response:
-                last_message = response["messages"][-1]
-                if isinstance(last_message, AIMessage):
-                    return last_message.content
-                elif hasattr(last_message, 'content'):
-                    return str(last_message.content)
+            cache_key = self.answer_cache.key(user_input) if use_cache and self.answer_cache else None
+            if cache_key is not None:
+                cached = self.answer_cache.get(cache_key)
+                if cached is not None:
+                    print("💾 Ответ из кеша")
+                    await self._remember(config, user_input, cached)
+                    return cached
 
-            return "❌ Не удалось получить ответ от агента"
+            turn_timeout = getattr(settings, 'agent_turn_timeout', None)
+            try:
+                with turn_scope(turn_timeout):
+                    async with asyncio.timeout(turn_timeout):
+                        fast = await self._fast_path(user_input, config)
+                        if fast is None:
+                            answer, tool_outputs = await self._run_agent(user_input, config)
+                        else:
+                            answer, tool_outputs = fast.text, [fast.data]
+            except TimeoutError:
+                return f"⏱️ Не удалось ответить за {turn_timeout:g} с. Попробуйте упростить запрос или повторить позже."
+
+            # Решение о кешировании — по данным инструментов, а не по тексту:
+            # извинение модели после ошибки инструмента или пересказ устаревших
+            # данных без пометки по тексту не отличить от нормального ответа
+            if cache_key is not None and is_cacheable_data(tool_outputs):
+                self.answer_cache.set(cache_key, answer)
+            return answer
 
         except Exception as e:
             print(f"🐛 DEBUG: Ошибка в chat: {e}")
             return f"❌ Произошла ошибка: {str(e)}"
 
+    async def _fast_path(self, user_input: str, config: dict[str, Any]) -> Optional[FastAnswer]:
+        """Ответ роутера без цикла ReAct или None, если запрос нужно передать агенту
+
+        Вопрос и ответ записываются в память потока, чтобы агент видел их в
+        следующих сообщениях ("а послезавтра?").
+        """
+        if self.router is None:
+            return None
+        answer = await self.router.answer(user_input)
+        if isinstance(answer, str):
+            answer = FastAnswer(answer, answer)
+        if answer is not None:
+            print("⚡ Ответ по быстрому пути")
+            await self._remember(config, user_input, answer.text)
+        return answer
+
+    async def _run_agent(self, user_input: str, config: dict[str, Any]) -> tuple[str, list[str]]:
+        """Ответ полного цикла ReAct и ответы инструментов, вызванных за этот ход
+
+        Вызов, завершившийся ошибкой, попадает в список как сообщение об ошибке.
+        """
+        response = await self.agent.ainvoke(
+            {"messages": [HumanMessage(content=user_input)]},
+            config=config
+        )
+
+        if response and "messages" in response:
+            messages = response["messages"]
+            turn_start = max(
+                (i for i, message in enumerate(messages) if isinstance(message, HumanMessage)),
+                default=0
+            )
+            tool_outputs = [
+                "❌" if message.status == "error" else str(message.content)
+                for message in messages[turn_start:]
+                if isinstance(message, ToolMessage)
+            ]
+
+            last_message = messages[-1]
+            if isinstance(last_message, AIMessage):
+                return last_message.content, tool_outputs
+            elif hasattr(last_message, 'content'):
+                return str(last_message.content), tool_outputs
+
+        return "❌ Не удалось получить ответ от агента", []
+
+    async def _remember(self, config: dict[str, Any], user_input: str, answer: str) -> None:
+        """Записать вопрос и готовый ответ в память потока, минуя агента"""
+        await self.agent.aupdate_state(
+            config,
+            {"messages": [HumanMessage(content=user_input), AIMessage(content=answer)]},
+            as_node="agent"
+        )
+
     async def get_conversation_history(self, thread_id: str) -> list[dict[str, Any]]:
         """Получение истории разговора"""
         try:
@@ -242,16 +377,17 @@ class ModernLangChainReActAgent:
     async def cleanup_mcp(self):
         """Правильная очистка MCP ресурсов"""
         try:
-            if hasattr(self, 'mcp_client') and self.mcp_client:
-                if hasattr(self.mcp_client, 'close'):
-                    await self.mcp_client.close()
-                self.mcp_client = None
-                print("🧹 MCP клиент очищен")
+            if getattr(self, 'tool_source', None):
+                await self.tool_source.close()
+                self.tool_source = None
+                print("🧹 Сессии MCP закрыты")
 
             if hasattr(self, 'initialized'):
                 self.initialized = False
             if hasattr(self, 'tools'):
                 self.tools = []
+            if hasattr(self, 'router'):
+                self.router = None
             if hasattr(self, 'agent'):
                 self.agent = None
 
@@ -259,7 +395,7 @@ class ModernLangChainReActAgent:
 
         except Exception as e:
             print(f"🐛 Ошибка при очистке MCP: {e}")
-            self.mcp_client = None
+            self.tool_source = None
             self.initialized = False
 
     def __del__(self):
@@ -285,13 +421,18 @@ async def create_modern_weather_agent(
         api_key: Optional[str] = None,
         with_mcp: bool = True,
         server_path: str = "weather_mcp/server.py",
-        max_iterations: int = 20
+        max_iterations: int = 20,
+        tool_mode: Optional[str] = None
 ) -> ModernLangChainReActAgent:
-    """Фабричная функция для создания современного агента"""
+    """Фабричная функция для создания современного агента
+
+    ``tool_mode``: ``"mcp"`` или ``"inprocess"``; по умолчанию ``settings.agent_tool_mode``.
+    """
     agent = ModernLangChainReActAgent(
         api_key=api_key,
         max_iterations=max_iterations,
-        server_path=server_path
+        server_path=server_path,
+        tool_mode=tool_mode
     )
 
     if with_mcp:
@@ -0,0 +1,257 @@
+import re
+import json
+import logging
+from typing import Any, NamedTuple, Optional, Sequence
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.tools import BaseTool
+
+# Намерения, которые роутер обслуживает без агента
+CURRENT = "current"
+FORECAST = "forecast"
+HISTORY = "history"
+
+# Прогноз без указанного срока ("прогноз погоды в Казани")
+DEFAULT_FORECAST_DAYS = 3
+
+_DATE = r"\d{4}-\d{2}-\d{2}"
+_RANGE = re.compile(
+    rf"(?:\b(?:с|from|between)\s+)?(?P<start>{_DATE})\s*(?:по|до|to|until|and|—|–|-|\.\.)\s*(?P<end>{_DATE})",
+    re.IGNORECASE
+)
+_DAY = re.compile(rf"(?:\b(?:за|on|for)\s+)?(?P<day>{_DATE})", re.IGNORECASE)
+_DAYS = re.compile(
+    r"\bна\s+(?P<ru>\d{1,2})\s+(?:день|дня|дней)\b|\b(?:for\s+|next\s+)?(?P<en>\d{1,2})[\s-]days?\b",
+    re.IGNORECASE
+)
+_PERIODS = [
+    (re.compile(r"\b(?:на\s+)?послезавтра\b", re.IGNORECASE), 3),
+    (re.compile(r"\b(?:на\s+)?завтра\b|\btomorrow\b", re.IGNORECASE), 2),
+    (re.compile(r"\b(?:на\s+)?сегодня\b|\btoday\b", re.IGNORECASE), 1),
+    (re.compile(r"\bна\s+неделю\b|\b(?:this|next|for\s+(?:a|the))\s+week\b", re.IGNORECASE), 7)
+]
+_NOW = re.compile(r"\b(?:сейчас|right\s+now|now|currently)\b", re.IGNORECASE)
+_QUERY = re.compile(
+    r"^(?:(?:покажи|подскажи|скажи|show(?:\s+me)?|tell\s+me)\s+)?"
+    r"(?:(?:какая|какой|what(?:'s|\s+is)(?:\s+the)?)\s+)?"
+    r"(?:(?:текущая|текущую|current)\s+)?"
+    r"(?P<kind>погода|погоду|прогноз(?:\s+погоды)?|температура|температуру|weather(?:\s+forecast)?|forecast|temperature)\s+"
+    r"(?:в|во|in|for|at)\s+"
+    r"(?P<city>[^\W\d_](?:[^\W\d_]|[\- ])*)$",
+    re.IGNORECASE
+)
+# Несколько городов ("в Москве и Казани") — задача для агента
+_SEVERAL = re.compile(r"\s(?:и|или|and|or|vs)\s", re.IGNORECASE)
+# Слова, которые не бывают частью названия города: уточнения времени, которых
+# роутер не понимает ("вчера", "утром", "на выходные"), — такие запросы для агента
+_NOT_CITY = frozenset({
+    "вчера", "позавчера", "утром", "днём", "днем", "вечером", "ночью", "выходные", "выходных",
+    "неделю", "неделе", "месяц", "месяце", "через", "на", "по", "за", "до", "после", "прошлой",
+    "следующей", "будет", "была", "был",
+    "yesterday", "morning", "afternoon", "evening", "night", "tonight", "weekend", "week",
+    "month", "next", "last", "this", "ago", "on", "at", "in", "for", "the", "was", "will"
+})
+_MAX_CITY_WORDS = 3
+# Окончания предложного падежа и соответствующие им окончания именительного:
+# "в Москве" → "Москва", "в Казани" → "Казань". Неоднозначные окончания
+# ("в Туле" — Тула, "в Ярославле" — Ярославль) сюда не входят
+_LOCATIVE_ENDINGS = (
+    ("бурге", "бург"), ("граде", "град"), ("городе", "город"), ("ске", "ск"), ("цке", "цк"),
+    ("ове", "ов"), ("еве", "ев"), ("ёве", "ёв"), ("кве", "ква"),
+    ("ани", "ань"), ("ени", "ень"), ("ери", "ерь"), ("ми", "мь")
+)
+_CYRILLIC = re.compile(r"[а-яё]", re.IGNORECASE)
+# Прилагательное в предложном падеже ("в Нижнем Новгороде")
+_LOCATIVE_ADJECTIVE = ("ем", "ом", "ой", "ых", "их", "ей")
+_FORECAST_KINDS = ("прогноз", "forecast")
+
+# Так инструменты сервера сообщают об ошибке; такие запросы уходят агенту
+_FAILURES = ("Ошибка", "Произошла ошибка", "Не удалось", "Некорректные", "Количество дней", "❌")
+
+PHRASE_PROMPT = (
+    "Ты погодный ассистент. Ответь на вопрос пользователя коротко и дружелюбно, "
+    "опираясь только на приведённые данные. Отвечай на языке вопроса."
+)
+
+
+def is_tool_failure(text: str) -> bool:
+    """Сообщил ли инструмент сервера об ошибке вместо данных."""
+    return text.startswith(_FAILURES)
+
+
+class FastAnswer(NamedTuple):
+    """Ответ быстрого пути: текст пользователю и данные инструментов, на которых он основан."""
+
+    text: str
+    data: str
+
+
+class Route(NamedTuple):
+    intent: str
+    city: str
+    days: int = 1
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+
+
+def _nominative_word(word: str) -> Optional[str]:
+    for locative, nominative in _LOCATIVE_ENDINGS:
+        if word.casefold().endswith(locative):
+            return word[:-len(locative)] + nominative
+    return None if word.casefold().endswith("е") else word
+
+
+def nominative(city: str) -> Optional[str]:
+    """Название города в именительном падеже или None, если форму не определить.
+
+    Геокодер ищет по названиям в именительном падеже, поэтому "Москве"
+    приводится к "Москва" по окончанию. Названия не на кириллице не меняются.
+    """
+    words = city.split()
+    if not _CYRILLIC.search(city):
+        return city
+    if any(word.casefold().endswith(_LOCATIVE_ADJECTIVE) for word in words[:-1]):
+        return None
+
+    last = words[-1]
+    # "Ростове-на-Дону": склоняется только часть до "-на-"
+    head, separator, tail = last.partition("-на-")
+    head = _nominative_word(head)
+    if head is None:
+        return None
+    return " ".join([*words[:-1], head + separator + tail])
+
+
+def match(text: str) -> Optional[Route]:
+    """Распознать простой запрос о погоде в одном городе.
+
+    Поддерживаются текущая погода ("погода в Москве", "weather in London now"),
+    прогноз на N дней ("погода в Казани на завтра", "forecast for Paris for 5 days")
+    и история за даты в формате YYYY-MM-DD ("погода в Сочи с 2024-01-01 по 2024-01-10").
+    Город приводится к именительному падежу (см. ``nominative``). Запрос с
+    лишними словами, которых роутер не понимает ("погода в Москве утром",
+    "weather in London yesterday"), или с неоднозначной падежной формой
+    города уходит агенту.
+
+    Returns:
+        Маршрут или None, если запрос сложнее шаблонов и его должен разобрать агент.
+    """
+    query = " ".join(text.strip().rstrip("?!.").split())
+    start_date = end_date = None
+    days: Optional[int] = None
+
+    found = _RANGE.search(query)
+    if found:
+        start_date, end_date = found["start"], found["end"]
+    else:
+        found = _DAY.search(query)
+        if found:
+            start_date = end_date = found["day"]
+    if found:
+        query = query[:found.start()] + query[found.end():]
+    else:
+        found = _DAYS.search(query)
+        if found:
+            days = int(found["ru"] or found["en"])
+            query = query[:found.start()] + query[found.end():]
+        else:
+            for pattern, period in _PERIODS:
+                found = pattern.search(query)
+                if found:
+                    days = period
+                    query = query[:found.start()] + query[found.end():]
+                    break
+
+    query = " ".join(_NOW.sub(" ", query).split())
+    parsed = _QUERY.match(query)
+    if parsed is None:
+        return None
+    city = parsed["city"].strip(" -")
+    words = city.casefold().split()
+    if not words or _SEVERAL.search(f" {city} ") or len(words) > _MAX_CITY_WORDS:
+        return None
+    if any(word in _NOT_CITY for word in words):
+        return None
+    city = nominative(city)
+    if city is None:
+        return None
+
+    if start_date is not None:
+        return Route(HISTORY, city, start_date=start_date, end_date=end_date)
+    if days is None and parsed["kind"].lower().startswith(_FORECAST_KINDS):
+        days = DEFAULT_FORECAST_DAYS
+    if days is not None:
+        return Route(FORECAST, city, days=days) if 1 <= days <= 16 else None
+    return Route(CURRENT, city)
+
+
+class FastPathRouter:
+    """Быстрый путь агента для простых запросов без цикла ReAct.
+
+    Запросы, которые распознаёт ``match``, обслуживаются прямым вызовом
+    инструментов погоды: ответ — отрисованный сервером текст или, если
+    задана ``model``, он же, пересказанный одним вызовом модели (если модель
+    недоступна — текст сервера как есть). Всё, что
+    роутер не распознал или не смог выполнить (ошибка инструмента, город не
+    найден), возвращает None и уходит агенту.
+    """
+
+    def __init__(self, tools: Sequence[BaseTool], model: Any = None):
+        self.tools = {tool.name: tool for tool in tools}
+        self.model = model
+        self.hits = 0
+        self.misses = 0
+
+    async def answer(self, text: str) -> Optional[FastAnswer]:
+        """Ответ на простой запрос или None, если его должен обработать агент."""
+        route = match(text)
+        data = None
+        if route is not None:
+            try:
+                data = await self._fetch(route)
+            except Exception as e:
+                logging.warning(f"Быстрый путь не сработал, запрос передан агенту: {e}")
+
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.model is None:
+            return FastAnswer(data, data)
+        try:
+            response = await self.model.ainvoke([
+                SystemMessage(content=PHRASE_PROMPT),
+                HumanMessage(content=f"Вопрос: {text}\n\nДанные:\n{data}")
+            ])
+        except Exception as e:
+            # Данные уже есть: отдаём их как отрисовал сервер
+            logging.warning(f"Не удалось пересказать ответ быстрого пути: {e}")
+            return FastAnswer(data, data)
+        return FastAnswer(str(response.content), data)
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+    async def _fetch(self, route: Route) -> Optional[str]:
+        if route.intent == CURRENT:
+            return await self._call("get_city_current_weather", city=route.city)
+        if route.intent == HISTORY:
+            return await self._call(
+                "get_city_historical_weather",
+                city=route.city,
+                start_date=route.start_date,
+                end_date=route.end_date
+            )
+
+        coordinates = await self._call("get_coord", city=route.city, output_format="json")
+        if coordinates is None:
+            return None
+        place = json.loads(coordinates)
+        forecast = await self._call("get_weather", lat=place["lat"], lon=place["lon"], count_days=route.days)
+        return None if forecast is None else f"📍 {place['name']}\n\n{forecast}"
+
+    async def _call(self, name: str, **arguments: Any) -> Optional[str]:
+        """Текст ответа инструмента или None, если инструмент сообщил об ошибке."""
+        text = await self.tools[name].ainvoke(arguments)
+        text = text if isinstance(text, str) else str(text)
+        return None if is_tool_failure(text) else text
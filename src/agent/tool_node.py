@@ -0,0 +1,44 @@
+import asyncio
+from typing import Any, Sequence
+
+from langchain_core.tools import BaseTool, ToolException
+from langgraph.prebuilt import ToolNode
+
+from src.agent.mcp_tools import RESPONSE_GRACE, turn_scope
+
+
+def bounded_tool(tool: BaseTool, semaphore: asyncio.Semaphore, call_timeout: float) -> BaseTool:
+    """Инструмент, который ждёт места в ``semaphore`` и отвечает не дольше ``call_timeout`` секунд.
+
+    Ожидание свободного места в таймаут вызова не входит. Таймаут вызова
+    передаётся серверу как остаток времени, поэтому обычно сервер сам
+    прерывает вызов и сообщает о таймауте; здесь — запасная граница на
+    случай, если сервер не ответил совсем.
+    """
+    coroutine = tool.coroutine
+
+    async def invoke(**arguments: Any) -> Any:
+        async with semaphore:
+            with turn_scope(call_timeout):
+                try:
+                    async with asyncio.timeout(call_timeout + RESPONSE_GRACE):
+                        return await coroutine(**arguments)
+                except TimeoutError:
+                    raise ToolException(f"Инструмент {tool.name} не ответил за {call_timeout:g} с")
+
+    return tool.model_copy(update={"coroutine": invoke})
+
+
+def create_tool_node(tools: Sequence[BaseTool], max_concurrency: int = 8, call_timeout: float = 30.0) -> ToolNode:
+    """Узел графа агента, выполняющий все вызовы инструментов одного хода параллельно.
+
+    Когда модель запрашивает сразу несколько инструментов (например, погоду
+    в пяти городах), они выполняются одновременно — не больше
+    ``max_concurrency`` за раз, — и ход занимает время самого долгого
+    вызова, а не их суммы. ``ToolNode`` собирает результаты через
+    ``asyncio.gather``, поэтому ответы идут в порядке вызовов. Ошибка или
+    таймаут одного вызова возвращается модели как его результат и не
+    прерывает остальные.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    return ToolNode([bounded_tool(tool, semaphore, call_timeout) for tool in tools])
@@ -45,10 +45,19 @@ def get_event_loop():
 
 
 def run_async(coro):
-    """Запускает корутину в глобальном event loop"""
+    """Запускает корутину в глобальном event loop
+
+    Ждёт чуть дольше времени на ответ агента, чтобы агент сам сообщил о
+    таймауте; если ответа всё же нет, корутина отменяется, а не продолжает
+    работать впустую.
+    """
     loop = get_event_loop()
     future = asyncio.run_coroutine_threadsafe(coro, loop)
-    return future.result(timeout=30)
+    try:
+        return future.result(timeout=settings.agent_turn_timeout + 10)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
 
 
 class WeatherAgentUI:
@@ -1,7 +1,7 @@
 from pathlib import Path
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Literal, Optional
 
 root_path = Path(__file__).parent.parent.parent
 env_path = root_path / '.env'
@@ -19,6 +19,112 @@ class Settings(BaseSettings):
         openmeteo_archive_url: URL для Open-Meteo Archive API.
         server_host: Хост сервера.
         server_port: Порт сервера.
+        mcp_transport: Транспорт MCP сервера: "stdio" (подпроцесс клиента) или
+            "http" (streamable HTTP на server_host:server_port, один сервер
+            с общими кешами и пулами соединений для многих клиентов).
+        mcp_path: Путь MCP эндпоинта в режиме HTTP.
+        server_workers: Число процессов сервера в режиме HTTP. Кеши геокодирования
+            и прогнозов общие через SQLite в cache_dir, лимит Nominatim делится
+            между процессами.
+        mcp_server_url: URL запущенного MCP сервера (например
+            http://localhost:8000/mcp); если задан, агент подключается к нему
+            вместо запуска собственного подпроцесса.
+        agent_tool_mode: Как агент вызывает инструменты погоды: ``mcp`` — через
+            MCP сервер (stdio или ``mcp_server_url``), ``inprocess`` — напрямую
+            в своём процессе, без MCP.
+        mcp_pool_size: Сколько долгоживущих сессий (для stdio — процессов
+            сервера) держит агент. Процессы stdio делят лимит Nominatim,
+            прогрев кеша работает только в одном из них.
+        mcp_ping_interval: Как часто агент проверяет сессии пингом, сек; не
+            ответившая сессия пересоздаётся.
+        nominatim_timeout: Таймаут запроса к Nominatim, сек.
+        nominatim_rate_limit: Максимум запросов к Nominatim в секунду.
+        nominatim_burst: Сколько запросов к Nominatim можно выполнить подряд без ожидания.
+        nominatim_queue_size: Максимальная длина очереди запросов геокодирования.
+        nominatim_max_queue_wait: Максимальное ожидание в очереди, сек.
+        gazetteer_path: Путь к дампу GeoNames (.txt или .zip) для геокодирования
+            без сети; пусто — только Nominatim.
+        gazetteer_min_population: Не загружать города с меньшим населением.
+        http_max_connections: Максимум соединений в пуле одного апстрима.
+        http_max_keepalive_connections: Максимум простаивающих keep-alive соединений.
+        http_keepalive_expiry: Время жизни простаивающего соединения, сек.
+        http_http2: Использовать HTTP/2 (нужен пакет h2).
+        http_timeout: Таймаут HTTP запросов по умолчанию, сек.
+        tool_timeout: Наибольшее время выполнения одного вызова инструмента MCP
+            сервером, сек; клиент может сократить его, передав остаток своего
+            времени в ``_meta.timeout``.
+        agent_turn_timeout: Время на один ответ агента (все вызовы модели и
+            инструментов), сек.
+        agent_max_concurrent_tools: Сколько вызовов инструментов одного хода
+            агента выполняется одновременно.
+        agent_tool_call_timeout: Время на один вызов инструмента агентом, сек.
+        agent_fast_path: Отвечать на простые запросы (погода, прогноз или история
+            в одном городе) прямым вызовом инструментов, без цикла ReAct.
+        agent_fast_path_llm: Пересказывать ответ быстрого пути одним вызовом
+            модели вместо отрисованного сервером текста.
+        answer_cache_enabled: Кешировать ответы агента на простые запросы
+            (общий кеш для всех потоков).
+        answer_cache_entries: Максимум ответов в кеше.
+        answer_cache_current_interval: Окно свежести ответов о текущей погоде,
+            сек; ответы о прогнозах живут до обновления моделей
+            (forecast_update_interval).
+        upstream_retries: Сколько раз повторять запрос к апстриму при временной
+            ошибке (сеть, 429, 5xx).
+        upstream_backoff_base: Базовая задержка повтора, сек; удваивается с каждой
+            попыткой, фактическая пауза выбирается случайно от нуля.
+        upstream_backoff_max: Максимальная задержка повтора, сек.
+        circuit_failure_threshold: Сколько временных ошибок подряд отключают апстрим.
+        circuit_reset_timeout: Через сколько секунд после отключения пробовать апстрим снова.
+        hedge_percentile: Процентиль длительности запроса прогноза, после которого
+            отправляется дублирующий запрос; пусто — без хеджирования.
+        hedge_min_samples: Сколько замеров длительности нужно для хеджирования.
+        cache_dir: Каталог для персистентных кешей (пусто — только память).
+        geocode_cache_enabled: Включить кеш геокодирования.
+        geocode_cache_file: Имя SQLite файла кеша геокодирования в cache_dir.
+        geocode_cache_ttl: Время жизни найденных координат, сек.
+        geocode_cache_negative_ttl: Время жизни ответов "город не найден", сек.
+        geocode_cache_stale_if_error: Сколько секунд после истечения срока отдавать
+            сохранённые координаты, если Nominatim недоступен.
+        geocode_cache_memory_entries: Размер LRU кеша в памяти.
+        geocode_cache_disk_entries: Максимум записей в SQLite кеше.
+        archive_store_enabled: Включить локальное хранилище архива погоды.
+        archive_store_file: Имя SQLite файла хранилища архива в cache_dir.
+        archive_grid_step: Шаг сетки привязки координат архива, градусы.
+        archive_settle_days: Сколько последних дней архива не сохранять (ещё уточняются).
+        archive_gap_merge_days: Пропуски, разделённые не более чем этим числом
+            сохранённых дней, докачиваются одним запросом.
+        archive_chunk_days: Длина части диапазона в одном запросе к Archive API, дни.
+        archive_max_concurrency: Сколько частей архива запрашивать одновременно.
+        archive_chunk_retries: Сколько раз повторять неудавшийся запрос части архива.
+        historical_max_days: Максимальная длина периода исторических данных, дни.
+        forecast_cache_enabled: Включить кеш прогнозов.
+        forecast_grid_step: Шаг сетки привязки координат прогноза, градусы.
+        forecast_update_interval: Период обновления моделей Open-Meteo, сек.
+        forecast_cache_max_stale: Сколько секунд после обновления моделей отдавать
+            устаревший прогноз, пока в фоне запрашивается новый.
+        forecast_cache_stale_if_error: Сколько секунд после истечения срока отдавать
+            последний известный прогноз с пометкой об устаревании, если
+            Open-Meteo недоступен.
+        forecast_cache_entries: Размер кеша прогнозов в памяти.
+        forecast_cache_file: Имя SQLite файла кеша прогнозов в cache_dir, общего
+            для всех процессов сервера.
+        forecast_cache_disk_entries: Максимум записей в SQLite кеше прогнозов.
+        forecast_batch_size: Сколько точек упаковывать в один запрос Forecast API.
+        forecast_batch_max_points: Максимум точек в одном вызове get_weather_batch.
+        warmer_enabled: Прогревать кеш популярных городов в фоне.
+        warmer_cities: Города, которые прогреваются всегда (JSON список в окружении).
+        warmer_top_n: Сколько самых запрашиваемых городов и точек прогнозов
+            прогревать по живой статистике.
+        warmer_delay: Через сколько секунд после обновления моделей Open-Meteo
+            запускать прогрев.
+        warmer_request_interval: Пауза между запросами прогрева, сек.
+        hourly_max_buckets: Максимум интервалов почасовых данных в ответе; при
+            превышении интервал агрегации укрупняется.
+        historical_hourly_max_days: Максимальная длина периода почасовой истории, дни.
+        tool_output_format: Формат ответа инструментов по умолчанию: "text" или
+            "json" (компактные структурированные данные).
+        render_table_threshold: Периоды длиннее этого числа дней выводятся
+            компактной таблицей.
         GEMINI_API: API ключ для Gemini.
     """
 
@@ -33,6 +139,89 @@ class Settings(BaseSettings):
     server_host: str = "0.0.0.0"
     server_port: int = 8000
     server_gradio_port: int = 7860
+    mcp_transport: Literal["stdio", "http"] = "stdio"
+    mcp_path: str = "/mcp"
+    mcp_server_url: Optional[str] = None
+    server_workers: int = 1
+    agent_tool_mode: Literal["mcp", "inprocess"] = "mcp"
+    mcp_pool_size: int = 1
+    mcp_ping_interval: float = 30.0
+
+    # Nominatim
+    nominatim_timeout: float = 10.0
+    nominatim_rate_limit: float = 1.0
+    nominatim_burst: int = 1
+    nominatim_queue_size: int = 100
+    nominatim_max_queue_wait: float = 10.0
+    gazetteer_path: Optional[str] = None
+    gazetteer_min_population: int = 0
+
+    # HTTP клиент
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry: float = 30.0
+    http_http2: bool = False
+    http_timeout: float = 30.0
+    tool_timeout: float = 60.0
+    agent_turn_timeout: float = 90.0
+    agent_max_concurrent_tools: int = 8
+    agent_tool_call_timeout: float = 30.0
+    agent_fast_path: bool = True
+    agent_fast_path_llm: bool = False
+    answer_cache_enabled: bool = True
+    answer_cache_entries: int = 1024
+    answer_cache_current_interval: float = 900
+
+    # Устойчивость к сбоям апстримов
+    upstream_retries: int = 2
+    upstream_backoff_base: float = 0.2
+    upstream_backoff_max: float = 2.0
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout: float = 30.0
+    hedge_percentile: Optional[float] = 95.0
+    hedge_min_samples: int = 20
+
+    # Кеширование
+    cache_dir: Optional[str] = str(root_path / '.cache')
+    geocode_cache_enabled: bool = True
+    geocode_cache_file: Optional[str] = "geocode.sqlite3"
+    geocode_cache_ttl: float = 30 * 24 * 3600
+    geocode_cache_negative_ttl: float = 3600
+    geocode_cache_stale_if_error: float = 365 * 24 * 3600
+    geocode_cache_memory_entries: int = 1024
+    geocode_cache_disk_entries: int = 100_000
+    archive_store_enabled: bool = True
+    archive_store_file: Optional[str] = "archive.sqlite3"
+    archive_grid_step: float = 0.1
+    archive_settle_days: int = 7
+    archive_gap_merge_days: int = 14
+    archive_chunk_days: int = 366
+    archive_max_concurrency: int = 4
+    archive_chunk_retries: int = 2
+    historical_max_days: int = 20 * 366
+    forecast_cache_enabled: bool = True
+    forecast_grid_step: float = 0.05
+    forecast_update_interval: float = 3600
+    forecast_cache_max_stale: float = 900
+    forecast_cache_stale_if_error: float = 6 * 3600
+    forecast_cache_entries: int = 4096
+    forecast_cache_file: Optional[str] = "forecast.sqlite3"
+    forecast_cache_disk_entries: int = 20_000
+    forecast_batch_size: int = 50
+    forecast_batch_max_points: int = 500
+
+    # Прогрев кеша
+    warmer_enabled: bool = True
+    warmer_cities: list[str] = []
+    warmer_top_n: int = 200
+    warmer_delay: float = 60.0
+    warmer_request_interval: float = 0.5
+
+    # Вывод инструментов
+    hourly_max_buckets: int = 96
+    historical_hourly_max_days: int = 366
+    tool_output_format: Literal["text", "json"] = "text"
+    render_table_threshold: int = 31
 
     # LLM настройки
     GOOGLE_API_KEY: Optional[str] = None
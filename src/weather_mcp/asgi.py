@@ -0,0 +1,18 @@
+"""ASGI приложение MCP сервера (streamable HTTP).
+
+Точка импорта для запуска несколькими процессами, например::
+
+    uvicorn weather_mcp.asgi:app --workers 4
+
+Каждый воркер создаёт своё приложение и пулы соединений; кеши
+геокодирования и прогнозов общие через SQLite файлы в ``cache_dir``.
+"""
+import sys
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path / 'src'))
+
+from weather_mcp.server import create_http_app
+
+app = create_http_app()
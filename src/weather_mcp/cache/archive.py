@@ -0,0 +1,287 @@
+import sys
+import math
+import logging
+import sqlite3
+from array import array
+from pathlib import Path
+from datetime import date, timedelta
+from typing import Any, Optional
+
+root_path = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(root_path / 'src'))
+
+from utils.config import settings
+from weather_mcp.cache.grid import snap
+from weather_mcp.cache.sqlite import connect
+
+# Дневные переменные архива в порядке хранения колонок
+DAILY_VARIABLES = (
+    "temperature_2m_max",
+    "temperature_2m_min",
+    "precipitation_sum",
+    "wind_speed_10m_max",
+    "weather_code"
+)
+# Переменные, которые отдаются целыми числами
+INTEGER_VARIABLES = frozenset({"weather_code"})
+
+DAYS_IN_BLOCK = 366
+
+
+def date_ranges(days: list[date]) -> list[tuple[date, date]]:
+    """Свернуть отсортированный список дат в непрерывные диапазоны."""
+    ranges: list[tuple[date, date]] = []
+    for day in days:
+        if ranges and ranges[-1][1] + timedelta(days=1) == day:
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
+
+
+def coalesce_ranges(ranges: list[tuple[date, date]], max_gap_days: int) -> list[tuple[date, date]]:
+    """Объединить диапазоны, между которыми не больше ``max_gap_days`` дней.
+
+    Перекачать несколько уже сохранённых дней дешевле, чем сделать лишний запрос.
+    """
+    merged: list[tuple[date, date]] = []
+    for start, end in ranges:
+        if merged and (start - merged[-1][1]).days - 1 <= max_gap_days:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def split_range(start: date, end: date, max_days: int) -> list[tuple[date, date]]:
+    """Разбить диапазон дат на последовательные части не длиннее ``max_days`` дней."""
+    chunks: list[tuple[date, date]] = []
+    while start <= end:
+        chunk_end = min(end, start + timedelta(days=max_days - 1))
+        chunks.append((start, chunk_end))
+        start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def merge_daily(daily: dict[str, list], extra: dict[str, list]) -> dict[str, list]:
+    """Добавить к секции ``daily`` дни из ``extra``, сохранив порядок дат."""
+    if not extra["time"]:
+        return daily
+    rows = {}
+    for section in (daily, extra):
+        for i, day in enumerate(section["time"]):
+            rows[day] = [section[name][i] for name in DAILY_VARIABLES]
+    ordered = sorted(rows)
+    merged: dict[str, list] = {"time": ordered}
+    for n, name in enumerate(DAILY_VARIABLES):
+        merged[name] = [rows[day][n] for day in ordered]
+    return merged
+
+
+class _YearBlock:
+    """Колонки одного года одной ячейки: маска наличия и по массиву на переменную."""
+
+    __slots__ = ("present", "columns")
+
+    def __init__(self, present: bytearray, columns: dict[str, array]):
+        self.present = present
+        self.columns = columns
+
+    @classmethod
+    def empty(cls) -> "_YearBlock":
+        nan_column = array("d", [math.nan]) * DAYS_IN_BLOCK
+        return cls(bytearray(DAYS_IN_BLOCK), {name: array("d", nan_column) for name in DAILY_VARIABLES})
+
+
+class ArchiveStore:
+    """Локальное колоночное хранилище дневных архивных данных Open-Meteo.
+
+    Прошедшие дни архива не меняются, поэтому каждый день ячейки сетки
+    скачивается один раз. Данные хранятся блоками (ячейка, год): маска
+    наличия дней и по упакованному массиву float64 на каждую переменную.
+    Дни моложе ``settle_days`` ещё могут уточняться и не сохраняются.
+    """
+
+    def __init__(self, path: str | Path, grid_step: float = 0.1, settle_days: int = 7):
+        self.path = Path(path)
+        self.grid_step = grid_step
+        self.settle_days = settle_days
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @classmethod
+    def from_settings(cls) -> Optional["ArchiveStore"]:
+        """Создать хранилище по настройкам приложения или None, если оно выключено."""
+        if not (settings.archive_store_enabled and settings.cache_dir and settings.archive_store_file):
+            return None
+        return cls(
+            Path(settings.cache_dir) / settings.archive_store_file,
+            grid_step=settings.archive_grid_step,
+            settle_days=settings.archive_settle_days
+        )
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = connect(self.path)
+            columns = ", ".join(f"{name} BLOB NOT NULL" for name in DAILY_VARIABLES)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS archive_cells ("
+                "cell TEXT PRIMARY KEY, latitude REAL, longitude REAL, timezone TEXT)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS archive_blocks ("
+                f"cell TEXT NOT NULL, year INTEGER NOT NULL, present BLOB NOT NULL, {columns}, "
+                "PRIMARY KEY (cell, year)) WITHOUT ROWID"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def cell(self, lat: float, lon: float) -> tuple[float, float]:
+        """Координаты узла сетки, к которому относится точка."""
+        return snap(lat, self.grid_step), snap(lon, self.grid_step)
+
+    def settled_until(self, today: Optional[date] = None) -> date:
+        """Последний день, данные которого считаются окончательными."""
+        return (today or date.today()) - timedelta(days=self.settle_days)
+
+    def location(self, cell: tuple[float, float]) -> Optional[dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT latitude, longitude, timezone FROM archive_cells WHERE cell = ?",
+            (self._key(cell),)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"latitude": row[0], "longitude": row[1], "timezone": row[2]}
+
+    def missing_ranges(self, cell: tuple[float, float], start: date, end: date) -> list[tuple[date, date]]:
+        """Диапазоны дат из [start, end], которых нет в хранилище."""
+        blocks = self._load_blocks(cell, start.year, end.year)
+        missing = []
+        day = start
+        while day <= end:
+            block = blocks.get(day.year)
+            if block is None or not block.present[self._index(day)]:
+                missing.append(day)
+            day += timedelta(days=1)
+        return date_ranges(missing)
+
+    def read(self, cell: tuple[float, float], start: date, end: date) -> dict[str, list]:
+        """Прочитать сохранённые дни диапазона в формате секции ``daily`` Open-Meteo.
+
+        Отсутствующие дни пропускаются.
+        """
+        blocks = self._load_blocks(cell, start.year, end.year)
+        daily: dict[str, list] = {"time": []}
+        for name in DAILY_VARIABLES:
+            daily[name] = []
+
+        day = start
+        while day <= end:
+            block = blocks.get(day.year)
+            index = self._index(day)
+            if block is not None and block.present[index]:
+                daily["time"].append(day.isoformat())
+                for name in DAILY_VARIABLES:
+                    daily[name].append(self._decode(name, block.columns[name][index]))
+            day += timedelta(days=1)
+
+        return daily
+
+    def write(self, cell: tuple[float, float], data: dict[str, Any], today: Optional[date] = None) -> Optional[int]:
+        """Сохранить окончательные дни из ответа Archive API.
+
+        Returns:
+            Количество сохранённых дней или None, если файл занят другим
+            воркером и запись пропущена.
+        """
+        daily = data.get("daily") or {}
+        settled_until = self.settled_until(today)
+        days = [date.fromisoformat(value) for value in daily.get("time", [])]
+        rows = [(i, day) for i, day in enumerate(days) if day <= settled_until]
+        if not rows:
+            return 0
+
+        try:
+            self._write_rows(cell, data, daily, rows)
+        except sqlite3.OperationalError as e:
+            logging.warning(f"Хранилище архива занято, запись пропущена: {e}")
+            if self._conn is not None:
+                self._conn.rollback()
+            return None
+        return len(rows)
+
+    def _write_rows(
+        self,
+        cell: tuple[float, float],
+        data: dict[str, Any],
+        daily: dict[str, Any],
+        rows: list[tuple[int, date]]
+    ) -> None:
+        key = self._key(cell)
+        # Блоки года читаются и перезаписываются целиком: без блокировки на всё
+        # чтение-изменение-запись воркеры затирали бы маски наличия друг друга
+        self.conn.execute("BEGIN IMMEDIATE")
+        blocks = self._load_blocks(cell, rows[0][1].year, rows[-1][1].year)
+        touched = set()
+        for i, day in rows:
+            block = blocks.setdefault(day.year, _YearBlock.empty())
+            index = self._index(day)
+            block.present[index] = 1
+            for name in DAILY_VARIABLES:
+                values = daily.get(name)
+                value = values[i] if values is not None else None
+                block.columns[name][index] = math.nan if value is None else float(value)
+            touched.add(day.year)
+
+        placeholders = ", ".join("?" for _ in DAILY_VARIABLES)
+        names = ", ".join(DAILY_VARIABLES)
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO archive_blocks (cell, year, present, {names}) "
+            f"VALUES (?, ?, ?, {placeholders})",
+            [
+                (key, year, bytes(blocks[year].present),
+                 *(blocks[year].columns[name].tobytes() for name in DAILY_VARIABLES))
+                for year in sorted(touched)
+            ]
+        )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO archive_cells (cell, latitude, longitude, timezone) VALUES (?, ?, ?, ?)",
+            (key, data.get("latitude"), data.get("longitude"), data.get("timezone"))
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _load_blocks(self, cell: tuple[float, float], first_year: int, last_year: int) -> dict[int, _YearBlock]:
+        names = ", ".join(DAILY_VARIABLES)
+        rows = self.conn.execute(
+            f"SELECT year, present, {names} FROM archive_blocks WHERE cell = ? AND year BETWEEN ? AND ?",
+            (self._key(cell), first_year, last_year)
+        ).fetchall()
+
+        blocks = {}
+        for year, present, *blobs in rows:
+            columns = {}
+            for name, blob in zip(DAILY_VARIABLES, blobs):
+                column = array("d")
+                column.frombytes(blob)
+                columns[name] = column
+            blocks[year] = _YearBlock(bytearray(present), columns)
+        return blocks
+
+    @staticmethod
+    def _key(cell: tuple[float, float]) -> str:
+        return f"{cell[0]:.6f},{cell[1]:.6f}"
+
+    @staticmethod
+    def _index(day: date) -> int:
+        return day.timetuple().tm_yday - 1
+
+    @staticmethod
+    def _decode(name: str, value: float) -> Optional[float | int]:
+        if math.isnan(value):
+            return None
+        return int(value) if name in INTEGER_VARIABLES else value
@@ -0,0 +1,181 @@
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+root_path = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(root_path / 'src'))
+
+from utils.config import settings
+from weather_mcp.cache.grid import snap
+from weather_mcp.cache.memory import CacheEntry, LRUCache
+from weather_mcp.cache.sqlite import SqliteStore
+from weather_mcp.series import DailySeries, HourlySeries
+
+
+# Состояния записи кеша прогноза
+FRESH = "fresh"
+STALE = "stale"
+MISSING = "missing"
+
+# Поля прогноза, которые хранятся колонками и восстанавливаются рядами
+_SERIES_FIELDS = {"daily_forecast": DailySeries, "hourly": HourlySeries}
+
+
+def encode(data: dict[str, Any]) -> dict[str, Any]:
+    """Прогноз в JSON-совместимый вид: ряды заменяются их колонками API."""
+    return {
+        name: value.raw_columns() if name in _SERIES_FIELDS and hasattr(value, "raw_columns") else value
+        for name, value in data.items()
+    }
+
+
+def decode(data: dict[str, Any]) -> dict[str, Any]:
+    """Обратное к ``encode``: колонки снова оборачиваются в ряды."""
+    return {
+        name: _SERIES_FIELDS[name](value) if name in _SERIES_FIELDS and isinstance(value, dict) else value
+        for name, value in data.items()
+    }
+
+
+class ForecastCache:
+    """Кеш прогнозов Open-Meteo с привязкой к сетке и stale-while-revalidate.
+
+    Сетка моделей Open-Meteo километровая, поэтому точки привязываются к узлам
+    сетки с шагом ``grid_step``, а прогноз запрашивается для узла. Модели
+    обновляются раз в ``update_interval`` секунд: запись свежа до ближайшей
+    границы обновления, после неё ещё ``max_stale`` секунд отдаётся как
+    устаревшая, пока в фоне запрашивается новая.
+
+    С ``path`` за LRU в памяти стоит общий для всех воркеров SQLite файл:
+    прогноз, скачанный одним процессом, получают и остальные.
+
+    Истёкшие записи не удаляются сразу: ещё ``stale_if_error`` секунд они
+    доступны через ``get_stale`` на случай недоступности Open-Meteo.
+    """
+
+    def __init__(
+        self,
+        grid_step: float = 0.05,
+        update_interval: float = 3600,
+        max_stale: float = 900,
+        max_entries: int = 4096,
+        path: Optional[str | Path] = None,
+        max_disk_entries: int = 20_000,
+        stale_if_error: float = 6 * 3600
+    ):
+        self.grid_step = grid_step
+        self.update_interval = update_interval
+        self.max_stale = max_stale
+        self.stale_if_error = stale_if_error
+        self.memory = LRUCache(max_entries)
+        self.disk = SqliteStore(path, "forecast", max_disk_entries) if path else None
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.stale_on_error = 0
+
+    @classmethod
+    def from_settings(cls) -> Optional["ForecastCache"]:
+        """Создать кеш по настройкам приложения или None, если кеш выключен."""
+        if not settings.forecast_cache_enabled:
+            return None
+        path = None
+        if settings.cache_dir and settings.forecast_cache_file:
+            path = Path(settings.cache_dir) / settings.forecast_cache_file
+        return cls(
+            grid_step=settings.forecast_grid_step,
+            update_interval=settings.forecast_update_interval,
+            max_stale=settings.forecast_cache_max_stale,
+            max_entries=settings.forecast_cache_entries,
+            path=path,
+            max_disk_entries=settings.forecast_cache_disk_entries,
+            stale_if_error=settings.forecast_cache_stale_if_error
+        )
+
+    def cell(self, lat: float, lon: float) -> tuple[float, float]:
+        """Координаты узла сетки, для которого запрашивается прогноз."""
+        return snap(lat, self.grid_step), snap(lon, self.grid_step)
+
+    def key(self, lat: float, lon: float, forecast_days: int, include_current: bool, hourly: bool = False) -> str:
+        cell_lat, cell_lon = self.cell(lat, lon)
+        return f"{cell_lat:.6f},{cell_lon:.6f}:{forecast_days}:{int(include_current)}:{int(hourly)}"
+
+    def next_update(self, now: Optional[float] = None) -> float:
+        """Время ближайшего обновления моделей (граница текущего часа модели)."""
+        now = time.time() if now is None else now
+        return (now // self.update_interval + 1) * self.update_interval
+
+    def get(self, key: str) -> tuple[Optional[CacheEntry], str]:
+        """Найти запись и определить, свежая она, устаревшая или отсутствует."""
+        now = time.time()
+        entry = self.memory.get(key)
+
+        if entry is not None and entry.is_fresh(now):
+            self.hits += 1
+            return entry, FRESH
+
+        if self.disk is not None:
+            # Другой воркер мог уже обновить прогноз
+            stored = self.disk.get(key)
+            if stored is not None and (entry is None or stored.expires_at > entry.expires_at):
+                entry = CacheEntry(decode(stored.value), stored.stored_at, stored.expires_at)
+                self.memory.set(key, entry)
+                if entry.is_fresh(now):
+                    self.disk_hits += 1
+                    return entry, FRESH
+
+        if entry is not None and now < entry.expires_at + self.max_stale:
+            self.stale_hits += 1
+            return entry, STALE
+
+        self.misses += 1
+        return None, MISSING
+
+    def get_stale(self, key: str) -> Optional[CacheEntry]:
+        """Последняя известная запись, даже истёкшая, если она моложе окна ``stale_if_error``.
+
+        Вызывается, когда обновить прогноз не удалось.
+        """
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            stored = self.disk.get(key)
+            if stored is not None:
+                entry = CacheEntry(decode(stored.value), stored.stored_at, stored.expires_at)
+        if entry is None or time.time() >= entry.expires_at + self.stale_if_error:
+            return None
+        self.stale_on_error += 1
+        return entry
+
+    def set(self, key: str, data: dict[str, Any]) -> None:
+        now = time.time()
+        entry = CacheEntry(data, now, self.next_update(now))
+        self.memory.set(key, entry)
+        if self.disk is not None:
+            self.disk.set(key, entry._replace(value=encode(data)))
+
+    def invalidate(self, key: str) -> None:
+        self.memory.pop(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def stats(self) -> dict[str, Any]:
+        """Счётчики попаданий и промахов для мониторинга."""
+        hits = self.hits + self.disk_hits
+        lookups = hits + self.stale_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "stale_on_error": self.stale_on_error,
+            "hit_ratio": (hits + self.stale_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "memory_evictions": self.memory.evictions
+        }
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
@@ -0,0 +1,140 @@
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+root_path = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(root_path / 'src'))
+
+from utils.config import settings
+from weather_mcp.cache.memory import CacheEntry, LRUCache
+from weather_mcp.cache.sqlite import SqliteStore
+
+
+def normalize_city(city: str) -> str:
+    """Нормализовать запрос города в ключ кеша: регистр и лишние пробелы не важны."""
+    return " ".join(city.casefold().split())
+
+
+class GeocodeCache:
+    """Двухуровневый кеш геокодирования: LRU в памяти перед SQLite на диске.
+
+    Хранит готовые результаты ``GeocodingService.get_coordinates``. Найденные
+    города живут ``ttl`` секунд, ответы "не найден" — ``negative_ttl``.
+    Ошибки сети и таймауты не кешируются. Найденные города после истечения
+    срока ещё ``stale_if_error`` секунд доступны через ``get_stale``.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str | Path] = None,
+        ttl: float = 30 * 24 * 3600,
+        negative_ttl: float = 3600,
+        max_memory_entries: int = 1024,
+        max_disk_entries: int = 100_000,
+        stale_if_error: float = 365 * 24 * 3600
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_if_error = stale_if_error
+        self.memory = LRUCache(max_memory_entries)
+        self.disk = SqliteStore(path, "geocode", max_disk_entries) if path else None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.stale_on_error = 0
+
+    @classmethod
+    def from_settings(cls) -> Optional["GeocodeCache"]:
+        """Создать кеш по настройкам приложения или None, если кеш выключен."""
+        if not settings.geocode_cache_enabled:
+            return None
+        path = None
+        if settings.cache_dir and settings.geocode_cache_file:
+            path = Path(settings.cache_dir) / settings.geocode_cache_file
+        return cls(
+            path=path,
+            ttl=settings.geocode_cache_ttl,
+            negative_ttl=settings.geocode_cache_negative_ttl,
+            max_memory_entries=settings.geocode_cache_memory_entries,
+            max_disk_entries=settings.geocode_cache_disk_entries,
+            stale_if_error=settings.geocode_cache_stale_if_error
+        )
+
+    def get(self, city: str) -> Optional[dict[str, Any]]:
+        """Вернуть сохранённый результат геокодирования или None при промахе."""
+        key = normalize_city(city)
+        now = time.time()
+
+        entry = self.memory.get(key)
+        if entry is not None and entry.is_fresh(now):
+            self.memory_hits += 1
+            return self._hit(entry)
+
+        if self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None and entry.is_fresh(now):
+                self.memory.set(key, entry)
+                self.disk_hits += 1
+                return self._hit(entry)
+
+        self.misses += 1
+        return None
+
+    def get_stale(self, city: str) -> Optional[CacheEntry]:
+        """Истёкшие, но ещё не слишком старые координаты — когда Nominatim недоступен.
+
+        Ответы "не найден" так не отдаются.
+        """
+        key = normalize_city(city)
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+        if entry is None or not entry.value.get("success"):
+            return None
+        if time.time() >= entry.expires_at + self.stale_if_error:
+            return None
+        self.stale_on_error += 1
+        return entry
+
+    def set(self, city: str, result: dict[str, Any], negative: bool = False) -> None:
+        """Сохранить результат. ``negative`` помечает ответ "город не найден"."""
+        key = normalize_city(city)
+        now = time.time()
+        entry = CacheEntry(result, now, now + (self.negative_ttl if negative else self.ttl))
+
+        self.memory.set(key, entry)
+        if self.disk is not None:
+            self.disk.set(key, entry)
+
+    def invalidate(self, city: str) -> None:
+        key = normalize_city(city)
+        self.memory.pop(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def stats(self) -> dict[str, Any]:
+        """Счётчики попаданий и промахов для мониторинга."""
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "stale_on_error": self.stale_on_error,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "memory_evictions": self.memory.evictions
+        }
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+
+    def _hit(self, entry: CacheEntry) -> dict[str, Any]:
+        if not entry.value.get("success"):
+            self.negative_hits += 1
+        return entry.value
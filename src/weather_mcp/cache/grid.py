@@ -0,0 +1,3 @@
+def snap(value: float, step: float) -> float:
+    """Привязать координату к узлу сетки с шагом ``step`` градусов."""
+    return round(round(value / step) * step, 6)
@@ -0,0 +1,58 @@
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, NamedTuple, Optional
+
+
+class CacheEntry(NamedTuple):
+    """Запись кеша: значение и время его сохранения/истечения (unix time)."""
+
+    value: Any
+    stored_at: float
+    expires_at: float
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (time.time() if now is None else now) < self.expires_at
+
+    def staleness(self, reason: str) -> dict[str, str]:
+        """Пометка для данных, отданных после истечения срока из-за ошибки апстрима."""
+        as_of = datetime.fromtimestamp(self.stored_at, timezone.utc).isoformat(timespec="seconds")
+        return {"as_of": as_of, "reason": reason}
+
+
+class LRUCache:
+    """Ограниченный по размеру кеш в памяти процесса с вытеснением LRU.
+
+    Сроки жизни не проверяются: кеш лишь хранит записи, а решение о свежести
+    принимает вызывающий код по ``CacheEntry.expires_at``.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._data: OrderedDict[str, CacheEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._data.get(key)
+        if entry is not None:
+            self._data.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: str) -> Optional[CacheEntry]:
+        return self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
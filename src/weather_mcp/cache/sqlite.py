@@ -0,0 +1,137 @@
+import sys
+import json
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+root_path = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(root_path / 'src'))
+
+from weather_mcp.cache.memory import CacheEntry
+
+# Сколько секунд запись ждёт блокировку, занятую другим воркером. Запросы к
+# SQLite синхронные и держат цикл событий, поэтому ожидание короткое: кеш
+# не обязателен, и запись проще пропустить (sqlite3.OperationalError)
+BUSY_TIMEOUT = 0.1
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    """Открыть SQLite файл кеша для совместного доступа нескольких процессов.
+
+    Режим WAL позволяет воркерам сервера читать параллельно с записью;
+    при занятой блокировке запись ждёт до ``BUSY_TIMEOUT`` секунд, затем
+    получает ``sqlite3.OperationalError``.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class SqliteStore:
+    """Персистентное key/value хранилище записей кеша в SQLite.
+
+    Соединение открывается лениво при первом обращении, поэтому создание
+    объекта не трогает диск. Значения сериализуются в JSON. Файл общий для
+    всех процессов сервера: запись одного воркера сразу видна остальным.
+    Если файл занят другим воркером дольше ``BUSY_TIMEOUT``, чтение
+    считается промахом, а запись пропускается.
+    """
+
+    # Как часто (в записях) проверять превышение лимита размера
+    prune_interval = 100
+
+    def __init__(self, path: str | Path, table: str, max_entries: int):
+        self.path = Path(path)
+        self.table = table
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes = 0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = connect(self.path)
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "stored_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_expires ON {self.table} (expires_at)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        try:
+            row = self.conn.execute(
+                f"SELECT value, stored_at, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.OperationalError as e:
+            logging.warning(f"Кеш {self.table} недоступен, чтение пропущено: {e}")
+            return None
+        if row is None:
+            return None
+        return CacheEntry(json.loads(row[0]), row[1], row[2])
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        try:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, stored_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(entry.value, ensure_ascii=False), entry.stored_at, entry.expires_at)
+            )
+            self.conn.commit()
+        except sqlite3.OperationalError as e:
+            self._skip_write(e)
+            return
+
+        self._writes += 1
+        if self._writes % self.prune_interval == 0:
+            self.prune()
+
+    def delete(self, key: str) -> None:
+        try:
+            self.conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self.conn.commit()
+        except sqlite3.OperationalError as e:
+            self._skip_write(e)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Удалить просроченные записи и самые старые сверх лимита размера."""
+        try:
+            conn = self.conn
+            removed = 0
+            if now is not None:
+                removed += conn.execute(f"DELETE FROM {self.table} WHERE expires_at < ?", (now,)).rowcount
+
+            (count,) = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+            excess = count - self.max_entries
+            if excess > 0:
+                removed += conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN "
+                    f"(SELECT key FROM {self.table} ORDER BY expires_at LIMIT ?)",
+                    (excess,)
+                ).rowcount
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            self._skip_write(e)
+            return 0
+        return removed
+
+    def __len__(self) -> int:
+        (count,) = self.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        return count
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _skip_write(self, error: sqlite3.OperationalError) -> None:
+        logging.warning(f"Кеш {self.table} занят, запись пропущена: {error}")
+        if self._conn is not None:
+            self._conn.rollback()
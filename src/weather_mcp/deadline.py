@@ -0,0 +1,156 @@
+import sys
+import time
+import asyncio
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, copy_context
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar
+
+from fastmcp.exceptions import ToolError
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path / 'src'))
+
+from utils.config import settings
+
+T = TypeVar("T")
+
+# Момент (time.monotonic), к которому должен быть готов ответ текущему вызову
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Время на ответ вызывающему истекло; запрос к апстриму не отправлялся."""
+
+    def __init__(self):
+        super().__init__("время на ответ истекло")
+
+
+def remaining() -> Optional[float]:
+    """Сколько секунд осталось до дедлайна текущего вызова или None, если его нет."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def expired() -> bool:
+    """Истёк ли дедлайн текущего вызова. Таймаут после него — наш, а не апстрима."""
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def detached() -> Context:
+    """Копия текущего контекста без дедлайна.
+
+    Для фоновых задач, которые переживают вызвавший их запрос (обновление
+    устаревшей записи кеша).
+    """
+    context = copy_context()
+    context.run(_deadline.set, None)
+    return context
+
+
+class SharedDeadline:
+    """Дедлайн задачи, результат которой ждут несколько вызовов.
+
+    Задача работает в своей копии контекста до самого позднего дедлайна среди
+    текущих ожидающих: присоединившийся вызов с большим запасом продлевает
+    его, вызов без дедлайна снимает ограничение, а уход ожидающего
+    возвращает дедлайн остальных. Внутри задачи ``clamp`` урезает таймауты
+    до этого дедлайна.
+    """
+
+    def __init__(self):
+        self.context = copy_context()
+        self._waiters: list[Optional[float]] = []
+
+    def join(self) -> Optional[float]:
+        """Добавить дедлайн текущего вызова к ожидающим. Возвращает его для ``leave``."""
+        deadline = _deadline.get()
+        self._waiters.append(deadline)
+        self._apply()
+        return deadline
+
+    def leave(self, deadline: Optional[float]) -> None:
+        self._waiters.remove(deadline)
+        if self._waiters:
+            self._apply()
+
+    def _apply(self) -> None:
+        deadline = None if None in self._waiters else max(self._waiters)
+        if self.context.get(_deadline) != deadline:
+            self.context.run(_deadline.set, deadline)
+
+
+@contextmanager
+def scope(seconds: Optional[float]) -> Iterator[None]:
+    """Ограничить время выполнения вложенного кода. Внешний дедлайн не продлевается."""
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def clamp(timeout: float) -> float:
+    """Таймаут операции, урезанный до остатка времени вызова.
+
+    Raises:
+        DeadlineExceeded: Время уже истекло.
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded()
+    return min(timeout, left)
+
+
+def tool_budget(requested: Optional[float] = None) -> float:
+    """Время на вызов инструмента: ``settings.tool_timeout`` или меньший остаток клиента."""
+    return settings.tool_timeout if requested is None else min(settings.tool_timeout, requested)
+
+
+async def run_with_deadline(budget: float, call: Callable[[], Awaitable[T]]) -> T:
+    """Выполнить вызов инструмента не дольше ``budget`` секунд.
+
+    Внутри вызова HTTP таймауты и ожидание в очередях урезаются до остатка
+    (``clamp``), а по истечении бюджета вся работа вызова отменяется:
+    ответа уже никто не ждёт.
+
+    Raises:
+        ToolError: Время вышло.
+    """
+    with scope(budget):
+        try:
+            async with asyncio.timeout(budget):
+                return await call()
+        except TimeoutError:
+            raise ToolError(f"Превышено время ожидания ответа ({budget:g} с)")
+
+
+def _requested_timeout(context: MiddlewareContext) -> Optional[float]:
+    """Остаток времени клиента из ``_meta.timeout`` запроса, если клиент его передал."""
+    try:
+        meta = context.fastmcp_context.request_context.meta
+    except (AttributeError, LookupError, ValueError):
+        return None
+    timeout = getattr(meta, "timeout", None) if meta is not None else None
+    return float(timeout) if isinstance(timeout, (int, float)) and timeout > 0 else None
+
+
+class DeadlineMiddleware(Middleware):
+    """Дедлайн на каждый вызов инструмента.
+
+    Бюджет — ``settings.tool_timeout`` или меньший остаток времени, который
+    клиент передал в ``_meta.timeout`` (см. ``run_with_deadline``).
+    """
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: Any) -> Any:
+        budget = tool_budget(_requested_timeout(context))
+        return await run_with_deadline(budget, lambda: call_next(context))
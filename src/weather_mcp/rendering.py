@@ -0,0 +1,358 @@
+import sys
+import json
+from pathlib import Path
+from typing import Any, Iterable, Optional, Sequence
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path / 'src'))
+
+from utils.config import settings
+
+
+FORMAT_TEXT = "text"
+FORMAT_JSON = "json"
+
+
+# Шаблоны текстовых ответов MCP инструментов. Методы ``format`` связываются
+# один раз при импорте, а ответ собирается из частей одним ``"".join``.
+MISSING = "N/A"
+
+_COORDINATES = (
+    "📍 Координаты для {name}:\n\n"
+    "🌍 Широта: {lat}\n"
+    "🌍 Долгота: {lon}\n"
+    "📍 Полное название: {name}"
+).format
+
+_FORECAST_HEADER = "🌤️ Прогноз погоды для {place}\n\n".format
+_CURRENT_HEADER = "🌤️ Текущая погода для {place}\n\n".format
+_HISTORY_HEADER = "📊 Исторические данные о погоде для {place}\n📅 Период: {start} - {end}\n\n".format
+_BATCH_HEADER = "🌤️ Прогноз погоды для {count} точек\n".format
+
+_CURRENT_FORECAST = (
+    "📍 Текущая погода:\n"
+    "🌡️ Температура: {temperature}°C\n"
+    "💨 Скорость ветра: {wind_speed} км/ч\n"
+    "📅 Время: {time}\n\n"
+).format
+
+_CURRENT_ONLY = (
+    "📍 Сейчас:\n"
+    "🌡️ Температура: {temperature}°C\n"
+    "💨 Скорость ветра: {wind_speed} км/ч\n"
+    "📅 Время: {time}\n"
+    "🔢 Код погоды: {weather_code}\n\n"
+).format
+
+_DAILY_HEADER = "📈 {title} {count} дн.:\n".format
+
+# Поля дня в порядке позиционных аргументов шаблонов ниже
+_DAY_FIELDS = ("date", "temperature_min", "temperature_max", "precipitation", "wind_speed_max")
+
+_DAY = (
+    "📅 {0}:\n"
+    "  🌡️ {1}°C - {2}°C\n"
+    "  🌧️ Осадки: {3} мм\n"
+    "  💨 Макс. ветер: {4} км/ч\n\n"
+).format
+
+_DAY_LINE = "📅 {0}: {1}°C - {2}°C, осадки {3} мм, ветер до {4} км/ч\n".format
+
+# Компактная таблица для длинных периодов: заголовок колонок один раз на весь ответ
+_TABLE_HEADER = "Дата | Мин °C | Макс °C | Осадки мм | Ветер км/ч\n"
+_TABLE_ROW = "{0} | {1} | {2} | {3} | {4}\n".format
+
+_BATCH_POINT = "\n📍 {lat}, {lon}\n".format
+_BATCH_CURRENT = "🌡️ Сейчас: {temperature}°C, ветер {wind_speed} км/ч\n".format
+_BATCH_ERROR = "❌ Ошибка при получении погоды: {error}\n".format
+
+_STATISTICS_HEADER = "📊 Статистика погоды для {place}\n📅 Период: {start} - {end} ({days} дн.)\n\n".format
+_STATISTICS_TEMPERATURE = "🌡️ {title}: средняя {mean}°C, от {min} до {max}°C{percentiles}\n".format
+_STATISTICS_PRECIPITATION = "🌧️ Осадки: всего {total} мм, макс. {max} мм за день, дней с осадками ≥ {threshold} мм: {days_above}\n".format
+_STATISTICS_WIND = "💨 Ветер: средний максимум {mean} км/ч, наибольший {max} км/ч\n".format
+_STATISTICS_ABOVE = "🔥 Дней с максимумом выше {threshold}°C: {count}\n".format
+_STATISTICS_BELOW = "❄️ Дней с минимумом ниже {threshold}°C: {count}\n".format
+_GROUPS_HEADER = "\n📈 По {title}:\nПериод | Tmax ср °C | Tmin ср °C | Осадки мм | Дней с осадками\n".format
+_GROUP_ROW = "{0} | {1} | {2} | {3} | {4}\n".format
+_GROUP_TITLES = {"week": "неделям", "month": "месяцам"}
+
+_HOURLY_HEADER = "⏱️ По {hours} ч:\nВремя | T мин…макс °C | Осадки мм | Ветер макс км/ч | Код погоды\n".format
+_HOURLY_ROW = "{0} | {1}…{2} | {3} | {4} | {5}\n".format
+_HOURLY_FIELDS = ("time", "temperature_min", "temperature_max", "precipitation", "wind_speed_max", "weather_code")
+
+_STALE = "⚠️ Данные устарели: источник недоступен ({reason}). Показаны последние известные данные на {as_of}\n\n".format
+_BATCH_STALE = "⚠️ Устаревшие данные на {as_of}\n".format
+
+_TIMEZONE = "🕒 Часовой пояс: {timezone}".format
+_POINT = "📍 Координаты: {lat}, {lon}".format
+
+
+def _value(value: Any) -> Any:
+    return MISSING if value is None else value
+
+
+def _fields(record: dict[str, Any], names: Iterable[str]) -> dict[str, Any]:
+    return {name: _value(record.get(name)) for name in names}
+
+
+def _day_columns(daily: Any, fields: Sequence[str] = _DAY_FIELDS) -> list[Sequence[Any]]:
+    """Колонки для позиционных шаблонов; пропуски заменяются на N/A."""
+    count = len(daily)
+    columns = []
+    for field in fields:
+        column = daily.column(field)
+        if column is None:
+            columns.append((MISSING,) * count)
+        else:
+            columns.append([MISSING if value is None else value for value in column])
+    return columns
+
+
+def _daily_rows(daily: Any, template) -> Iterable[str]:
+    return map(template, *_day_columns(daily))
+
+
+def _daily_block(daily: Any, title: str, table: Optional[bool]) -> list[str]:
+    """Заголовок и строки дней: подробно или компактной таблицей для длинных периодов."""
+    if not daily:
+        return []
+
+    if table is None:
+        table = len(daily) > settings.render_table_threshold
+
+    parts = [_DAILY_HEADER(title=title, count=len(daily))]
+    if table:
+        parts.append(_TABLE_HEADER)
+        parts.extend(_daily_rows(daily, _TABLE_ROW))
+        parts.append("\n")
+    else:
+        parts.extend(_daily_rows(daily, _DAY))
+    return parts
+
+
+def _hourly_block(data: dict[str, Any]) -> list[str]:
+    """Агрегированные почасовые данные (``HourlyBuckets``), если они есть в ответе."""
+    hourly = data.get("hourly")
+    if not hourly or not hasattr(hourly, "hours"):
+        return []
+    parts = [_HOURLY_HEADER(hours=hourly.hours)]
+    parts.extend(map(_HOURLY_ROW, *_day_columns(hourly, _HOURLY_FIELDS)))
+    parts.append("\n")
+    return parts
+
+
+def _stale_block(data: dict[str, Any]) -> list[str]:
+    """Предупреждение, если данные отданы из кеша после ошибки апстрима."""
+    stale = data.get("stale")
+    return [_STALE(**stale)] if stale else []
+
+
+def _footer(data: dict[str, Any], lat: Optional[float], lon: Optional[float]) -> list[str]:
+    parts = []
+    if "location" in data:
+        parts.append(_TIMEZONE(timezone=_value(data["location"].get("timezone"))))
+    if lat is not None and lon is not None:
+        if parts:
+            parts.append("\n")
+        parts.append(_POINT(lat=lat, lon=lon))
+    return parts
+
+
+def place_for(lat: float, lon: float, display_name: Optional[str] = None) -> str:
+    """Подпись места в заголовке ответа."""
+    return display_name or f"координат {lat}, {lon}"
+
+
+def render_coordinates(name: str, lat: float, lon: float, stale: Optional[dict[str, str]] = None) -> str:
+    coordinates = _COORDINATES(name=name, lat=lat, lon=lon)
+    return _STALE(**stale) + coordinates if stale else coordinates
+
+
+def render_forecast(place: str, data: dict[str, Any], table: Optional[bool] = None) -> str:
+    """Прогноз: текущая погода, дни прогноза и часовой пояс."""
+    parts = [_FORECAST_HEADER(place=place)]
+    parts.extend(_stale_block(data))
+    if "current" in data:
+        parts.append(_CURRENT_FORECAST(**_fields(data["current"], ("temperature", "wind_speed", "time"))))
+    parts.extend(_daily_block(data.get("daily_forecast"), "Прогноз на", table))
+    parts.extend(_hourly_block(data))
+    parts.extend(_footer(data, None, None))
+    return "".join(parts)
+
+
+def render_current(
+    place: str,
+    data: dict[str, Any],
+    lat: Optional[float] = None,
+    lon: Optional[float] = None
+) -> str:
+    """Только текущая погода; координаты добавляются, если переданы."""
+    current = _fields(data["current"], ("temperature", "wind_speed", "time", "weather_code"))
+    parts = [_CURRENT_HEADER(place=place), *_stale_block(data), _CURRENT_ONLY(**current)]
+    parts.extend(_footer(data, lat, lon))
+    return "".join(parts)
+
+
+def render_history(
+    place: str,
+    start_date: str,
+    end_date: str,
+    data: dict[str, Any],
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    table: Optional[bool] = None
+) -> str:
+    """Исторические данные за период; длинные периоды выводятся таблицей."""
+    parts = [_HISTORY_HEADER(place=place, start=start_date, end=end_date)]
+    parts.extend(_daily_block(data.get("daily_forecast"), "Данные за", table))
+    parts.extend(_hourly_block(data))
+    parts.extend(_footer(data, lat, lon))
+    return "".join(parts)
+
+
+def render_batch(points: Sequence[tuple[float, float]], results: Sequence[dict[str, Any]]) -> str:
+    """Прогноз для нескольких точек: по одной строке на день."""
+    parts = [_BATCH_HEADER(count=len(points))]
+    for (lat, lon), result in zip(points, results):
+        parts.append(_BATCH_POINT(lat=lat, lon=lon))
+        if not result.get("success"):
+            parts.append(_BATCH_ERROR(error=result.get("error", "Неизвестная ошибка получения погоды")))
+            continue
+
+        data = result["data"]
+        if data.get("stale"):
+            parts.append(_BATCH_STALE(as_of=data["stale"]["as_of"]))
+        if "current" in data:
+            parts.append(_BATCH_CURRENT(**_fields(data["current"], ("temperature", "wind_speed"))))
+        daily = data.get("daily_forecast")
+        if daily:
+            parts.extend(_daily_rows(daily, _DAY_LINE))
+    return "".join(parts)
+
+
+def _temperature_line(title: str, stats: dict[str, Any]) -> str:
+    percentiles = ", ".join(
+        f"{name.upper()} {_value(value)}" for name, value in stats.items() if name.startswith("p")
+    )
+    return _STATISTICS_TEMPERATURE(
+        title=title,
+        mean=_value(stats["mean"]),
+        min=_value(stats["min"]),
+        max=_value(stats["max"]),
+        percentiles=f"; {percentiles}" if percentiles else ""
+    )
+
+
+def render_statistics(
+    place: str,
+    start_date: str,
+    end_date: str,
+    statistics: dict[str, Any],
+    precipitation_above: float,
+    temperature_above: Optional[float] = None,
+    temperature_below: Optional[float] = None,
+    group_by: Optional[str] = None
+) -> str:
+    """Сводная статистика за период и, при группировке, таблица по неделям/месяцам."""
+    summary = statistics["summary"]
+    parts = [
+        _STATISTICS_HEADER(place=place, start=start_date, end=end_date, days=summary["days"]),
+        _temperature_line("Макс. температура", summary["temperature_max"]),
+        _temperature_line("Мин. температура", summary["temperature_min"]),
+        _STATISTICS_PRECIPITATION(threshold=precipitation_above, **_fields(
+            summary["precipitation"], ("total", "max", "days_above")
+        )),
+        _STATISTICS_WIND(**_fields(summary["wind_speed_max"], ("mean", "max")))
+    ]
+    if temperature_above is not None:
+        parts.append(_STATISTICS_ABOVE(threshold=temperature_above, count=summary["days_temperature_max_above"]))
+    if temperature_below is not None:
+        parts.append(_STATISTICS_BELOW(threshold=temperature_below, count=summary["days_temperature_min_below"]))
+
+    groups = statistics.get("groups")
+    if groups:
+        parts.append(_GROUPS_HEADER(title=_GROUP_TITLES.get(group_by, group_by)))
+        parts.extend(
+            _GROUP_ROW(
+                group["label"],
+                _value(group["temperature_max"]["mean"]),
+                _value(group["temperature_min"]["mean"]),
+                _value(group["precipitation"]["total"]),
+                group["precipitation"]["days_above"]
+            )
+            for group in groups
+        )
+    return "".join(parts)
+
+
+def use_json(output_format: Optional[str]) -> bool:
+    """Нужен ли структурированный ответ: аргумент инструмента или настройка сервера."""
+    return (output_format or settings.tool_output_format) == FORMAT_JSON
+
+
+def render_json(payload: dict[str, Any]) -> str:
+    """Компактный JSON без пробелов и экранирования кириллицы."""
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def daily_payload(daily: Any) -> dict[str, list]:
+    """Ряд в колоночном виде: одна колонка на поле, без повторения ключей в каждой строке."""
+    payload = {}
+    for field in daily.fields:
+        column = daily.column(field)
+        if column is not None:
+            payload[field] = list(column)
+    return payload
+
+
+def location_payload(
+    data: dict[str, Any],
+    lat: float,
+    lon: float,
+    name: Optional[str] = None
+) -> dict[str, Any]:
+    location = {"lat": lat, "lon": lon}
+    if name:
+        location["name"] = name
+    timezone = (data.get("location") or {}).get("timezone")
+    if timezone:
+        location["timezone"] = timezone
+    return location
+
+
+def weather_payload(
+    data: dict[str, Any],
+    lat: float,
+    lon: float,
+    name: Optional[str] = None,
+    current: bool = True,
+    daily: bool = True
+) -> dict[str, Any]:
+    """Структурированный ответ с блоками location, current и daily.
+
+    Данные из кеша, отданные после ошибки апстрима, помечены блоком ``stale``.
+    """
+    payload = {"location": location_payload(data, lat, lon, name)}
+    if data.get("stale"):
+        payload["stale"] = data["stale"]
+    if current and "current" in data:
+        payload["current"] = data["current"]
+    if daily and data.get("daily_forecast"):
+        payload["daily"] = daily_payload(data["daily_forecast"])
+    hourly = data.get("hourly")
+    if hourly is not None and hasattr(hourly, "hours"):
+        payload["hourly"] = {"hours": hourly.hours, **daily_payload(hourly)}
+    return payload
+
+
+def batch_payload(points: Sequence[tuple[float, float]], results: Sequence[dict[str, Any]]) -> dict[str, Any]:
+    items = []
+    for (lat, lon), result in zip(points, results):
+        if result.get("success"):
+            items.append(weather_payload(result["data"], lat, lon))
+        else:
+            items.append({
+                "location": {"lat": lat, "lon": lon},
+                "error": result.get("error", "Неизвестная ошибка получения погоды")
+            })
+    return {"points": items}
@@ -1,9 +1,19 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Any
+from typing import Optional, Any, Literal
+
+# Формат ответа MCP инструментов: текст для человека или компактный JSON
+OutputFormat = Literal["text", "json"]
+
+# Группировка дней в статистике погоды
+StatisticsGrouping = Literal["week", "month"]
 
 class GeocodeRequest(BaseModel):
     city: str = Field(..., description="Название города")
 
+class Coordinates(BaseModel):
+    lat: float = Field(..., ge=-90, le=90, description="Широта")
+    lon: float = Field(..., ge=-180, le=180, description="Долгота")
+
 class WeatherRequest(BaseModel):
     lat: float = Field(..., description="Широта")
     lon: float = Field(..., description="Долгота")
@@ -0,0 +1,223 @@
+from typing import Any, Iterator, Optional, Sequence
+
+import numpy as np
+
+
+class ColumnarSeries:
+    """Ряд значений Open-Meteo в колоночном виде.
+
+    Хранит колонки ответа API как есть, без копирования, и отдаёт их
+    списками (``column``) или массивами NumPy (``values``, создаются лениво
+    и запоминаются). Для совместимости ведёт себя как список словарей:
+    ``len()``, индексация и итерация строят строки только по запросу.
+
+    ``FIELDS`` сопоставляет имена полей результата с именами колонок API.
+    """
+
+    __slots__ = ("_columns", "_arrays", "_length")
+
+    FIELDS: dict[str, str] = {}
+    TIME_FIELD = "date"
+    TIME_DTYPE = "datetime64[D]"
+
+    def __init__(self, columns: dict[str, Sequence[Any]]):
+        self._columns = columns
+        self._arrays: dict[str, np.ndarray] = {}
+        self._length = len(columns.get(self.FIELDS[self.TIME_FIELD]) or ())
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int | slice) -> dict[str, Any] | list[dict[str, Any]]:
+        if isinstance(index, slice):
+            return [self.row(i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("индекс ряда вне диапазона")
+        return self.row(index)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        columns = self._field_columns()
+        for i in range(self._length):
+            yield {field: column[i] if column is not None else None for field, column in columns}
+
+    def __eq__(self, other: object) -> bool:
+        if hasattr(other, "to_list"):
+            return self.to_list() == other.to_list()
+        if isinstance(other, list):
+            return self.to_list() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._length} rows)"
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        return tuple(self.FIELDS)
+
+    def column(self, field: str) -> Optional[Sequence[Any]]:
+        """Исходная колонка API для поля результата или None, если её нет в ответе."""
+        return self._columns.get(self.FIELDS[field])
+
+    def raw_columns(self) -> dict[str, Sequence[Any]]:
+        """Исходные колонки ответа API без копирования, например для сериализации."""
+        return self._columns
+
+    def values(self, field: str) -> np.ndarray:
+        """Колонка как массив NumPy; пропуски (None) становятся NaN.
+
+        Поле времени возвращается как ``datetime64``.
+        """
+        array = self._arrays.get(field)
+        if array is None:
+            column = self.column(field)
+            if column is None:
+                array = np.full(self._length, np.nan)
+            elif field == self.TIME_FIELD:
+                array = np.array(column, dtype=self.TIME_DTYPE)
+            else:
+                array = np.array(column, dtype=float)
+            self._arrays[field] = array
+        return array
+
+    def row(self, i: int) -> dict[str, Any]:
+        return {field: column[i] if column is not None else None for field, column in self._field_columns()}
+
+    def to_list(self) -> list[dict[str, Any]]:
+        """Построчное представление (список словарей), например для JSON."""
+        return list(self)
+
+    def _field_columns(self) -> list[tuple[str, Optional[Sequence[Any]]]]:
+        return [(field, self.column(field)) for field in self.FIELDS]
+
+
+def _column(values: np.ndarray) -> list[Optional[float]]:
+    """Массив NumPy в список для вывода: один знак после запятой, NaN → None."""
+    rounded = np.round(values, 1)
+    return [None if value != value else value for value in rounded.tolist()]
+
+
+class DailySeries(ColumnarSeries):
+    """Дневные значения (блок ``daily`` ответа Open-Meteo)."""
+
+    __slots__ = ()
+
+    FIELDS = {
+        "date": "time",
+        "temperature_max": "temperature_2m_max",
+        "temperature_min": "temperature_2m_min",
+        "precipitation": "precipitation_sum",
+        "weather_code": "weather_code",
+        "wind_speed_max": "wind_speed_10m_max"
+    }
+
+
+# Допустимые интервалы агрегации почасовых данных: делители суток
+HOURLY_STEPS = (1, 2, 3, 4, 6, 8, 12, 24)
+
+
+def choose_hourly_step(requested: int, hours: int, max_buckets: int) -> int:
+    """Наименьший допустимый интервал не меньше запрошенного, при котором
+    интервалов не больше ``max_buckets`` (но не крупнее суток)."""
+    for step in HOURLY_STEPS:
+        if step >= requested and hours / step <= max_buckets:
+            return step
+    return HOURLY_STEPS[-1]
+
+
+class HourlySeries(ColumnarSeries):
+    """Почасовые значения (блок ``hourly`` ответа Open-Meteo).
+
+    Почасовых данных в 24 раза больше дневных, поэтому наружу они отдаются
+    только агрегированными по интервалам (``downsample``).
+    """
+
+    __slots__ = ()
+
+    FIELDS = {
+        "time": "time",
+        "temperature": "temperature_2m",
+        "humidity": "relative_humidity_2m",
+        "precipitation": "precipitation",
+        "wind_speed": "wind_speed_10m",
+        "weather_code": "weather_code"
+    }
+    TIME_FIELD = "time"
+    TIME_DTYPE = "datetime64[m]"
+
+    def downsample(self, hours: int) -> "HourlyBuckets":
+        """Свернуть часы в интервалы по ``hours`` часов, выровненные по полуночи.
+
+        Для температуры считаются минимум, среднее и максимум, для влажности —
+        среднее, для осадков — сумма, для ветра — среднее и максимум, для кода
+        погоды — наибольший (самый неблагоприятный) код. Пропуски не учитываются.
+        """
+        if not self._length:
+            return HourlyBuckets({field: [] for field in HourlyBuckets.FIELDS})
+
+        hour = self.values("time").astype("datetime64[h]").astype("int64")
+        bucket = hour - hour % hours
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+
+        def reduce(field: str):
+            values = self.values(field)
+            known = ~np.isnan(values)
+            counts = np.add.reduceat(known, starts)
+            sums = np.add.reduceat(np.where(known, values, 0.0), starts)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means = np.where(counts > 0, sums / counts, np.nan)
+            return (
+                np.fmin.reduceat(values, starts),
+                means,
+                np.fmax.reduceat(values, starts),
+                np.where(counts > 0, sums, np.nan)
+            )
+
+        temperature_min, temperature_mean, temperature_max, _ = reduce("temperature")
+        _, humidity_mean, _, _ = reduce("humidity")
+        _, _, _, precipitation = reduce("precipitation")
+        _, wind_mean, wind_max, _ = reduce("wind_speed")
+        _, _, weather_code, _ = reduce("weather_code")
+
+        times = bucket[starts].astype("datetime64[h]").astype("datetime64[m]")
+        return HourlyBuckets({
+            "time": [str(value) for value in times],
+            "hours": hours,
+            "temperature_min": _column(temperature_min),
+            "temperature_mean": _column(temperature_mean),
+            "temperature_max": _column(temperature_max),
+            "humidity_mean": _column(humidity_mean),
+            "precipitation": _column(precipitation),
+            "wind_speed_mean": _column(wind_mean),
+            "wind_speed_max": _column(wind_max),
+            "weather_code": [None if code is None else int(code) for code in _column(weather_code)]
+        })
+
+
+class HourlyBuckets(ColumnarSeries):
+    """Почасовые данные, агрегированные по интервалам ``HourlySeries.downsample``."""
+
+    __slots__ = ()
+
+    FIELDS = {
+        name: name
+        for name in (
+            "time",
+            "temperature_min",
+            "temperature_mean",
+            "temperature_max",
+            "humidity_mean",
+            "precipitation",
+            "wind_speed_mean",
+            "wind_speed_max",
+            "weather_code"
+        )
+    }
+    TIME_FIELD = "time"
+    TIME_DTYPE = "datetime64[m]"
+
+    @property
+    def hours(self) -> int:
+        """Длина интервала, часы."""
+        return self._columns["hours"]
@@ -1,30 +1,143 @@
 import sys
 import logging
 from pathlib import Path
+from typing import AsyncIterator, Optional
+from contextlib import asynccontextmanager
 from fastmcp import FastMCP
 from datetime import date, datetime
 
 root_path = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(root_path / 'src'))
 
-from weather_mcp.tools.geo import GeocodingService
-from weather_mcp.tools.weather import WeatherService
+from utils.config import settings
+from weather_mcp.schemas import Coordinates, OutputFormat, StatisticsGrouping
+from weather_mcp.statistics import summarize
+from weather_mcp.series import HOURLY_STEPS, choose_hourly_step
+from weather_mcp.rendering import (
+    batch_payload,
+    location_payload,
+    place_for,
+    render_batch,
+    render_coordinates,
+    render_current,
+    render_forecast,
+    render_history,
+    render_json,
+    render_statistics,
+    use_json,
+    weather_payload
+)
+from weather_mcp.services import ServiceContainer
+from weather_mcp.deadline import DeadlineMiddleware
 
 logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
 
-mcp = FastMCP("weather-agent")
+services = ServiceContainer()
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[ServiceContainer]:
+    """Создаёт общие пулы соединений при старте сервера и закрывает их при остановке"""
+    async with services.running():
+        yield services
+
+
+mcp = FastMCP("weather-agent", lifespan=lifespan, middleware=[DeadlineMiddleware()])
+
+
+def create_http_app(path: Optional[str] = None):
+    """ASGI приложение MCP сервера с транспортом streamable HTTP.
+
+    В режиме HTTP lifespan FastMCP выполняется на каждую сессию клиента,
+    поэтому приложение дополнительно держит контейнер сервисов запущенным
+    всё время работы процесса: пулы соединений, планировщик Nominatim
+    и кеши общие для всех подключённых агентов и не пересоздаются между
+    сессиями.
+
+    Сессии MCP хранятся в памяти процесса, поэтому при нескольких воркерах
+    (``settings.server_workers``) приложение работает без сессий: любой
+    запрос клиента может обработать любой воркер.
+
+    Args:
+        path: Путь MCP эндпоинта. По умолчанию ``settings.mcp_path``.
+    """
+    app = mcp.http_app(path=path or settings.mcp_path, stateless_http=settings.server_workers > 1)
+    session_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def app_lifespan(app) -> AsyncIterator[None]:
+        async with services.running():
+            async with session_lifespan(app):
+                yield
+
+    app.router.lifespan_context = app_lifespan
+    return app
+
+
+def parse_history_period(start_date: str, end_date: str, hourly_step: Optional[int] = None) -> tuple[date, date]:
+    """Разобрать и проверить период исторических данных.
+
+    С ``hourly_step`` проверяются также шаг и допустимая длина почасовой истории.
+
+    Raises:
+        ValueError: С готовым для ответа сообщением об ошибке.
+    """
+    try:
+        start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError("❌ Неверный формат даты. Используйте YYYY-MM-DD (например: 2024-01-01)")
+
+    today = date.today()
+    if start_date_obj >= today or end_date_obj >= today:
+        raise ValueError("❌ Исторические данные доступны только для прошедших дат")
+
+    if start_date_obj > end_date_obj:
+        raise ValueError("❌ Начальная дата должна быть раньше конечной")
+
+    # Длинные периоды запрашиваются частями параллельно, но не бесконечно
+    if (end_date_obj - start_date_obj).days >= settings.historical_max_days:
+        raise ValueError(f"❌ Максимальный период для исторических данных: {settings.historical_max_days} дней")
+
+    if hourly_step is not None:
+        step_error = check_hourly_step(hourly_step)
+        if step_error:
+            raise ValueError(step_error)
+        if (end_date_obj - start_date_obj).days >= settings.historical_hourly_max_days:
+            raise ValueError(
+                f"❌ Максимальный период почасовых исторических данных: {settings.historical_hourly_max_days} дней"
+            )
+
+    return start_date_obj, end_date_obj
+
+
+def check_hourly_step(hourly_step: Optional[int]) -> Optional[str]:
+    """Сообщение об ошибке, если шаг почасовых данных недопустим."""
+    if hourly_step is not None and hourly_step not in HOURLY_STEPS:
+        return f"❌ Шаг почасовых данных должен быть одним из: {', '.join(map(str, HOURLY_STEPS))}"
+    return None
+
+
+def downsample_hourly(weather_data: dict, hourly_step: Optional[int]) -> dict:
+    """Заменить почасовой ряд агрегатами по интервалам; размер ответа ограничен настройками."""
+    hourly = weather_data.get("hourly")
+    if not hourly_step or hourly is None:
+        return weather_data
+    step = choose_hourly_step(hourly_step, len(hourly), settings.hourly_max_buckets)
+    return {**weather_data, "hourly": hourly.downsample(step)}
 
 
 @mcp.tool()
-async def get_coord(city: str) -> str:
+async def get_coord(city: str, output_format: Optional[OutputFormat] = None) -> str:
     """Получить координаты города для дальнейшего использования
 
     Args:
         city: Название города
+        output_format: Формат ответа: "text" — текст для человека, "json" — компактные
+            структурированные данные. По умолчанию берётся из настроек сервера
     """
     try:
-        geo = GeocodingService()
-        geo_result = await geo.get_coordinates(city)
+        geo_result = await services.geo.get_coordinates(city)
 
         if not geo_result.get("success"):
             error_msg = geo_result.get("error", "Неизвестная ошибка геокодирования")
@@ -42,12 +155,13 @@ async def get_coord(city: str) -> str:
         if not lat or not lon:
             return f"Некорректные координаты для города '{city}'"
 
-        response_text = f"📍 Координаты для {city_display_name}:\n\n"
-        response_text += f"🌍 Широта: {lat}\n"
-        response_text += f"🌍 Долгота: {lon}\n"
-        response_text += f"📍 Полное название: {city_display_name}"
-
-        return response_text
+        stale = geo_data.get("stale")
+        if use_json(output_format):
+            payload = {"name": city_display_name, "lat": lat, "lon": lon}
+            if stale:
+                payload["stale"] = stale
+            return render_json(payload)
+        return render_coordinates(city_display_name, lat, lon, stale)
 
     except Exception as e:
         error_details = f"Ошибка в get_coord: {type(e).__name__}: {str(e)}"
@@ -56,20 +170,34 @@ async def get_coord(city: str) -> str:
 
 
 @mcp.tool()
-async def get_weather(lat: float, lon: float, count_days: int = 1) -> str:
+async def get_weather(
+    lat: float,
+    lon: float,
+    count_days: int = 1,
+    hourly_step: Optional[int] = None,
+    output_format: Optional[OutputFormat] = None
+) -> str:
     """Получить прогноз погоды по координатам
 
     Args:
         lat: Широта (например: 55.7558 для Москвы)
         lon: Долгота (например: 37.6176 для Москвы)
         count_days: Количество дней для прогноза (1-16)
+        hourly_step: Добавить почасовые данные, агрегированные по интервалам в часах
+            (1, 2, 3, 4, 6, 8, 12 или 24): мин/макс температуры, сумма осадков, макс. ветер.
+            Для длинных периодов интервал укрупняется автоматически
+        output_format: Формат ответа: "text" — текст для человека, "json" — компактные
+            структурированные данные. По умолчанию берётся из настроек сервера
     """
     if not 1 <= count_days <= 16:
         return "Количество дней должно быть от 1 до 16"
 
+    step_error = check_hourly_step(hourly_step)
+    if step_error:
+        return step_error
+
     try:
-        weather = WeatherService()
-        weather_result = await weather.get_weather(lat, lon, count_days)
+        weather_result = await services.weather.get_weather(lat, lon, count_days, hourly=hourly_step is not None)
 
         if not weather_result.get("success"):
             error_msg = weather_result.get("error", "Неизвестная ошибка получения погоды")
@@ -80,34 +208,10 @@ async def get_weather(lat: float, lon: float, count_days: int = 1) -> str:
         if not weather_data:
             return f"Не удалось получить данные о погоде для координат {lat}, {lon}"
 
-        response_text = f"🌤️ Прогноз погоды для координат {lat}, {lon}\n\n"
-
-        if "current" in weather_data:
-            current = weather_data["current"]
-            response_text += f"📍 Текущая погода:\n"
-            response_text += f"🌡️ Температура: {current.get('temperature', 'N/A')}°C\n"
-            response_text += f"💨 Скорость ветра: {current.get('wind_speed', 'N/A')} км/ч\n"
-            response_text += f"📅 Время: {current.get('time', 'N/A')}\n\n"
-
-        if "daily_forecast" in weather_data and weather_data["daily_forecast"]:
-            response_text += f"📈 Прогноз на {len(weather_data['daily_forecast'])} дн.:\n"
-            for day in weather_data['daily_forecast']:
-                date_str = day.get('date', 'N/A')
-                temp_max = day.get('temperature_max', 'N/A')
-                temp_min = day.get('temperature_min', 'N/A')
-                precipitation = day.get('precipitation', 'N/A')
-                wind_max = day.get('wind_speed_max', 'N/A')
-
-                response_text += f"📅 {date_str}:\n"
-                response_text += f"  🌡️ {temp_min}°C - {temp_max}°C\n"
-                response_text += f"  🌧️ Осадки: {precipitation} мм\n"
-                response_text += f"  💨 Макс. ветер: {wind_max} км/ч\n\n"
-
-        if "location" in weather_data:
-            location = weather_data["location"]
-            response_text += f"🕒 Часовой пояс: {location.get('timezone', 'N/A')}"
-
-        return response_text
+        weather_data = downsample_hourly(weather_data, hourly_step)
+        if use_json(output_format):
+            return render_json(weather_payload(weather_data, lat, lon))
+        return render_forecast(place_for(lat, lon), weather_data)
 
     except Exception as e:
         error_details = f"Ошибка в get_weather: {type(e).__name__}: {str(e)}"
@@ -195,16 +299,17 @@ async def get_weather(lat: float, lon: float, count_days: int = 1) -> str:
 
 
 @mcp.tool()
-async def get_current_weather(lat: float, lon: float) -> str:
+async def get_current_weather(lat: float, lon: float, output_format: Optional[OutputFormat] = None) -> str:
     """Получить только текущую погоду по координатам (без прогноза)
 
     Args:
         lat: Широта (например: 55.7558 для Москвы)
         lon: Долгота (например: 37.6176 для Москвы)
+        output_format: Формат ответа: "text" — текст для человека, "json" — компактные
+            структурированные данные. По умолчанию берётся из настроек сервера
     """
     try:
-        weather = WeatherService()
-        weather_result = await weather.get_weather(lat, lon, forecast_days=1, include_current=True)
+        weather_result = await services.weather.get_weather(lat, lon, forecast_days=1, include_current=True)
 
         if not weather_result.get("success"):
             error_msg = weather_result.get("error", "Неизвестная ошибка получения погоды")
@@ -215,23 +320,12 @@ async def get_current_weather(lat: float, lon: float) -> str:
         if not weather_data:
             return f"Не удалось получить данные о текущей погоде для координат {lat}, {lon}"
 
-        response_text = f"🌤️ Текущая погода для координат {lat}, {lon}\n\n"
-
-        if "current" in weather_data:
-            current = weather_data["current"]
-            response_text += f"📍 Сейчас:\n"
-            response_text += f"🌡️ Температура: {current.get('temperature', 'N/A')}°C\n"
-            response_text += f"💨 Скорость ветра: {current.get('wind_speed', 'N/A')} км/ч\n"
-            response_text += f"📅 Время: {current.get('time', 'N/A')}\n"
-            response_text += f"🔢 Код погоды: {current.get('weather_code', 'N/A')}\n\n"
-        else:
+        if "current" not in weather_data:
             return "❌ Текущие данные о погоде недоступны"
 
-        if "location" in weather_data:
-            location = weather_data["location"]
-            response_text += f"🕒 Часовой пояс: {location.get('timezone', 'N/A')}"
-
-        return response_text
+        if use_json(output_format):
+            return render_json(weather_payload(weather_data, lat, lon, daily=False))
+        return render_current(place_for(lat, lon), weather_data)
 
     except Exception as e:
         error_details = f"Ошибка в get_current_weather: {type(e).__name__}: {str(e)}"
@@ -239,8 +333,58 @@ async def get_current_weather(lat: float, lon: float) -> str:
         return f"Произошла ошибка при получении текущей погоды: {str(e)}"
 
 
+@mcp.tool()
+async def get_weather_batch(
+    points: list[Coordinates],
+    count_days: int = 1,
+    output_format: Optional[OutputFormat] = None
+) -> str:
+    """Получить прогноз погоды сразу для нескольких точек (например, для сравнения городов)
+
+    Args:
+        points: Список координат, например [{"lat": 55.7558, "lon": 37.6176}, {"lat": 59.9386, "lon": 30.3141}]
+        count_days: Количество дней для прогноза (1-16)
+        output_format: Формат ответа: "text" — текст для человека, "json" — компактные
+            структурированные данные. По умолчанию берётся из настроек сервера
+    """
+    if not 1 <= count_days <= 16:
+        return "Количество дней должно быть от 1 до 16"
+
+    if not points:
+        return "❌ Список координат пуст"
+
+    if len(points) > settings.forecast_batch_max_points:
+        return f"❌ Максимальное количество точек: {settings.forecast_batch_max_points}"
+
+    try:
+        batch_result = await services.weather.get_weather_many(
+            [(point.lat, point.lon) for point in points], count_days
+        )
+
+        for weather_result in batch_result["data"]:
+            if not weather_result.get("success"):
+                logging.error(f"Weather error: {weather_result.get('error')}")
+
+        coordinates = [(point.lat, point.lon) for point in points]
+        if use_json(output_format):
+            return render_json(batch_payload(coordinates, batch_result["data"]))
+        return render_batch(coordinates, batch_result["data"])
+
+    except Exception as e:
+        error_details = f"Ошибка в get_weather_batch: {type(e).__name__}: {str(e)}"
+        logging.error(error_details)
+        return f"Произошла ошибка при получении погоды: {str(e)}"
+
+
 @mcp.tool()  
-async def get_historical_weather(lat: float, lon: float, start_date: str, end_date: str) -> str:
+async def get_historical_weather(
+    lat: float,
+    lon: float,
+    start_date: str,
+    end_date: str,
+    hourly_step: Optional[int] = None,
+    output_format: Optional[OutputFormat] = None
+) -> str:
     """Получить исторические данные о погоде по координатам
 
     Args:
@@ -248,30 +392,21 @@ async def get_historical_weather(lat: float, lon: float, start_date: str, end_da
         lon: Долгота (например: 37.6176 для Москвы)
         start_date: Начальная дата в формате YYYY-MM-DD (например: 2024-01-01)
         end_date: Конечная дата в формате YYYY-MM-DD (например: 2024-01-07)
+        hourly_step: Добавить почасовые данные, агрегированные по интервалам в часах
+            (1, 2, 3, 4, 6, 8, 12 или 24): мин/макс температуры, сумма осадков, макс. ветер.
+            Для длинных периодов интервал укрупняется автоматически
+        output_format: Формат ответа: "text" — текст для человека, "json" — компактные
+            структурированные данные. По умолчанию берётся из настроек сервера
     """
     try:
-        # Парсим даты
         try:
-            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-            end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
-        except ValueError:
-            return "❌ Неверный формат даты. Используйте YYYY-MM-DD (например: 2024-01-01)"
+            start_date_obj, end_date_obj = parse_history_period(start_date, end_date, hourly_step)
+        except ValueError as e:
+            return str(e)
 
-        # Проверяем, что даты в прошлом
-        today = date.today()
-        if start_date_obj >= today or end_date_obj >= today:
-            return "❌ Исторические данные доступны только для прошедших дат"
-
-        # Проверяем порядок дат
-        if start_date_obj > end_date_obj:
-            return "❌ Начальная дата должна быть раньше конечной"
-
-        # Ограничиваем период (например, максимум 1 год)
-        if (end_date_obj - start_date_obj).days > 365:
-            return "❌ Максимальный период для исторических данных: 365 дней"
-
-        weather = WeatherService()
-        weather_result = await weather.get_historical_weather(lat, lon, start_date_obj, end_date_obj)
+        weather_result = await services.weather.get_historical_weather(
+            lat, lon, start_date_obj, end_date_obj, hourly=hourly_step is not None
+        )
 
         if not weather_result.get("success"):
             error_msg = weather_result.get("error", "Неизвестная ошибка получения исторических данных")
@@ -282,28 +417,10 @@ async def get_historical_weather(lat: float, lon: float, start_date: str, end_da
         if not weather_data:
             return f"Не удалось получить исторические данные для координат {lat}, {lon}"
 
-        response_text = f"📊 Исторические данные о погоде для координат {lat}, {lon}\n"
-        response_text += f"📅 Период: {start_date} - {end_date}\n\n"
-
-        if "daily_forecast" in weather_data and weather_data["daily_forecast"]:
-            response_text += f"📈 Данные за {len(weather_data['daily_forecast'])} дн.:\n"
-            for day in weather_data['daily_forecast']:
-                date_str = day.get('date', 'N/A')
-                temp_max = day.get('temperature_max', 'N/A')
-                temp_min = day.get('temperature_min', 'N/A')
-                precipitation = day.get('precipitation', 'N/A')
-                wind_max = day.get('wind_speed_max', 'N/A')
-
-                response_text += f"📅 {date_str}:\n"
-                response_text += f"  🌡️ {temp_min}°C - {temp_max}°C\n"
-                response_text += f"  🌧️ Осадки: {precipitation} мм\n"
-                response_text += f"  💨 Макс. ветер: {wind_max} км/ч\n\n"
-
-        if "location" in weather_data:
-            location = weather_data["location"]
-            response_text += f"🕒 Часовой пояс: {location.get('timezone', 'N/A')}"
-
-        return response_text
+        weather_data = downsample_hourly(weather_data, hourly_step)
+        if use_json(output_format):
+            return render_json(weather_payload(weather_data, lat, lon, current=False))
+        return render_history(place_for(lat, lon), start_date, end_date, weather_data)
 
     except Exception as e:
         error_details = f"Ошибка в get_historical_weather: {type(e).__name__}: {str(e)}"
@@ -312,15 +429,16 @@ async def get_historical_weather(lat: float, lon: float, start_date: str, end_da
 
 
 @mcp.tool()
-async def get_city_current_weather(city: str) -> str:
+async def get_city_current_weather(city: str, output_format: Optional[OutputFormat] = None) -> str:
     """Получить текущую погоду для указанного города (удобный метод)
 
     Args:
         city: Название города
+        output_format: Формат ответа: "text" — текст для человека, "json" — компактные
+            структурированные данные. По умолчанию берётся из настроек сервера
     """
     try:
-        geo = GeocodingService()
-        geo_result = await geo.get_coordinates(city)
+        geo_result = await services.geo.get_coordinates(city)
 
         if not geo_result.get("success"):
             error_msg = geo_result.get("error", "Неизвестная ошибка геокодирования")
@@ -339,8 +457,7 @@ async def get_city_current_weather(city: str) -> str:
             return f"Некорректные координаты для города '{city}'"
 
         # Получаем текущую погоду напрямую через WeatherService
-        weather = WeatherService()
-        weather_result = await weather.get_weather(lat, lon, forecast_days=1, include_current=True)
+        weather_result = await services.weather.get_weather(lat, lon, forecast_days=1, include_current=True)
 
         if not weather_result.get("success"):
             error_msg = weather_result.get("error", "Неизвестная ошибка получения погоды")
@@ -351,25 +468,12 @@ async def get_city_current_weather(city: str) -> str:
         if not weather_data:
             return f"Не удалось получить данные о текущей погоде для города '{city}'"
 
-        response_text = f"🌤️ Текущая погода для {city_display_name}\n\n"
-
-        if "current" in weather_data:
-            current = weather_data["current"]
-            response_text += f"📍 Сейчас:\n"
-            response_text += f"🌡️ Температура: {current.get('temperature', 'N/A')}°C\n"
-            response_text += f"💨 Скорость ветра: {current.get('wind_speed', 'N/A')} км/ч\n"
-            response_text += f"📅 Время: {current.get('time', 'N/A')}\n"
-            response_text += f"🔢 Код погоды: {current.get('weather_code', 'N/A')}\n\n"
-        else:
+        if "current" not in weather_data:
             return "❌ Текущие данные о погоде недоступны"
 
-        if "location" in weather_data:
-            location = weather_data["location"]
-            response_text += f"🕒 Часовой пояс: {location.get('timezone', 'N/A')}\n"
-        
-        response_text += f"📍 Координаты: {lat}, {lon}"
-
-        return response_text
+        if use_json(output_format):
+            return render_json(weather_payload(weather_data, lat, lon, city_display_name, daily=False))
+        return render_current(place_for(lat, lon, city_display_name), weather_data, lat, lon)
 
     except Exception as e:
         error_details = f"Ошибка в get_city_current_weather: {type(e).__name__}: {str(e)}"
@@ -378,17 +482,27 @@ async def get_city_current_weather(city: str) -> str:
 
 
 @mcp.tool()
-async def get_city_historical_weather(city: str, start_date: str, end_date: str) -> str:
+async def get_city_historical_weather(
+    city: str,
+    start_date: str,
+    end_date: str,
+    hourly_step: Optional[int] = None,
+    output_format: Optional[OutputFormat] = None
+) -> str:
     """Получить исторические данные о погоде для указанного города (удобный метод)
 
     Args:
         city: Название города
         start_date: Начальная дата в формате YYYY-MM-DD (например: 2024-01-01)
         end_date: Конечная дата в формате YYYY-MM-DD (например: 2024-01-07)
+        hourly_step: Добавить почасовые данные, агрегированные по интервалам в часах
+            (1, 2, 3, 4, 6, 8, 12 или 24): мин/макс температуры, сумма осадков, макс. ветер.
+            Для длинных периодов интервал укрупняется автоматически
+        output_format: Формат ответа: "text" — текст для человека, "json" — компактные
+            структурированные данные. По умолчанию берётся из настроек сервера
     """
     try:
-        geo = GeocodingService()
-        geo_result = await geo.get_coordinates(city)
+        geo_result = await services.geo.get_coordinates(city)
 
         if not geo_result.get("success"):
             error_msg = geo_result.get("error", "Неизвестная ошибка геокодирования")
@@ -406,29 +520,15 @@ async def get_city_historical_weather(city: str, start_date: str, end_date: str)
         if not lat or not lon:
             return f"Некорректные координаты для города '{city}'"
 
-        # Парсим даты
         try:
-            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-            end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
-        except ValueError:
-            return "❌ Неверный формат даты. Используйте YYYY-MM-DD (например: 2024-01-01)"
-
-        # Проверяем, что даты в прошлом
-        today = date.today()
-        if start_date_obj >= today or end_date_obj >= today:
-            return "❌ Исторические данные доступны только для прошедших дат"
-
-        # Проверяем порядок дат
-        if start_date_obj > end_date_obj:
-            return "❌ Начальная дата должна быть раньше конечной"
-
-        # Ограничиваем период (например, максимум 1 год)
-        if (end_date_obj - start_date_obj).days > 365:
-            return "❌ Максимальный период для исторических данных: 365 дней"
+            start_date_obj, end_date_obj = parse_history_period(start_date, end_date, hourly_step)
+        except ValueError as e:
+            return str(e)
 
         # Получаем исторические данные напрямую через WeatherService
-        weather = WeatherService()
-        weather_result = await weather.get_historical_weather(lat, lon, start_date_obj, end_date_obj)
+        weather_result = await services.weather.get_historical_weather(
+            lat, lon, start_date_obj, end_date_obj, hourly=hourly_step is not None
+        )
 
         if not weather_result.get("success"):
             error_msg = weather_result.get("error", "Неизвестная ошибка получения исторических данных")
@@ -439,35 +539,188 @@ async def get_city_historical_weather(city: str, start_date: str, end_date: str)
         if not weather_data:
             return f"Не удалось получить исторические данные для города '{city}'"
 
-        response_text = f"📊 Исторические данные о погоде для {city_display_name}\n"
-        response_text += f"📅 Период: {start_date} - {end_date}\n\n"
+        weather_data = downsample_hourly(weather_data, hourly_step)
+        if use_json(output_format):
+            return render_json(weather_payload(weather_data, lat, lon, city_display_name, current=False))
+        return render_history(
+            place_for(lat, lon, city_display_name), start_date, end_date, weather_data, lat, lon
+        )
+
+    except Exception as e:
+        error_details = f"Ошибка в get_city_historical_weather: {type(e).__name__}: {str(e)}"
+        logging.error(error_details)
+        return f"Произошла ошибка при получении исторических данных: {str(e)}"
+
+
+@mcp.tool()
+async def get_weather_statistics(
+    lat: float,
+    lon: float,
+    start_date: str,
+    end_date: str,
+    group_by: Optional[StatisticsGrouping] = None,
+    percentiles: Optional[list[float]] = None,
+    precipitation_above: float = 1.0,
+    temperature_above: Optional[float] = None,
+    temperature_below: Optional[float] = None,
+    output_format: Optional[OutputFormat] = None
+) -> str:
+    """Посчитать статистику погоды за прошедший период по координатам (средние, экстремумы,
+    процентили, сумма осадков, число дней выше/ниже порога) без вывода данных по дням
+
+    Args:
+        lat: Широта (например: 55.7558 для Москвы)
+        lon: Долгота (например: 37.6176 для Москвы)
+        start_date: Начальная дата в формате YYYY-MM-DD (например: 2023-01-01)
+        end_date: Конечная дата в формате YYYY-MM-DD (например: 2023-12-31)
+        group_by: Группировка: "week" — по неделям, "month" — по месяцам, не задано — только итог
+        percentiles: Процентили температур (по умолчанию [10, 50, 90])
+        precipitation_above: Порог осадков для подсчёта дней с осадками, мм
+        temperature_above: Посчитать дни с максимальной температурой выше порога, °C
+        temperature_below: Посчитать дни с минимальной температурой ниже порога, °C
+        output_format: Формат ответа: "text" — текст для человека, "json" — компактные
+            структурированные данные. По умолчанию берётся из настроек сервера
+    """
+    try:
+        try:
+            start_date_obj, end_date_obj = parse_history_period(start_date, end_date)
+        except ValueError as e:
+            return str(e)
 
-        if "daily_forecast" in weather_data and weather_data["daily_forecast"]:
-            response_text += f"📈 Данные за {len(weather_data['daily_forecast'])} дн.:\n"
-            for day in weather_data['daily_forecast']:
-                date_str = day.get('date', 'N/A')
-                temp_max = day.get('temperature_max', 'N/A')
-                temp_min = day.get('temperature_min', 'N/A')
-                precipitation = day.get('precipitation', 'N/A')
-                wind_max = day.get('wind_speed_max', 'N/A')
+        weather_result = await services.weather.get_historical_weather(lat, lon, start_date_obj, end_date_obj)
 
-                response_text += f"📅 {date_str}:\n"
-                response_text += f"  🌡️ {temp_min}°C - {temp_max}°C\n"
-                response_text += f"  🌧️ Осадки: {precipitation} мм\n"
-                response_text += f"  💨 Макс. ветер: {wind_max} км/ч\n\n"
+        if not weather_result.get("success"):
+            error_msg = weather_result.get("error", "Неизвестная ошибка получения исторических данных")
+            logging.error(f"Historical weather error: {error_msg}")
+            return f"Ошибка при получении исторических данных: {error_msg}"
 
-        if "location" in weather_data:
-            location = weather_data["location"]
-            response_text += f"🕒 Часовой пояс: {location.get('timezone', 'N/A')}\n"
-            
-        response_text += f"📍 Координаты: {lat}, {lon}"
+        daily = (weather_result.get("data") or {}).get("daily_forecast")
+        if not daily:
+            return f"Не удалось получить исторические данные для координат {lat}, {lon}"
 
-        return response_text
+        statistics = summarize(
+            daily,
+            group_by=group_by,
+            percentiles=percentiles,
+            precipitation_above=precipitation_above,
+            temperature_above=temperature_above,
+            temperature_below=temperature_below
+        )
+
+        if use_json(output_format):
+            return render_json({
+                "location": location_payload(weather_result["data"], lat, lon),
+                "period": {"start": start_date, "end": end_date},
+                **statistics
+            })
+        return render_statistics(
+            place_for(lat, lon),
+            start_date,
+            end_date,
+            statistics,
+            precipitation_above,
+            temperature_above,
+            temperature_below,
+            group_by
+        )
 
     except Exception as e:
-        error_details = f"Ошибка в get_city_historical_weather: {type(e).__name__}: {str(e)}"
+        error_details = f"Ошибка в get_weather_statistics: {type(e).__name__}: {str(e)}"
         logging.error(error_details)
-        return f"Произошла ошибка при получении исторических данных: {str(e)}"
+        return f"Произошла ошибка при расчёте статистики: {str(e)}"
+
+
+@mcp.tool()
+async def get_city_weather_statistics(
+    city: str,
+    start_date: str,
+    end_date: str,
+    group_by: Optional[StatisticsGrouping] = None,
+    percentiles: Optional[list[float]] = None,
+    precipitation_above: float = 1.0,
+    temperature_above: Optional[float] = None,
+    temperature_below: Optional[float] = None,
+    output_format: Optional[OutputFormat] = None
+) -> str:
+    """Посчитать статистику погоды за прошедший период для указанного города (удобный метод)
+
+    Args:
+        city: Название города
+        start_date: Начальная дата в формате YYYY-MM-DD (например: 2023-01-01)
+        end_date: Конечная дата в формате YYYY-MM-DD (например: 2023-12-31)
+        group_by: Группировка: "week" — по неделям, "month" — по месяцам, не задано — только итог
+        percentiles: Процентили температур (по умолчанию [10, 50, 90])
+        precipitation_above: Порог осадков для подсчёта дней с осадками, мм
+        temperature_above: Посчитать дни с максимальной температурой выше порога, °C
+        temperature_below: Посчитать дни с минимальной температурой ниже порога, °C
+        output_format: Формат ответа: "text" — текст для человека, "json" — компактные
+            структурированные данные. По умолчанию берётся из настроек сервера
+    """
+    try:
+        try:
+            start_date_obj, end_date_obj = parse_history_period(start_date, end_date)
+        except ValueError as e:
+            return str(e)
+
+        geo_result = await services.geo.get_coordinates(city)
+
+        if not geo_result.get("success"):
+            error_msg = geo_result.get("error", "Неизвестная ошибка геокодирования")
+            logging.error(f"Geocoding error: {error_msg}")
+            return f"Ошибка при поиске города: {error_msg}"
+
+        geo_data = geo_result.get("data")
+        if not geo_data:
+            return f"Не удалось получить данные для города '{city}'"
+
+        lat = geo_data.get("lat")
+        lon = geo_data.get("lon")
+        city_display_name = geo_data.get("display_name", city)
+
+        if not lat or not lon:
+            return f"Некорректные координаты для города '{city}'"
+
+        weather_result = await services.weather.get_historical_weather(lat, lon, start_date_obj, end_date_obj)
+
+        if not weather_result.get("success"):
+            error_msg = weather_result.get("error", "Неизвестная ошибка получения исторических данных")
+            logging.error(f"Historical weather error: {error_msg}")
+            return f"Ошибка при получении исторических данных: {error_msg}"
+
+        daily = (weather_result.get("data") or {}).get("daily_forecast")
+        if not daily:
+            return f"Не удалось получить исторические данные для города '{city}'"
+
+        statistics = summarize(
+            daily,
+            group_by=group_by,
+            percentiles=percentiles,
+            precipitation_above=precipitation_above,
+            temperature_above=temperature_above,
+            temperature_below=temperature_below
+        )
+
+        if use_json(output_format):
+            return render_json({
+                "location": location_payload(weather_result["data"], lat, lon, city_display_name),
+                "period": {"start": start_date, "end": end_date},
+                **statistics
+            })
+        return render_statistics(
+            place_for(lat, lon, city_display_name),
+            start_date,
+            end_date,
+            statistics,
+            precipitation_above,
+            temperature_above,
+            temperature_below,
+            group_by
+        )
+
+    except Exception as e:
+        error_details = f"Ошибка в get_city_weather_statistics: {type(e).__name__}: {str(e)}"
+        logging.error(error_details)
+        return f"Произошла ошибка при расчёте статистики: {str(e)}"
 
 
 if __name__ == "__main__":
@@ -0,0 +1,138 @@
+import sys
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, AsyncIterator
+from contextlib import asynccontextmanager
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path / 'src'))
+
+from weather_mcp.cache.archive import ArchiveStore
+from weather_mcp.cache.forecast import ForecastCache
+from weather_mcp.cache.geocode import GeocodeCache
+from weather_mcp.tools.geo import GeocodingService
+from weather_mcp.tools.gazetteer import Gazetteer
+from weather_mcp.tools.http import create_client
+from weather_mcp.tools.scheduler import RequestScheduler
+from weather_mcp.tools.weather import WeatherService
+from weather_mcp.warmer import CacheWarmer
+
+
+class ServiceContainer:
+    """Долгоживущие сервисы MCP сервера и их общие ресурсы.
+
+    Держит по одному пулу HTTP соединений на апстрим (Nominatim, Forecast,
+    Archive) и внедряет их в сервисы. Пока контейнер не запущен, сервисы
+    работают с временными клиентами на каждый запрос. Кеши создаются сразу
+    и переживают перезапуски пулов.
+
+    FastMCP вызывает lifespan на каждую сессию, поэтому запуск считается
+    по ссылкам: ресурсы создаются первым пользователем и закрываются последним.
+    Пока контейнер запущен, в фоне работает прогрев кеша (если включён).
+    """
+
+    def __init__(self):
+        self.geo = GeocodingService(
+            cache=GeocodeCache.from_settings(),
+            scheduler=RequestScheduler.from_settings(),
+            gazetteer=Gazetteer.from_settings()
+        )
+        self.weather = WeatherService(
+            archive_store=ArchiveStore.from_settings(),
+            forecast_cache=ForecastCache.from_settings()
+        )
+        self.warmer = CacheWarmer.from_settings(self.geo, self.weather)
+        self._users = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self._users > 0
+
+    async def start(self) -> None:
+        """Запустить контейнер (или увеличить счётчик пользователей).
+
+        Если запуск не удался, созданные ресурсы закрываются, а счётчик
+        возвращается, чтобы следующая сессия попробовала запуститься заново.
+        """
+        async with self._lock:
+            self._users += 1
+            if self._users > 1:
+                return
+
+            try:
+                self.geo.client = create_client()
+                await self._load_gazetteer()
+                self.weather.forecast_client = create_client()
+                self.weather.archive_client = create_client()
+                if self.warmer is not None:
+                    self.warmer.start()
+            except BaseException:
+                self._users -= 1
+                await self._close()
+                raise
+
+    async def stop(self) -> None:
+        """Освободить контейнер; последний пользователь закрывает пулы."""
+        async with self._lock:
+            if self._users == 0:
+                return
+            self._users -= 1
+            if self._users > 0:
+                return
+
+            await self._close()
+
+    async def _load_gazetteer(self) -> None:
+        """Построить индекс справочника заранее, не блокируя цикл событий первым запросом.
+
+        Справочник необязателен: если дамп не читается, города ищутся через Nominatim.
+        """
+        if self.geo.gazetteer is None:
+            return
+        try:
+            await asyncio.to_thread(self.geo.gazetteer.load)
+        except Exception as e:
+            logging.error(f"Не удалось загрузить справочник городов, используется Nominatim: {e}")
+            self.geo.gazetteer = None
+
+    async def _close(self) -> None:
+        if self.warmer is not None:
+            await self.warmer.stop()
+        await self.weather.cancel_background_tasks()
+        await self.geo.scheduler.close()
+
+        clients = [self.geo.client, self.weather.forecast_client, self.weather.archive_client]
+        self.geo.client = None
+        self.weather.forecast_client = None
+        self.weather.archive_client = None
+
+        for client in clients:
+            if client is not None:
+                await client.aclose()
+
+    def cache_stats(self) -> dict[str, Any]:
+        """Счётчики попаданий/промахов всех кешей сервера."""
+        stats = {}
+        if self.geo.cache is not None:
+            stats["geocode"] = self.geo.cache.stats()
+        if self.weather.forecast_cache is not None:
+            stats["forecast"] = self.weather.forecast_cache.stats()
+        stats["nominatim_scheduler"] = self.geo.scheduler.stats()
+        if self.warmer is not None:
+            stats["warmer"] = self.warmer.stats()
+        stats["upstreams"] = {
+            upstream.name: upstream.stats()
+            for upstream in (self.geo.upstream, self.weather.forecast_upstream, self.weather.archive_upstream)
+        }
+        return stats
+
+    @asynccontextmanager
+    async def running(self) -> AsyncIterator["ServiceContainer"]:
+        """Контекстный менеджер для lifespan сервера."""
+        await self.start()
+        try:
+            yield self
+        finally:
+            await self.stop()
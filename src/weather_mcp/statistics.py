@@ -0,0 +1,136 @@
+from datetime import date
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+
+# Группировка дней в статистике
+GROUP_WEEK = "week"
+GROUP_MONTH = "month"
+
+DEFAULT_PERCENTILES = (10, 50, 90)
+
+
+def _round(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 1)
+
+
+def _distribution(values: np.ndarray, percentiles: Sequence[float]) -> dict[str, Optional[float]]:
+    """Среднее, минимум, максимум и процентили без учёта пропусков."""
+    known = values[~np.isnan(values)]
+    if not known.size:
+        return {"mean": None, "min": None, "max": None, **{f"p{p:g}": None for p in percentiles}}
+
+    stats = {"mean": _round(known.mean()), "min": _round(known.min()), "max": _round(known.max())}
+    if percentiles:
+        for p, value in zip(percentiles, np.percentile(known, percentiles)):
+            stats[f"p{p:g}"] = _round(value)
+    return stats
+
+
+def _summary(
+    columns: dict[str, np.ndarray],
+    percentiles: Sequence[float],
+    precipitation_above: float,
+    temperature_above: Optional[float],
+    temperature_below: Optional[float]
+) -> dict[str, Any]:
+    temperature_max = columns["temperature_max"]
+    temperature_min = columns["temperature_min"]
+    precipitation = columns["precipitation"]
+    wind = columns["wind_speed_max"]
+
+    known_precipitation = precipitation[~np.isnan(precipitation)]
+    known_wind = wind[~np.isnan(wind)]
+
+    summary = {
+        "days": int(temperature_max.size),
+        "temperature_max": _distribution(temperature_max, percentiles),
+        "temperature_min": _distribution(temperature_min, percentiles),
+        "precipitation": {
+            "total": _round(known_precipitation.sum()) if known_precipitation.size else None,
+            "max": _round(known_precipitation.max()) if known_precipitation.size else None,
+            "days_above": int(np.count_nonzero(known_precipitation >= precipitation_above))
+        },
+        "wind_speed_max": {
+            "mean": _round(known_wind.mean()) if known_wind.size else None,
+            "max": _round(known_wind.max()) if known_wind.size else None
+        }
+    }
+    # Сравнение с NaN всегда ложно, поэтому пропуски не попадают в счётчики
+    if temperature_above is not None:
+        summary["days_temperature_max_above"] = int(np.count_nonzero(temperature_max > temperature_above))
+    if temperature_below is not None:
+        summary["days_temperature_min_below"] = int(np.count_nonzero(temperature_min < temperature_below))
+    return summary
+
+
+def _group_keys(dates: np.ndarray, group_by: str) -> np.ndarray:
+    if group_by == GROUP_MONTH:
+        return dates.astype("datetime64[M]").astype("datetime64[D]")
+    if group_by == GROUP_WEEK:
+        # 1970-01-01 — четверг; сдвиг на 3 дня делает началом недели понедельник
+        days = dates.astype("int64")
+        return (days - (days + 3) % 7).astype("datetime64[D]")
+    raise ValueError(f"Неизвестная группировка '{group_by}'. Доступны: {GROUP_WEEK}, {GROUP_MONTH}")
+
+
+def _group_label(start: date, group_by: str) -> str:
+    if group_by == GROUP_MONTH:
+        return start.strftime("%Y-%m")
+    year, week, _ = start.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def summarize(
+    daily: Any,
+    group_by: Optional[str] = None,
+    percentiles: Optional[Sequence[float]] = None,
+    precipitation_above: float = 1.0,
+    temperature_above: Optional[float] = None,
+    temperature_below: Optional[float] = None
+) -> dict[str, Any]:
+    """Сводная статистика по дневным данным (``DailySeries``).
+
+    Все вычисления идут над массивами NumPy целиком; при группировке по
+    неделям или месяцам даты упорядочены, поэтому группы — непрерывные
+    срезы массивов.
+
+    Args:
+        daily: Дневные данные с колоночным доступом ``values(field)``.
+        group_by: ``"week"``, ``"month"`` или None — только общий итог.
+        percentiles: Процентили температур. По умолчанию 10, 50 и 90.
+        precipitation_above: Порог осадков для подсчёта дождливых дней, мм.
+        temperature_above: Считать дни с максимумом выше порога, °C.
+        temperature_below: Считать дни с минимумом ниже порога, °C.
+
+    Returns:
+        Словарь с общим итогом ``summary`` и, при группировке, списком ``groups``.
+
+    Raises:
+        ValueError: Неизвестная группировка.
+    """
+    percentiles = DEFAULT_PERCENTILES if percentiles is None else tuple(percentiles)
+    fields = ("temperature_max", "temperature_min", "precipitation", "wind_speed_max")
+    columns = {field: daily.values(field) for field in fields}
+    options = (percentiles, precipitation_above, temperature_above, temperature_below)
+
+    result: dict[str, Any] = {"summary": _summary(columns, *options)}
+    if group_by is None or not len(daily):
+        return result
+
+    dates = daily.values("date")
+    keys = _group_keys(dates, group_by)
+    bounds = [0, *(np.flatnonzero(keys[1:] != keys[:-1]) + 1), len(keys)]
+
+    groups = []
+    for lo, hi in zip(bounds, bounds[1:]):
+        start = dates[lo].item()
+        groups.append({
+            "label": _group_label(start, group_by),
+            "start": start.isoformat(),
+            "end": dates[hi - 1].item().isoformat(),
+            **_summary({field: column[lo:hi] for field, column in columns.items()}, *options)
+        })
+    result["groups"] = groups
+    return result
@@ -0,0 +1,214 @@
+import io
+import sys
+import zipfile
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+
+root_path = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(root_path / 'src'))
+
+from utils.config import settings
+from weather_mcp.cache.geocode import normalize_city
+
+
+# Колонки дампа GeoNames (readme.txt на download.geonames.org/export/dump)
+_NAME, _ASCII_NAME, _ALTERNATE_NAMES, _LAT, _LON, _FEATURE_CLASS = 1, 2, 3, 4, 5, 6
+_COUNTRY, _POPULATION = 8, 14
+_COLUMNS = 15
+
+# Класс объектов GeoNames "населённые пункты"
+POPULATED_PLACE = "P"
+
+
+class Place(NamedTuple):
+    name: str
+    country: str
+    lat: float
+    lon: float
+    population: int
+
+    @property
+    def display_name(self) -> str:
+        return f"{self.name}, {self.country}" if self.country else self.name
+
+
+def within_one_edit(a: str, b: str) -> bool:
+    """Расстояние Левенштейна между строками не больше 1."""
+    if a == b:
+        return True
+    if len(a) > len(b):
+        a, b = b, a
+    if len(b) - len(a) > 1:
+        return False
+
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
+
+
+class Gazetteer:
+    """Локальный справочник городов из дампа GeoNames.
+
+    Все названия (основное, ASCII и альтернативные, в том числе русские)
+    нормализуются и хранятся в отсортированном списке со ссылками на записи;
+    координаты и население лежат в массивах ``array``. Поиск — бинарный:
+    точное совпадение, исправление одной опечатки и начало названия.
+    Из нескольких совпадений выбирается город с наибольшим населением.
+
+    Дамп загружается лениво при первом поиске или заранее через ``load()``.
+    Поддерживаются ``.txt`` и ``.zip`` архивы в формате download.geonames.org.
+    """
+
+    # Сколько кандидатов просматривать при нечётком и префиксном поиске
+    max_candidates = 20_000
+
+    def __init__(self, path: str | Path, min_population: int = 0, min_fuzzy_length: int = 4):
+        self.path = Path(path)
+        self.min_population = min_population
+        self.min_fuzzy_length = min_fuzzy_length
+
+        self._names: list[str] = []
+        self._refs = array("l")
+        self._reversed: list[str] = []
+        self._reversed_refs = array("l")
+
+        self.labels: list[str] = []
+        self.countries: list[str] = []
+        self.lat = array("d")
+        self.lon = array("d")
+        self.population = array("q")
+
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> Optional["Gazetteer"]:
+        """Справочник по настройкам приложения или None, если файл не задан."""
+        if not settings.gazetteer_path:
+            return None
+        return cls(settings.gazetteer_path, min_population=settings.gazetteer_min_population)
+
+    def __len__(self) -> int:
+        self.load()
+        return len(self.labels)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self) -> None:
+        """Прочитать дамп и построить индекс (повторные вызовы ничего не делают)."""
+        with self._lock:
+            if self._loaded:
+                return
+
+            pairs = []
+            for row in self._rows():
+                index = len(self.labels)
+                self.labels.append(row[_NAME])
+                self.countries.append(row[_COUNTRY])
+                self.lat.append(float(row[_LAT]))
+                self.lon.append(float(row[_LON]))
+                self.population.append(int(row[_POPULATION] or 0))
+
+                names = {row[_NAME], row[_ASCII_NAME], *row[_ALTERNATE_NAMES].split(",")}
+                for name in {normalize_city(name) for name in names}:
+                    if name:
+                        pairs.append((name, index))
+
+            pairs.sort()
+            self._names = [name for name, _ in pairs]
+            self._refs = array("l", (index for _, index in pairs))
+
+            pairs = sorted((name[::-1], index) for name, index in pairs)
+            self._reversed = [name for name, _ in pairs]
+            self._reversed_refs = array("l", (index for _, index in pairs))
+            self._loaded = True
+
+    def lookup(self, query: str) -> Optional[Place]:
+        """Найти город: точно, с одной опечаткой или по началу названия."""
+        self.load()
+        name = normalize_city(query)
+        if not name:
+            return None
+
+        index = self._exact(name)
+        if index is None and len(name) >= self.min_fuzzy_length:
+            index = self._fuzzy(name)
+            if index is None:
+                index = self._prefix(name)
+
+        return self.place(index) if index is not None else None
+
+    def place(self, index: int) -> Place:
+        return Place(
+            self.labels[index],
+            self.countries[index],
+            self.lat[index],
+            self.lon[index],
+            self.population[index]
+        )
+
+    def _rows(self) -> Iterator[list[str]]:
+        for line in self._lines():
+            row = line.rstrip("\n").split("\t")
+            if len(row) < _COLUMNS or row[_FEATURE_CLASS] != POPULATED_PLACE:
+                continue
+            if int(row[_POPULATION] or 0) < self.min_population:
+                continue
+            yield row
+
+    def _lines(self) -> Iterator[str]:
+        if self.path.suffix == ".zip":
+            with zipfile.ZipFile(self.path) as archive:
+                member = next(name for name in archive.namelist() if name.endswith(".txt"))
+                with archive.open(member) as raw:
+                    yield from io.TextIOWrapper(raw, encoding="utf-8")
+        else:
+            with open(self.path, encoding="utf-8") as file:
+                yield from file
+
+    def _best(self, refs: Iterator[int]) -> Optional[int]:
+        """Запись с наибольшим населением среди кандидатов."""
+        return max(refs, key=self.population.__getitem__, default=None)
+
+    def _exact(self, name: str) -> Optional[int]:
+        lo = bisect_left(self._names, name)
+        hi = bisect_right(self._names, name, lo)
+        return self._best(self._refs[i] for i in range(lo, hi))
+
+    def _fuzzy(self, name: str) -> Optional[int]:
+        # При одной правке совпадает либо первая половина, либо хвост после неё
+        half = len(name) // 2
+        head = name[:half]
+        tail = name[::-1][:len(name) - half - 1]
+
+        candidates = []
+        for names, refs, prefix, probe in (
+            (self._names, self._refs, head, name),
+            (self._reversed, self._reversed_refs, tail, name[::-1])
+        ):
+            lo, hi = self._prefix_range(names, prefix)
+            for i in range(lo, min(hi, lo + self.max_candidates)):
+                if abs(len(names[i]) - len(probe)) <= 1 and within_one_edit(names[i], probe):
+                    candidates.append(refs[i])
+
+        return self._best(iter(candidates))
+
+    def _prefix(self, name: str) -> Optional[int]:
+        lo, hi = self._prefix_range(self._names, name)
+        return self._best(self._refs[i] for i in range(lo, min(hi, lo + self.max_candidates)))
+
+    @staticmethod
+    def _prefix_range(names: list[str], prefix: str) -> tuple[int, int]:
+        lo = bisect_left(names, prefix)
+        if not prefix:
+            return lo, len(names)
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return lo, bisect_left(names, upper, lo)
@@ -1,63 +1,137 @@
 import sys
 import httpx
-from typing import Any
+from collections import Counter
+from typing import Any, Optional
 from pathlib import Path
 
 root_path = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(root_path / 'src'))
 
 from utils.config import settings
+from weather_mcp.tools.http import fetch_json
+from weather_mcp.tools.resilience import Upstream
+from weather_mcp.tools.singleflight import SingleFlight, request_key
+from weather_mcp.tools.scheduler import INTERACTIVE, RequestScheduler
+from weather_mcp.tools.gazetteer import Gazetteer
+from weather_mcp.cache.geocode import GeocodeCache, normalize_city
 
 
 class GeocodingService:
     """Сервис для геокодирования через Nominatim API."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        cache: Optional[GeocodeCache] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        gazetteer: Optional[Gazetteer] = None
+    ):
         self.base_url = settings.nominatim_base_url
-        self.timeout = 1000  # Ограничения сервиса
-
-    async def get_coordinates(self, city: str) -> dict[str, Any]:
-        async with httpx.AsyncClient() as client:
-            params = {
-                "q": city,
-                "format": "json",
-                "limit": 1,
-                "addressdetails": 1
-            }
-            headers = {
-                "User-Agent": "my-weather-app/1.0 (i@dmitrymalyshev.ru)"
-            }
-            try:
-                response = await client.get(
-                    f"{self.base_url}/search",
-                    params=params,
-                    headers=headers,
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                if not data:
-                    return {
-                        "success": False,
-                        "error": f"Город '{city}' не найден"
-                    }
+        self.timeout = settings.nominatim_timeout
+        self.client = client
+        self.cache = cache
+        # Политика Nominatim: не чаще 1 запроса в секунду
+        self.scheduler = scheduler
+        self.gazetteer = gazetteer
+        # Без хеджирования: дублирующие запросы нарушили бы лимит Nominatim
+        self.upstream = Upstream.from_settings("Nominatim")
+        self.inflight = SingleFlight()
+        # Сколько раз пользователи спрашивали город (нормализованное название).
+        # Считается, только если есть прогрев кеша: он же и уменьшает счётчики
+        self.demand: Optional[Counter[str]] = None
+
+    async def get_coordinates(self, city: str, priority: int = INTERACTIVE) -> dict[str, Any]:
+        if priority == INTERACTIVE and self.demand is not None:
+            self.demand[normalize_city(city)] += 1
 
-                location = data[0]
+        # Локальный справочник отвечает без сети; Nominatim — только если города в нём нет
+        if self.gazetteer is not None:
+            place = self.gazetteer.lookup(city)
+            if place is not None:
                 return {
                     "success": True,
                     "data": {
-                        "lat": float(location["lat"]),
-                        "lon": float(location["lon"]),
-                        "display_name": location["display_name"],
+                        "lat": place.lat,
+                        "lon": place.lon,
+                        "display_name": place.display_name,
                         "city": city
                     }
                 }
 
-            except httpx.TimeoutException:
-                return {"success": False, "error": "Таймаут запроса геокодирования"}
-            except Exception as e:
-                return {"success": False, "error": f"Ошибка геокодирования: {str(e)}"}
+        if self.cache is not None:
+            cached = self.cache.get(city)
+            if cached is not None:
+                return cached
+
+        params = {
+            "q": city,
+            "format": "json",
+            "limit": 1,
+            "addressdetails": 1
+        }
+        headers = {
+            "User-Agent": "my-weather-app/1.0 (i@dmitrymalyshev.ru)"
+        }
+        url = f"{self.base_url}/search"
+        try:
+            # Одинаковые одновременные запросы (с точностью до регистра и пробелов) делят один вызов API
+            data = await self.inflight.do(
+                request_key(url, {**params, "q": normalize_city(city)}),
+                lambda: self.upstream.call(lambda: self._search(url, params, headers, priority))
+            )
+
+            if not data:
+                result = {
+                    "success": False,
+                    "error": f"Город '{city}' не найден"
+                }
+                if self.cache is not None:
+                    self.cache.set(city, result, negative=True)
+                return result
+
+            location = data[0]
+            result = {
+                "success": True,
+                "data": {
+                    "lat": float(location["lat"]),
+                    "lon": float(location["lon"]),
+                    "display_name": location["display_name"],
+                    "city": city
+                }
+            }
+            if self.cache is not None:
+                self.cache.set(city, result)
+            return result
+
+        except Exception as e:
+            if isinstance(e, httpx.TimeoutException):
+                error = "Таймаут запроса геокодирования"
+            else:
+                error = f"Ошибка геокодирования: {str(e)}"
+            # Пока Nominatim недоступен, отдаём истёкшие координаты с пометкой
+            entry = self.cache.get_stale(city) if self.cache is not None else None
+            if entry is not None:
+                return {**entry.value, "data": {**entry.value["data"], "stale": entry.staleness(error)}}
+            return {"success": False, "error": error}
+
+    async def _search(
+        self,
+        url: str,
+        params: dict[str, Any],
+        headers: dict[str, str],
+        priority: int
+    ) -> Any:
+        """Запрос к Nominatim с учётом лимита частоты; каждый повтор снова ждёт очереди."""
+        if self.scheduler is not None:
+            await self.scheduler.acquire(priority)
+
+        try:
+            return await fetch_json(self.client, url, params, headers=headers, timeout=self.timeout)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 429 and self.scheduler is not None:
+                retry_after = e.response.headers.get("Retry-After", "")
+                self.scheduler.pause(float(retry_after) if retry_after.isdigit() else 1.0)
+            raise
 
 
 # Глобальный экземпляр
@@ -0,0 +1,88 @@
+import sys
+import logging
+import importlib.util
+from pathlib import Path
+from typing import Any, AsyncIterator, Optional
+from contextlib import asynccontextmanager
+
+import httpx
+
+root_path = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(root_path / 'src'))
+
+from utils.config import settings
+from weather_mcp.deadline import clamp
+
+
+def http2_available() -> bool:
+    """Проверить, установлен ли пакет h2, необходимый httpx для HTTP/2."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def create_client(http2: Optional[bool] = None) -> httpx.AsyncClient:
+    """Создать долгоживущий клиент с пулом соединений для одного апстрима.
+
+    Args:
+        http2: Включить HTTP/2. По умолчанию берётся из настроек.
+
+    Returns:
+        Клиент httpx с keep-alive и ограничениями пула из настроек.
+    """
+    use_http2 = settings.http_http2 if http2 is None else http2
+    if use_http2 and not http2_available():
+        logging.warning("HTTP/2 запрошен, но пакет h2 не установлен — используется HTTP/1.1")
+        use_http2 = False
+
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry
+    )
+    return httpx.AsyncClient(
+        limits=limits,
+        http2=use_http2,
+        timeout=settings.http_timeout
+    )
+
+
+@asynccontextmanager
+async def client_scope(client: Optional[httpx.AsyncClient]) -> AsyncIterator[httpx.AsyncClient]:
+    """Отдать общий клиент, а если его нет — временный на время одного запроса.
+
+    Общий клиент не закрывается: его жизненным циклом управляет владелец
+    (lifespan MCP сервера).
+    """
+    if client is not None:
+        yield client
+        return
+
+    async with httpx.AsyncClient() as temporary:
+        yield temporary
+
+
+async def fetch_json(
+    client: Optional[httpx.AsyncClient],
+    url: str,
+    params: dict[str, Any],
+    **kwargs: Any
+) -> Any:
+    """Выполнить GET запрос и вернуть разобранный JSON.
+
+    Таймаут (``timeout`` или ``settings.http_timeout``) урезается до остатка
+    времени текущего вызова инструмента.
+
+    Args:
+        client: Общий клиент или None для временного.
+        url: Адрес запроса.
+        params: Параметры строки запроса.
+        **kwargs: Дополнительные аргументы ``httpx.AsyncClient.get``.
+
+    Raises:
+        httpx.HTTPError: При сетевой ошибке или статусе ответа 4xx/5xx.
+        DeadlineExceeded: Время вызова уже истекло.
+    """
+    kwargs["timeout"] = clamp(kwargs.get("timeout", settings.http_timeout))
+    async with client_scope(client) as http:
+        response = await http.get(url, params=params, **kwargs)
+        response.raise_for_status()
+        return response.json()
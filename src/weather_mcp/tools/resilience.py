@@ -0,0 +1,285 @@
+import sys
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+import httpx
+
+root_path = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(root_path / 'src'))
+
+from utils.config import settings
+from weather_mcp.deadline import expired, remaining
+
+T = TypeVar("T")
+
+# Состояния автомата отключения
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Временная ли ошибка: сеть, таймаут, 429 или 5xx."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+def is_upstream_answer(error: BaseException) -> bool:
+    """Ответил ли апстрим: ошибка запроса (4xx, кроме 429), а не отказ и не локальный сбой."""
+    return isinstance(error, httpx.HTTPStatusError) and not is_retryable(error)
+
+
+class CircuitOpenError(Exception):
+    """Апстрим отключён автоматом после серии ошибок; запрос не отправлялся."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} временно недоступен, повторите через {retry_in:.0f} с")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Автомат отключения апстрима.
+
+    После ``failure_threshold`` временных ошибок подряд автомат размыкается,
+    и запросы сразу получают отказ вместо ожидания таймаута. Через
+    ``reset_timeout`` секунд пропускается один пробный запрос: удача
+    замыкает автомат, ошибка снова размыкает его.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def retry_in(self) -> float:
+        """Сколько секунд до пробного запроса."""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        """Можно ли отправить запрос. В полуоткрытом состоянии — только один пробный."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """Освободить место пробного запроса, который не дал ответа (отменён или сбой у нас)."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        # Неудачный пробный запрос снова размыкает автомат
+        if self._probing or self.failures >= self.failure_threshold:
+            if self._opened_at is None or self._probing:
+                self.opened += 1
+            self._opened_at = time.monotonic()
+        self._probing = False
+
+
+class LatencyTracker:
+    """Скользящее окно длительностей удачных запросов."""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+class Upstream:
+    """Устойчивый вызов одного апстрима: повторы, автомат отключения и хеджирование.
+
+    Предназначен для идемпотентных GET запросов:
+
+    * временные ошибки (сеть, 429, 5xx) повторяются до ``retries`` раз с
+      экспоненциальной задержкой и полным джиттером, чтобы клиенты не
+      повторяли запросы синхронно;
+    * ``CircuitBreaker`` перестаёт нагружать отказавший апстрим и сразу
+      возвращает ``CircuitOpenError``;
+    * с ``hedge_percentile`` запрос, не ответивший за этот процентиль
+      обычной длительности, дублируется, и берётся первый ответ.
+      Хеджирование включается после ``hedge_min_samples`` замеров.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        retries: int = 2,
+        backoff_base: float = 0.2,
+        backoff_max: float = 2.0,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_samples: int = 20
+    ):
+        self.name = name
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.latency = LatencyTracker()
+
+        self.calls = 0
+        self.retried = 0
+        self.rejected = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    @classmethod
+    def from_settings(cls, name: str, retries: Optional[int] = None, hedge: bool = False) -> "Upstream":
+        """Апстрим с политикой из настроек приложения.
+
+        Args:
+            name: Имя апстрима для сообщений и статистики.
+            retries: Число повторов вместо ``upstream_retries``.
+            hedge: Разрешить хеджирование (только для дешёвых запросов без лимита частоты).
+        """
+        return cls(
+            name,
+            retries=settings.upstream_retries if retries is None else retries,
+            backoff_base=settings.upstream_backoff_base,
+            backoff_max=settings.upstream_backoff_max,
+            breaker=CircuitBreaker(settings.circuit_failure_threshold, settings.circuit_reset_timeout),
+            hedge_percentile=settings.hedge_percentile if hedge else None,
+            hedge_min_samples=settings.hedge_min_samples
+        )
+
+    async def call(self, operation: Callable[[], Awaitable[T]]) -> T:
+        """Выполнить запрос ``operation()`` с повторами и автоматом отключения.
+
+        Raises:
+            CircuitOpenError: Апстрим отключён, запрос не отправлялся.
+            Exception: Последняя ошибка запроса, если повторы не помогли
+                или ошибка не временная.
+        """
+        self.calls += 1
+        for attempt in range(self.retries + 1):
+            # allow() в полуоткрытом состоянии занимает место пробного запроса
+            probe = self.breaker.state == HALF_OPEN
+            if not self.breaker.allow():
+                self.rejected += 1
+                raise CircuitOpenError(self.name, self.breaker.retry_in())
+            try:
+                result = await self._attempt(operation)
+            except Exception as e:
+                if not is_retryable(e):
+                    if is_upstream_answer(e):
+                        # Ошибка запроса, а не отказ апстрима: он отвечает
+                        self.breaker.record_success()
+                    elif probe:
+                        self.breaker.release_probe()
+                    raise
+                if isinstance(e, httpx.TimeoutException) and expired():
+                    # Таймаут урезан до дедлайна вызова: апстрим тут ни при чём
+                    if probe:
+                        self.breaker.release_probe()
+                    raise
+                self.breaker.record_failure()
+                if attempt == self.retries or self.breaker.state == OPEN:
+                    raise
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                left = remaining()
+                if left is not None and left <= delay:
+                    # Повтор не успеет до дедлайна вызова
+                    raise
+                self.retried += 1
+                logging.warning(f"Повтор запроса к {self.name} через {delay:.2f} с: {e}")
+                await asyncio.sleep(delay)
+            except BaseException:
+                # Отменённый запрос ничего не говорит о состоянии апстрима
+                if probe:
+                    self.breaker.release_probe()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+
+    def hedge_delay(self) -> Optional[float]:
+        """Через сколько секунд дублировать запрос или None, если хеджирование выключено."""
+        if self.hedge_percentile is None or len(self.latency) < self.hedge_min_samples:
+            return None
+        return self.latency.percentile(self.hedge_percentile)
+
+    async def _attempt(self, operation: Callable[[], Awaitable[T]]) -> T:
+        started = time.monotonic()
+        delay = self.hedge_delay()
+        if delay is None:
+            result = await operation()
+            self.latency.add(time.monotonic() - started)
+            return result
+
+        tasks = [asyncio.ensure_future(operation())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self.hedged += 1
+                tasks.append(asyncio.ensure_future(operation()))
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.latency.add(time.monotonic() - started)
+                        if task is not tasks[0]:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        """Счётчики для мониторинга."""
+        return {
+            "state": self.breaker.state,
+            "calls": self.calls,
+            "retried": self.retried,
+            "rejected": self.rejected,
+            "circuit_opened": self.breaker.opened,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "latency_p50": self.latency.percentile(50),
+            "hedge_delay": self.hedge_delay()
+        }
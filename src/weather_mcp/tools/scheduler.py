@@ -0,0 +1,170 @@
+import sys
+import heapq
+import asyncio
+import itertools
+from pathlib import Path
+from typing import Optional
+
+root_path = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(root_path / 'src'))
+
+from utils.config import settings
+from weather_mcp.deadline import clamp
+
+# Приоритеты запросов: меньше — важнее
+INTERACTIVE = 0
+BACKGROUND = 1
+
+
+class SchedulerBusyError(Exception):
+    """Запрос не может быть выполнен в пределах допустимого ожидания."""
+
+
+class RequestScheduler:
+    """Планировщик запросов к API с лимитом частоты и приоритетами.
+
+    Пропускает запросы не чаще ``rate`` в секунду (token bucket с запасом
+    ``burst``). Ожидающие запросы стоят в ограниченной очереди, интерактивные
+    обслуживаются раньше фоновых. Если запрос заведомо не дождётся своей
+    очереди за ``max_wait`` секунд, он сразу отклоняется, а не висит.
+    """
+
+    def __init__(self, rate: float = 1.0, burst: int = 1, max_queue: int = 100, max_wait: float = 10.0):
+        self.rate = rate
+        self.burst = burst
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+
+        self._tokens = float(burst)
+        self._updated: Optional[float] = None
+        self._paused_until = 0.0
+        self._queue: list[tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.granted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @classmethod
+    def from_settings(cls) -> "RequestScheduler":
+        """Планировщик для Nominatim по настройкам приложения.
+
+        Лимит Nominatim общий для всех процессов сервера, поэтому каждый
+        воркер получает свою долю.
+        """
+        workers = max(1, settings.server_workers)
+        return cls(
+            rate=settings.nominatim_rate_limit / workers,
+            burst=settings.nominatim_burst,
+            max_queue=settings.nominatim_queue_size,
+            max_wait=settings.nominatim_max_queue_wait
+        )
+
+    def __len__(self) -> int:
+        return sum(1 for _, _, future in self._queue if not future.done())
+
+    async def acquire(self, priority: int = INTERACTIVE, max_wait: Optional[float] = None) -> None:
+        """Дождаться разрешения на запрос.
+
+        Raises:
+            SchedulerBusyError: Очередь переполнена или ожидание превысит ``max_wait``
+                (урезанный до остатка времени текущего вызова).
+            DeadlineExceeded: Время вызова уже истекло.
+        """
+        max_wait = clamp(self.max_wait if max_wait is None else max_wait)
+        loop = asyncio.get_running_loop()
+        self._refill(loop.time())
+
+        ahead = sum(1 for p, _, future in self._queue if p <= priority and not future.done())
+        if ahead == 0 and self._tokens >= 1 and loop.time() >= self._paused_until:
+            self._tokens -= 1
+            self.granted += 1
+            return
+
+        if len(self) >= self.max_queue:
+            self.rejected += 1
+            raise SchedulerBusyError("Очередь запросов геокодирования переполнена")
+        if self._expected_wait(ahead, loop.time()) > max_wait:
+            self.rejected += 1
+            raise SchedulerBusyError(
+                f"Сервис геокодирования перегружен: ожидание в очереди превысит {max_wait:g} с"
+            )
+
+        future = loop.create_future()
+        heapq.heappush(self._queue, (priority, next(self._counter), future))
+        self._ensure_dispatcher()
+        self._wakeup.set()
+
+        try:
+            await asyncio.wait_for(future, timeout=max_wait)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise SchedulerBusyError(f"Превышено время ожидания в очереди геокодирования ({max_wait:g} с)")
+
+    def pause(self, seconds: float) -> None:
+        """Приостановить выдачу разрешений (например, после ответа 429)."""
+        loop = asyncio.get_running_loop()
+        self._paused_until = max(self._paused_until, loop.time() + seconds)
+        self._tokens = min(self._tokens, 0.0)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "granted": self.granted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "queued": len(self)
+        }
+
+    async def close(self) -> None:
+        """Остановить диспетчер; ожидающие запросы получают отказ."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for _, _, future in self._queue:
+            if not future.done():
+                future.set_exception(SchedulerBusyError("Планировщик геокодирования остановлен"))
+        self._queue.clear()
+
+    def _refill(self, now: float) -> None:
+        if self._updated is not None:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _expected_wait(self, ahead: int, now: float) -> float:
+        pause = max(0.0, self._paused_until - now)
+        return pause + max(0.0, ahead + 1 - self._tokens) / self.rate
+
+    def _ensure_dispatcher(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            # Отброшенные по таймауту запросы больше не ждут разрешения
+            while self._queue and self._queue[0][2].done():
+                heapq.heappop(self._queue)
+
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            now = loop.time()
+            self._refill(now)
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                continue
+
+            _, _, future = heapq.heappop(self._queue)
+            self._tokens -= 1
+            self.granted += 1
+            future.set_result(None)
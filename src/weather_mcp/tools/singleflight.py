@@ -0,0 +1,100 @@
+import sys
+import asyncio
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+root_path = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(root_path / 'src'))
+
+from weather_mcp.deadline import DeadlineExceeded, SharedDeadline, remaining
+
+T = TypeVar("T")
+
+
+def request_key(url: str, params: Optional[dict[str, Any]] = None) -> str:
+    """Ключ запроса: URL и параметры в каноническом порядке.
+
+    Списки (например, ``daily``) превращаются в строку через запятую, как
+    их передаёт Open-Meteo, поэтому одинаковые по смыслу запросы совпадают.
+    """
+    if not params:
+        return url
+
+    parts = []
+    for name in sorted(params):
+        value = params[name]
+        if isinstance(value, (list, tuple)):
+            value = ",".join(str(item) for item in value)
+        parts.append(f"{name}={value}")
+    return f"{url}?{'&'.join(parts)}"
+
+
+class _Call:
+    __slots__ = ("task", "deadline", "waiters")
+
+    def __init__(self, task: asyncio.Task, deadline: SharedDeadline):
+        self.task = task
+        self.deadline = deadline
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Объединение одинаковых одновременных запросов в один.
+
+    Первый вызывающий с данным ключом запускает задачу, остальные ждут её же
+    результат или исключение. Отмена одного ожидающего не прерывает запрос для
+    других; задача отменяется, только когда не остаётся ни одного ожидающего.
+
+    Задача работает до самого позднего дедлайна среди ожидающих
+    (``SharedDeadline``), а каждый ожидающий ждёт результат не дольше
+    остатка своего времени.
+    """
+
+    def __init__(self):
+        self._calls: dict[str, _Call] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """Выполнить ``factory()`` или присоединиться к уже идущему запросу с тем же ключом."""
+        call = self._calls.get(key)
+        if call is None:
+            deadline = SharedDeadline()
+            call = _Call(asyncio.get_running_loop().create_task(factory(), context=deadline.context), deadline)
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        own_deadline = call.deadline.join()
+        try:
+            left = remaining()
+            if left is None:
+                return await asyncio.shield(call.task)
+            timeout = asyncio.timeout(max(0.0, left))
+            try:
+                async with timeout:
+                    return await asyncio.shield(call.task)
+            except TimeoutError:
+                if timeout.expired():
+                    raise DeadlineExceeded() from None
+                raise
+        finally:
+            call.deadline.leave(own_deadline)
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Результат больше никому не нужен: новые вызовы начнут запрос заново
+                self._forget(key, call)
+                call.task.cancel()
+
+    def stats(self) -> dict[str, int]:
+        return {"started": self.started, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
@@ -1,6 +1,9 @@
 import sys
 import httpx
-from typing import Any
+import asyncio
+import logging
+from collections import Counter
+from typing import Any, Optional
 from datetime import date
 from pathlib import Path
 
@@ -8,6 +11,35 @@ root_path = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(root_path / 'src'))
 
 from utils.config import settings
+from weather_mcp.deadline import detached
+from weather_mcp.tools.http import fetch_json
+from weather_mcp.tools.resilience import Upstream
+from weather_mcp.tools.singleflight import SingleFlight, request_key
+from weather_mcp.cache.archive import ArchiveStore, DAILY_VARIABLES, coalesce_ranges, merge_daily, split_range
+from weather_mcp.cache.forecast import ForecastCache, STALE
+from weather_mcp.series import DailySeries, HourlySeries
+
+# Почасовые переменные Forecast и Archive API
+HOURLY_VARIABLES = (
+    "temperature_2m",
+    "relative_humidity_2m",
+    "precipitation",
+    "wind_speed_10m",
+    "weather_code"
+)
+
+
+def merge_archive(responses: list[dict[str, Any]]) -> dict[str, Any]:
+    """Склеить ответы Archive API по частям диапазона в один ответ."""
+    merged = {key: responses[0].get(key) for key in ("latitude", "longitude", "timezone")} if responses else {}
+    for block in ("daily", "hourly"):
+        columns: dict[str, list] = {}
+        for data in responses:
+            for name, values in (data.get(block) or {}).items():
+                columns.setdefault(name, []).extend(values)
+        if columns or block == "daily":
+            merged[block] = columns
+    return merged
 
 
 class WeatherService:
@@ -16,18 +48,52 @@ class WeatherService:
     Предоставляет методы для получения текущих прогнозов погоды и
     исторических данных о погоде через Open-Meteo API.
     """
-    def __init__(self):
-        """Инициализация WeatherService с URL API и настройками таймаута."""
+    def __init__(
+        self,
+        forecast_client: Optional[httpx.AsyncClient] = None,
+        archive_client: Optional[httpx.AsyncClient] = None,
+        archive_store: Optional[ArchiveStore] = None,
+        forecast_cache: Optional[ForecastCache] = None
+    ):
+        """Инициализация WeatherService с URL API и настройками таймаута.
+
+        Args:
+            forecast_client: Общий клиент для Forecast API. Если не задан,
+                на каждый запрос создаётся временный клиент.
+            archive_client: Общий клиент для Archive API.
+            archive_store: Локальное хранилище архива. Если задано, с API
+                скачиваются только отсутствующие в нём дни.
+            forecast_cache: Кеш прогнозов. Если задан, прогноз запрашивается
+                для узла сетки кеша и переиспользуется до обновления моделей.
+        """
         self.forecast_base_url = settings.openmeteo_base_url
         self.archive_base_url = settings.openmeteo_archive_url
-        self.timeout = 30.0
+        self.timeout = settings.http_timeout
+        self.forecast_client = forecast_client
+        self.archive_client = archive_client
+        self.archive_store = archive_store
+        self.forecast_cache = forecast_cache
+        self.batch_size = settings.forecast_batch_size
+        self.archive_chunk_days = settings.archive_chunk_days
+        self.archive_semaphore = asyncio.Semaphore(settings.archive_max_concurrency)
+        # Запросы прогноза дешёвые — их можно хеджировать; архивные тяжёлые — только повторять
+        self.forecast_upstream = Upstream.from_settings("Open-Meteo Forecast", hedge=True)
+        self.archive_upstream = Upstream.from_settings(
+            "Open-Meteo Archive", retries=settings.archive_chunk_retries
+        )
+        self.inflight = SingleFlight()
+        # Спрос на прогнозы по узлам сетки: (lat, lon, дни, текущая погода, почасовые) → число запросов.
+        # Считается, только если есть прогрев кеша: он же и уменьшает счётчики
+        self.demand: Optional[Counter[tuple[float, float, int, bool, bool]]] = None
+        self._refresh_tasks: dict[str, asyncio.Task] = {}
 
     async def get_weather(
         self,
         lat: float,
         lon: float,
         forecast_days: int = 1,
-        include_current: bool = True
+        include_current: bool = True,
+        hourly: bool = False
     ) -> dict[str, Any]:
         """Получить прогноз погоды через Open-Meteo API.
         
@@ -36,9 +102,12 @@ class WeatherService:
             lon: Долгота координаты.
             forecast_days: Количество дней прогноза (максимум 16). По умолчанию 1.
             include_current: Включать ли текущую погоду. По умолчанию True.
+            hourly: Запросить также почасовые данные (``data["hourly"]``). По умолчанию False.
             
         Returns:
             Словарь, содержащий статус успеха и данные о погоде или сообщение об ошибке.
+            Если Open-Meteo недоступен, а в кеше есть не слишком старый прогноз,
+            возвращается он с пометкой ``data["stale"]``.
             
         Example:
             >>> service = WeatherService()
@@ -47,52 +116,297 @@ class WeatherService:
             ...     print(result["data"]["current"]["temperature"])
         """
 
-        async with httpx.AsyncClient() as client:
-            params = {
-                "latitude": lat,
-                "longitude": lon,
-                "timezone": "auto",
-                "forecast_days": min(forecast_days, 16),
-                "daily": [
-                    "temperature_2m_max",
-                    "temperature_2m_min",
-                    "precipitation_sum",
-                    "weather_code",
-                    "wind_speed_10m_max"
-                ]
-            }
-
-            if include_current:
-                params["current_weather"] = True
-                params["current"] = [
-                    "temperature_2m",
-                    "relative_humidity_2m",
-                    "wind_speed_10m",
-                    "weather_code"
-                ]
-
-            try:
-                response = await client.get(
-                    f"{self.forecast_base_url}/forecast",
-                    params=params,
-                )
-                response.raise_for_status()
-                data = response.json()
-
+        try:
+            if self.forecast_cache is None:
+                data = await self._fetch_forecast(lat, lon, forecast_days, include_current, hourly=hourly)
                 return {
                     "success": True,
                     "data": self._format_weather_data(data)
                 }
 
+            return await self._get_weather_cached(lat, lon, forecast_days, include_current, hourly)
+
+        except Exception as e:
+            if self.forecast_cache is not None:
+                stale = self._stale_forecast(
+                    self.forecast_cache.key(lat, lon, forecast_days, include_current, hourly), e
+                )
+                if stale is not None:
+                    return stale
+            return {"success": False, "error": f"Ошибка прогноза погоды: {str(e)}"}
+
+    async def get_weather_many(
+        self,
+        points: list[tuple[float, float]],
+        forecast_days: int = 1,
+        include_current: bool = True
+    ) -> dict[str, Any]:
+        """Получить прогноз сразу для нескольких точек пакетными запросами.
+
+        Open-Meteo принимает списки координат через запятую, поэтому точки
+        упаковываются по ``batch_size`` в один запрос, а ответ раскладывается
+        обратно по точкам. С кешем прогнозов запрашиваются только узлы сетки,
+        которых нет в кеше.
+
+        Args:
+            points: Список пар (широта, долгота).
+            forecast_days: Количество дней прогноза (максимум 16). По умолчанию 1.
+            include_current: Включать ли текущую погоду. По умолчанию True.
+
+        Returns:
+            Словарь со статусом успеха и списком результатов в порядке ``points``.
+            Каждый результат имеет тот же вид, что и ответ ``get_weather``.
+
+        Example:
+            >>> service = WeatherService()
+            >>> result = await service.get_weather_many([(55.75, 37.61), (59.93, 30.31)])
+            >>> for point in result["data"]:
+            ...     print(point["data"]["current"]["temperature"])
+        """
+
+        cache = self.forecast_cache
+        results: list[Optional[dict[str, Any]]] = [None] * len(points)
+        # Одинаковые точки (или узлы сетки) запрашиваются один раз
+        pending: dict[str, list[int]] = {}
+        targets: dict[str, tuple[float, float]] = {}
+
+        for i, (lat, lon) in enumerate(points):
+            if cache is None:
+                key = f"{lat},{lon}"
+                target = (lat, lon)
+            else:
+                key = cache.key(lat, lon, forecast_days, include_current)
+                if self.demand is not None:
+                    self.demand[(*cache.cell(lat, lon), forecast_days, include_current, False)] += 1
+                entry, freshness = cache.get(key)
+                if freshness == STALE:
+                    self._schedule_refresh(key, lat, lon, forecast_days, include_current)
+                if entry is not None:
+                    results[i] = {"success": True, "data": entry.value}
+                    continue
+                target = cache.cell(lat, lon)
+
+            pending.setdefault(key, []).append(i)
+            targets[key] = target
+
+        keys = list(targets)
+        batches = [keys[i:i + self.batch_size] for i in range(0, len(keys), self.batch_size)]
+        outcomes = await asyncio.gather(
+            *(
+                self._fetch_forecast_many([targets[key] for key in batch], forecast_days, include_current)
+                for batch in batches
+            ),
+            return_exceptions=True
+        )
+
+        for batch, outcome in zip(batches, outcomes):
+            for n, key in enumerate(batch):
+                if isinstance(outcome, Exception):
+                    result = self._stale_forecast(key, outcome) if cache is not None else None
+                    if result is None:
+                        result = {"success": False, "error": f"Ошибка прогноза погоды: {str(outcome)}"}
+                else:
+                    data = self._format_weather_data(outcome[n])
+                    if cache is not None:
+                        cache.set(key, data)
+                    result = {"success": True, "data": data}
+
+                for i in pending[key]:
+                    results[i] = result
+
+        return {"success": True, "data": results}
+
+    def _forecast_params(
+        self,
+        lat: float | str,
+        lon: float | str,
+        forecast_days: int,
+        include_current: bool,
+        hourly: bool = False
+    ) -> dict[str, Any]:
+        """Параметры запроса Forecast API. Координаты могут быть списками через запятую."""
+        params = {
+            "latitude": lat,
+            "longitude": lon,
+            "timezone": "auto",
+            "forecast_days": min(forecast_days, 16),
+            "daily": [
+                "temperature_2m_max",
+                "temperature_2m_min",
+                "precipitation_sum",
+                "weather_code",
+                "wind_speed_10m_max"
+            ]
+        }
+
+        if include_current:
+            params["current_weather"] = True
+            params["current"] = [
+                "temperature_2m",
+                "relative_humidity_2m",
+                "wind_speed_10m",
+                "weather_code"
+            ]
+
+        if hourly:
+            params["hourly"] = list(HOURLY_VARIABLES)
+
+        return params
+
+    async def _fetch_forecast(
+        self,
+        lat: float,
+        lon: float,
+        forecast_days: int,
+        include_current: bool,
+        hourly: bool = False
+    ) -> dict[str, Any]:
+        """Запросить прогноз у Forecast API и вернуть сырой ответ."""
+        params = self._forecast_params(lat, lon, forecast_days, include_current, hourly)
+        url = f"{self.forecast_base_url}/forecast"
+        return await self.inflight.do(
+            request_key(url, params),
+            lambda: self.forecast_upstream.call(lambda: fetch_json(self.forecast_client, url, params))
+        )
+
+    async def _fetch_forecast_many(
+        self,
+        points: list[tuple[float, float]],
+        forecast_days: int,
+        include_current: bool,
+        hourly: bool = False
+    ) -> list[dict[str, Any]]:
+        """Запросить прогноз для нескольких точек одним запросом.
+
+        Returns:
+            Сырые ответы API в порядке ``points``.
+        """
+        params = self._forecast_params(
+            ",".join(str(lat) for lat, _ in points),
+            ",".join(str(lon) for _, lon in points),
+            forecast_days,
+            include_current,
+            hourly
+        )
+        url = f"{self.forecast_base_url}/forecast"
+        data = await self.inflight.do(
+            request_key(url, params),
+            lambda: self.forecast_upstream.call(lambda: fetch_json(self.forecast_client, url, params))
+        )
+        # Для одной точки API отвечает объектом, для нескольких — списком
+        return data if isinstance(data, list) else [data]
+
+    async def _get_weather_cached(
+        self,
+        lat: float,
+        lon: float,
+        forecast_days: int,
+        include_current: bool,
+        hourly: bool = False
+    ) -> dict[str, Any]:
+        """Прогноз для узла сетки из кеша; устаревшая запись обновляется в фоне."""
+        cache = self.forecast_cache
+        key = cache.key(lat, lon, forecast_days, include_current, hourly)
+        if self.demand is not None:
+            self.demand[(*cache.cell(lat, lon), forecast_days, include_current, hourly)] += 1
+        entry, freshness = cache.get(key)
+
+        if freshness == STALE:
+            self._schedule_refresh(key, lat, lon, forecast_days, include_current, hourly)
+
+        if entry is not None:
+            data = entry.value
+        else:
+            data = await self._refresh_forecast(key, lat, lon, forecast_days, include_current, hourly)
+
+        return {"success": True, "data": data}
+
+    async def _refresh_forecast(
+        self,
+        key: str,
+        lat: float,
+        lon: float,
+        forecast_days: int,
+        include_current: bool,
+        hourly: bool = False
+    ) -> dict[str, Any]:
+        cell_lat, cell_lon = self.forecast_cache.cell(lat, lon)
+        data = self._format_weather_data(
+            await self._fetch_forecast(cell_lat, cell_lon, forecast_days, include_current, hourly=hourly)
+        )
+        self.forecast_cache.set(key, data)
+        return data
+
+    def _stale_forecast(self, key: str, error: Exception) -> Optional[dict[str, Any]]:
+        """Последний известный прогноз с пометкой об устаревании или None."""
+        entry = self.forecast_cache.get_stale(key)
+        if entry is None:
+            return None
+        logging.warning(f"Open-Meteo недоступен, отдан устаревший прогноз {key}: {error}")
+        return {"success": True, "data": {**entry.value, "stale": entry.staleness(str(error))}}
+
+    async def refresh_forecasts(
+        self,
+        cells: list[tuple[float, float]],
+        forecast_days: int = 1,
+        include_current: bool = True,
+        hourly: bool = False
+    ) -> int:
+        """Обновить кеш прогнозов для узлов сетки одним запросом, независимо от свежести.
+
+        Используется прогревом кеша; не больше ``batch_size`` узлов за вызов.
+
+        Returns:
+            Число обновлённых записей.
+
+        Raises:
+            Exception: Ошибка запроса к API.
+        """
+        responses = await self._fetch_forecast_many(cells, forecast_days, include_current, hourly)
+        for (lat, lon), data in zip(cells, responses):
+            key = self.forecast_cache.key(lat, lon, forecast_days, include_current, hourly)
+            self.forecast_cache.set(key, self._format_weather_data(data))
+        return len(responses)
+
+    def _schedule_refresh(
+        self,
+        key: str,
+        lat: float,
+        lon: float,
+        forecast_days: int,
+        include_current: bool,
+        hourly: bool = False
+    ) -> None:
+        """Запустить фоновое обновление записи, если оно ещё не идёт."""
+        if key in self._refresh_tasks:
+            return
+
+        async def refresh():
+            try:
+                await self._refresh_forecast(key, lat, lon, forecast_days, include_current, hourly)
             except Exception as e:
-                return {"success": False, "error": f"Ошибка прогноза погоды: {str(e)}"}
+                logging.warning(f"Фоновое обновление прогноза {key} не удалось: {e}")
+            finally:
+                self._refresh_tasks.pop(key, None)
+
+        # Обновление переживает запрос, который его вызвал, и не ограничено его дедлайном
+        self._refresh_tasks[key] = asyncio.get_running_loop().create_task(refresh(), context=detached())
+
+    async def cancel_background_tasks(self) -> None:
+        """Отменить фоновые обновления (перед закрытием HTTP клиентов)."""
+        tasks = list(self._refresh_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refresh_tasks.clear()
 
     async def get_historical_weather(
         self,
         lat: float,
         lon: float,
         start_date: date,
-        end_date: date
+        end_date: date,
+        hourly: bool = False
     ) -> dict[str, Any]:
         """Получить исторические данные о погоде через Open-Meteo Archive API.
         
@@ -101,6 +415,8 @@ class WeatherService:
             lon: Долгота координаты.
             start_date: Начальная дата для исторических данных.
             end_date: Конечная дата для исторических данных.
+            hourly: Запросить также почасовые данные. Локальное хранилище архива
+                держит только дневные значения, поэтому такие запросы идут в API.
             
         Returns:
             Словарь, содержащий статус успеха и исторические данные о погоде или сообщение об ошибке.
@@ -112,38 +428,141 @@ class WeatherService:
             >>> result = await service.get_historical_weather(55.7558, 37.6176, start, end)
         """
 
-        async with httpx.AsyncClient() as client:
-            params = {
-                "latitude": lat,
-                "longitude": lon,
-                "start_date": start_date.isoformat(),
-                "end_date": end_date.isoformat(),
-                "timezone": "auto",
-                "daily": [
-                    "temperature_2m_max",
-                    "temperature_2m_min",
-                    "precipitation_sum",
-                    "wind_speed_10m_max",
-                    "weather_code"
-                ]
+        try:
+            if self.archive_store is None or hourly:
+                data = merge_archive(await self._fetch_archive_chunks(
+                    lat, lon, split_range(start_date, end_date, self.archive_chunk_days), hourly=hourly
+                ))
+            else:
+                data = await self._fetch_archive_stored(lat, lon, start_date, end_date)
+
+            return {
+                "success": True,
+                "data": self._format_weather_data(data)
             }
 
-            try:
-                response = await client.get(
-                    f"{self.archive_base_url}/archive",
-                    params=params,
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                data = response.json()
+        except Exception as e:
+            return {"success": False, "error": f"Ошибка исторических данных: {str(e)}"}
 
-                return {
-                    "success": True,
-                    "data": self._format_weather_data(data)
-                }
+    async def _fetch_archive(
+        self,
+        lat: float,
+        lon: float,
+        start_date: date,
+        end_date: date,
+        hourly: bool = False
+    ) -> dict[str, Any]:
+        """Запросить диапазон дат у Archive API и вернуть сырой ответ."""
+        params = {
+            "latitude": lat,
+            "longitude": lon,
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "timezone": "auto",
+            "daily": list(DAILY_VARIABLES)
+        }
+        if hourly:
+            params["hourly"] = list(HOURLY_VARIABLES)
 
-            except Exception as e:
-                return {"success": False, "error": f"Ошибка исторических данных: {str(e)}"}
+        url = f"{self.archive_base_url}/archive"
+        return await self.inflight.do(
+            request_key(url, params),
+            lambda: fetch_json(self.archive_client, url, params, timeout=self.timeout)
+        )
+
+    async def _fetch_archive_chunks(
+        self,
+        lat: float,
+        lon: float,
+        chunks: list[tuple[date, date]],
+        return_exceptions: bool = False,
+        hourly: bool = False
+    ) -> list[Any]:
+        """Запросить части диапазона параллельно (не больше ``archive_max_concurrency`` сразу).
+
+        Returns:
+            Сырые ответы API в порядке ``chunks``. С ``return_exceptions`` на месте
+            неудавшейся части стоит её исключение, иначе оно пробрасывается.
+        """
+        return await asyncio.gather(
+            *(self._fetch_archive_chunk(lat, lon, start, end, hourly) for start, end in chunks),
+            return_exceptions=return_exceptions
+        )
+
+    async def _fetch_archive_chunk(
+        self,
+        lat: float,
+        lon: float,
+        start_date: date,
+        end_date: date,
+        hourly: bool = False
+    ) -> dict[str, Any]:
+        """Запросить одну часть архива, повторяя временные ошибки только для неё.
+
+        Слот семафора занимается на время попытки и освобождается на время паузы перед повтором.
+        """
+        async def attempt() -> dict[str, Any]:
+            async with self.archive_semaphore:
+                return await self._fetch_archive(lat, lon, start_date, end_date, hourly=hourly)
+
+        return await self.archive_upstream.call(attempt)
+
+    async def _fetch_archive_stored(
+        self,
+        lat: float,
+        lon: float,
+        start_date: date,
+        end_date: date
+    ) -> dict[str, Any]:
+        """Собрать диапазон из локального хранилища, докачав только недостающие дни.
+
+        Точка привязывается к ячейке сетки хранилища, поэтому и запросы к API
+        идут с координатами ячейки. Неокончательные дни (моложе
+        ``settle_days``) запрашиваются каждый раз и не сохраняются.
+        """
+        store = self.archive_store
+        cell = store.cell(lat, lon)
+        settled_until = store.settled_until()
+        location = store.location(cell)
+        recent: dict[str, list] = {"time": []}
+        for name in DAILY_VARIABLES:
+            recent[name] = []
+
+        missing = coalesce_ranges(
+            store.missing_ranges(cell, start_date, end_date),
+            settings.archive_gap_merge_days
+        )
+        chunks = [
+            chunk
+            for range_start, range_end in missing
+            for chunk in split_range(range_start, range_end, self.archive_chunk_days)
+        ]
+        responses = await self._fetch_archive_chunks(cell[0], cell[1], chunks, return_exceptions=True)
+
+        # Удавшиеся части сохраняются, даже если другие не скачались: повторный вызов докачает только их
+        failed = None
+        for data in responses:
+            if isinstance(data, BaseException):
+                failed = failed or data
+                continue
+            # Если хранилище занято, все дни части отдаются из ответа
+            unsaved_after = settled_until if store.write(cell, data) is not None else date.min
+            if location is None:
+                location = {key: data.get(key) for key in ("latitude", "longitude", "timezone")}
+
+            daily = data.get("daily") or {}
+            for i, value in enumerate(daily.get("time", [])):
+                if date.fromisoformat(value) > unsaved_after:
+                    recent["time"].append(value)
+                    for name in DAILY_VARIABLES:
+                        values = daily.get(name)
+                        recent[name].append(values[i] if values else None)
+
+        if failed is not None:
+            raise failed
+
+        daily = merge_daily(store.read(cell, start_date, end_date), recent)
+        return {**(location or {}), "daily": daily}
 
     def _format_weather_data(self, data: dict[str, Any]) -> dict[str, Any]:
         """Форматирование данных о погоде из ответа API.
@@ -153,6 +572,7 @@ class WeatherService:
             
         Returns:
             Отформатированные данные о погоде с местоположением, текущей погодой и ежедневными прогнозами.
+            Ежедневные данные — ``DailySeries`` поверх колонок ответа, без построчного копирования.
         """
         formatted = {
             "location": {
@@ -172,17 +592,9 @@ class WeatherService:
             }
 
         if "daily" in data:
-            daily = data["daily"]
-            formatted["daily_forecast"] = []
-
-            for i in range(len(daily["time"])):
-                formatted["daily_forecast"].append({
-                    "date": daily["time"][i],
-                    "temperature_max": daily["temperature_2m_max"][i],
-                    "temperature_min": daily["temperature_2m_min"][i],
-                    "precipitation": daily["precipitation_sum"][i],
-                    "weather_code": daily["weather_code"][i],
-                    "wind_speed_max": daily["wind_speed_10m_max"][i]
-                })
+            formatted["daily_forecast"] = DailySeries(data["daily"])
+
+        if "hourly" in data:
+            formatted["hourly"] = HourlySeries(data["hourly"])
 
         return formatted
@@ -0,0 +1,225 @@
+import sys
+import time
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path / 'src'))
+
+try:
+    import fcntl
+except ImportError:  # Windows: блокировок flock нет, прогрев идёт в каждом процессе
+    fcntl = None
+
+from utils.config import settings
+from weather_mcp.tools.resilience import CLOSED
+from weather_mcp.tools.scheduler import BACKGROUND
+
+# Параметры прогноза, которые запрашивают инструменты текущей погоды по городу
+CITY_FORECAST = (1, True, False)
+
+
+def decay(counter: Counter) -> None:
+    """Уполовинить счётчики спроса, чтобы статистика следовала за живым трафиком."""
+    for key, count in list(counter.items()):
+        if count > 1:
+            counter[key] = count // 2
+        else:
+            del counter[key]
+
+
+class WarmerLease:
+    """Право на прогрев среди процессов сервера с общим кешем прогнозов.
+
+    Воркеры HTTP сервера (и процессы stdio пула агента) делят один SQLite
+    кеш, поэтому прогревать его достаточно одному. Право — блокировка
+    ``flock`` на файле рядом с кешем: её держит первый взявший процесс, пока
+    он жив, а после его падения на следующем проходе её берёт другой.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._file: Optional[Any] = None
+
+    @property
+    def held(self) -> bool:
+        return self._file is not None
+
+    def acquire(self) -> bool:
+        """Взять право на прогрев, если его не держит другой процесс."""
+        if self._file is not None or fcntl is None:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        file = open(self.path, "a")
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            file.close()
+            return False
+        self._file = file
+        return True
+
+    def release(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class CacheWarmer:
+    """Фоновый прогрев кешей для популярных мест.
+
+    Сразу после каждого обновления моделей Open-Meteo (через ``delay`` секунд
+    после границы ``ForecastCache.next_update``) заново запрашивает прогнозы:
+
+    * для городов из ``cities`` и самых запрашиваемых городов — их координаты
+      (из кеша геокодирования, при истечении — у Nominatim с фоновым
+      приоритетом) и прогноз текущей погоды;
+    * для самых запрашиваемых узлов сетки прогноза с теми же параметрами,
+      с которыми их запрашивали.
+
+    Прогнозы обновляются пакетами по ``batch_size`` узлов, запросы идут
+    по одному с паузой ``request_interval`` и прекращаются, пока апстрим
+    отключён автоматом, поэтому прогрев не отнимает ресурсы у интерактивных
+    запросов.
+
+    Спрос (``demand`` сервисов) считается, только пока есть прогрев: прогрев
+    включает счётчики и уполовинивает их после каждого прохода.
+
+    С ``lease`` проход выполняет только процесс, владеющий правом на прогрев
+    общего кеша; остальные лишь уменьшают свои счётчики спроса.
+    """
+
+    def __init__(
+        self,
+        geo: Any,
+        weather: Any,
+        cities: Sequence[str] = (),
+        top_n: int = 200,
+        delay: float = 60.0,
+        request_interval: float = 0.5,
+        lease: Optional[WarmerLease] = None
+    ):
+        self.geo = geo
+        self.weather = weather
+        self.cities = list(cities)
+        self.top_n = top_n
+        self.delay = delay
+        self.request_interval = request_interval
+        self.lease = lease
+        for service in (geo, weather):
+            if service.demand is None:
+                service.demand = Counter()
+        self._task: Optional[asyncio.Task] = None
+
+        self.runs = 0
+        self.skipped = 0
+        self.refreshed = 0
+        self.failed = 0
+        self.last_run: Optional[float] = None
+
+    @classmethod
+    def from_settings(cls, geo: Any, weather: Any) -> Optional["CacheWarmer"]:
+        """Создать прогрев по настройкам приложения или None, если он выключен."""
+        if not settings.warmer_enabled or weather.forecast_cache is None:
+            return None
+        disk = weather.forecast_cache.disk
+        return cls(
+            geo,
+            weather,
+            cities=settings.warmer_cities,
+            top_n=settings.warmer_top_n,
+            delay=settings.warmer_delay,
+            request_interval=settings.warmer_request_interval,
+            lease=WarmerLease(disk.path.with_name("warmer.lock")) if disk is not None else None
+        )
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.lease is not None:
+            self.lease.release()
+
+    def next_run(self, now: Optional[float] = None) -> float:
+        """Время следующего прогрева: ``delay`` секунд после ближайшего обновления моделей."""
+        now = time.time() if now is None else now
+        return self.weather.forecast_cache.next_update(now - self.delay) + self.delay
+
+    async def warm(self) -> int:
+        """Один проход прогрева.
+
+        Returns:
+            Число обновлённых записей кеша прогнозов.
+        """
+        groups: defaultdict[tuple[int, bool, bool], dict[tuple[float, float], None]] = defaultdict(dict)
+        cache = self.weather.forecast_cache
+
+        popular = [city for city, _ in self.geo.demand.most_common(self.top_n)]
+        for city in dict.fromkeys([*self.cities, *popular]):
+            result = await self.geo.get_coordinates(city, priority=BACKGROUND)
+            if result["success"]:
+                data = result["data"]
+                groups[CITY_FORECAST][cache.cell(data["lat"], data["lon"])] = None
+
+        for (lat, lon, *options), _ in self.weather.demand.most_common(self.top_n):
+            groups[tuple(options)][(lat, lon)] = None
+
+        decay(self.geo.demand)
+        decay(self.weather.demand)
+
+        refreshed = 0
+        batch_size = self.weather.batch_size
+        for options, cells in groups.items():
+            cells = list(cells)
+            for i in range(0, len(cells), batch_size):
+                if self.weather.forecast_upstream.breaker.state != CLOSED:
+                    logging.warning("Прогрев кеша прерван: Open-Meteo недоступен")
+                    return self._finish(refreshed)
+                try:
+                    refreshed += await self.weather.refresh_forecasts(cells[i:i + batch_size], *options)
+                except Exception as e:
+                    self.failed += 1
+                    logging.warning(f"Прогрев кеша прогнозов не удался: {e}")
+                await asyncio.sleep(self.request_interval)
+
+        return self._finish(refreshed)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+            "last_run": self.last_run
+        }
+
+    def _finish(self, refreshed: int) -> int:
+        self.runs += 1
+        self.refreshed += refreshed
+        self.last_run = time.time()
+        return refreshed
+
+    async def run_once(self) -> int:
+        """Проход прогрева, если право на него у этого процесса; иначе только затухание спроса."""
+        if self.lease is not None and not self.lease.acquire():
+            self.skipped += 1
+            decay(self.geo.demand)
+            decay(self.weather.demand)
+            return 0
+        return await self.warm()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logging.warning(f"Прогрев кеша не удался: {e}")
+            await asyncio.sleep(max(0.0, self.next_run() - time.time()))
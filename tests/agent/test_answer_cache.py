@@ -0,0 +1,148 @@
+import pytest
+from unittest.mock import patch
+
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.prebuilt import create_react_agent
+
+from src.agent import react_agent
+from src.agent.answer_cache import AnswerCache, AnswerKey
+from src.agent.router import FastPathRouter
+from tests.agent.test_router import FakeModel, weather_tools
+
+HOUR = 3600.0
+
+
+class TestAnswerKey:
+
+    def test_near_identical_queries_share_key(self):
+        cache = AnswerCache()
+
+        key = cache.key("погода в Москве", now=HOUR)
+
+        assert cache.key("Какая погода в москве сейчас?", now=HOUR) == key
+        assert cache.key("погода в Казани", now=HOUR) != key
+        assert cache.key("погода в Москве на завтра", now=HOUR) != key
+
+    def test_window_follows_data_updates(self):
+        cache = AnswerCache(current_interval=900, forecast_interval=HOUR)
+
+        current = cache.key("погода в Москве", now=HOUR + 100)
+        forecast = cache.key("прогноз погоды в Москве на 3 дня", now=HOUR + 100)
+
+        assert current.expires_at == HOUR + 900
+        assert forecast.expires_at == 2 * HOUR
+        assert cache.key("прогноз погоды в Москве на 3 дня", now=2 * HOUR + 1) != forecast
+
+    def test_contextual_queries_not_cached(self):
+        cache = AnswerCache()
+
+        assert cache.key("а завтра?") is None
+        assert cache.key("сравни погоду в Москве и Казани") is None
+
+
+class TestAnswerCache:
+
+    def test_answer_reused_until_window_ends(self):
+        cache = AnswerCache()
+        key = AnswerKey("current|москве", expires_at=HOUR)
+
+        with patch("time.time", return_value=HOUR - 10):
+            assert cache.set(key, "🌤️ Тепло") is True
+            assert cache.get(key) == "🌤️ Тепло"
+        with patch("time.time", return_value=HOUR + 1):
+            assert cache.get(key) is None
+
+        assert cache.stats() == {"entries": 0, "hits": 1, "misses": 1, "evictions": 0}
+
+    def test_errors_and_stale_answers_not_cached(self):
+        cache = AnswerCache()
+        key = cache.key("погода в Москве")
+
+        assert cache.set(key, "❌ Произошла ошибка: нет сети") is False
+        assert cache.set(key, "⚠️ Данные устарели: источник недоступен (503)") is False
+        assert cache.get(key) is None
+
+    def test_invalidate(self):
+        cache = AnswerCache()
+        cache.set(cache.key("погода в Москве"), "🌤️ Тепло")
+
+        assert cache.invalidate("Погода в москве") is True
+        assert cache.get(cache.key("погода в Москве")) is None
+        assert cache.invalidate("погода в Москве") is False
+
+
+class TestAgentAnswerCache:
+
+    @pytest.fixture
+    def agent(self):
+        with patch.object(react_agent.settings, "LLM_MODEL", "gemini-2.0-flash"):
+            agent = react_agent.ModernLangChainReActAgent(api_key="test")
+        model = FakeModel(responses=[AIMessage(content="Извините, сейчас не получается узнать погоду.")])
+        agent.agent = create_react_agent(model=model, tools=[], checkpointer=InMemorySaver())
+        agent.router = FastPathRouter(weather_tools())
+        agent.answer_cache = AnswerCache()
+        agent.initialized = True
+        return agent
+
+    @pytest.mark.asyncio
+    async def test_answer_shared_across_threads(self, agent):
+        first = await agent.chat("погода в Москве", thread_id="first")
+        second = await agent.chat("Погода в москве сейчас?", thread_id="second")
+
+        assert first == second == "🌤️ Текущая погода в Москва"
+        assert agent.router.stats() == {"hits": 1, "misses": 0}
+        state = await agent.agent.aget_state({"configurable": {"thread_id": "second"}})
+        assert [message.content for message in state.values["messages"]] == ["Погода в москве сейчас?", second]
+
+    @pytest.mark.asyncio
+    async def test_opt_out_per_request(self, agent):
+        await agent.chat("погода в Москве", thread_id="first")
+        await agent.chat("погода в Москве", thread_id="second", use_cache=False)
+        await agent.chat("погода в Москве", thread_id="third")
+
+        assert agent.router.stats()["hits"] == 2
+        assert agent.answer_cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_agent_fallback_not_cached(self, agent):
+        agent.router = FastPathRouter(weather_tools(current_answer="Не удалось получить погоду: 503"))
+
+        answer = await agent.chat("погода в Москве", thread_id="first")
+
+        assert answer == "Извините, сейчас не получается узнать погоду."
+        assert agent.answer_cache.stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_phrased_stale_answer_not_cached(self, agent):
+        model = FakeModel(responses=[AIMessage(content="В Москве тепло.")])
+        stale = "🌤️ Текущая погода в Москва\n⚠️ Данные устарели: источник недоступен (503)"
+        agent.router = FastPathRouter(weather_tools(current_answer=stale), model=model)
+
+        assert await agent.chat("погода в Москве", thread_id="first") == "В Москве тепло."
+        assert agent.answer_cache.stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_agent_answer_on_tool_data_cached(self, agent):
+        tools = weather_tools()
+        model = FakeModel(responses=[
+            AIMessage(content="", tool_calls=[{"name": "get_city_current_weather", "args": {}, "id": "call-1"}]),
+            AIMessage(content="В Москве тепло.")
+        ])
+        agent.agent = create_react_agent(model=model, tools=tools, checkpointer=InMemorySaver())
+        agent.router = None
+
+        first = await agent.chat("погода в Москве", thread_id="first")
+        second = await agent.chat("Погода в москве сейчас?", thread_id="second")
+
+        assert first == second == "В Москве тепло."
+        assert tools[0].coroutine.await_count == 1
+        assert agent.answer_cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_agent_answer_without_tool_data_not_cached(self, agent):
+        agent.router = None
+
+        await agent.chat("погода в Москве", thread_id="first")
+
+        assert agent.answer_cache.stats()["entries"] == 0
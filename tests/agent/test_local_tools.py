@@ -0,0 +1,55 @@
+import asyncio
+import pytest
+from unittest.mock import patch, AsyncMock
+
+from fastmcp import Client
+from langchain_core.tools import ToolException
+from langchain_mcp_adapters.tools import load_mcp_tools
+
+from src.agent.local_tools import InProcessTools
+from src.agent.mcp_tools import turn_scope
+from src.weather_mcp import server
+
+
+class TestInProcessTools:
+
+    @pytest.mark.asyncio
+    async def test_same_tools_as_over_mcp(self):
+        local = await InProcessTools().list_tools()
+        async with Client(server.mcp) as client:
+            remote = await load_mcp_tools(client.session)
+
+        assert {tool.name: tool.args_schema for tool in local} == {tool.name: tool.args_schema for tool in remote}
+        assert {tool.name: tool.description for tool in local} == {tool.name: tool.description for tool in remote}
+
+    @pytest.mark.asyncio
+    async def test_tool_call_renders_like_server(self):
+        tools = {tool.name: tool for tool in await InProcessTools().list_tools()}
+        result = {"success": True, "data": {"lat": 55.75, "lon": 37.62, "display_name": "Москва"}}
+
+        with patch.object(server.services.geo, "get_coordinates", AsyncMock(return_value=result)):
+            content, artifacts = await tools["get_coord"].coroutine(city="Москва")
+            expected = await server.get_coord.fn("Москва")
+
+        assert content == expected
+        assert artifacts is None
+
+    @pytest.mark.asyncio
+    async def test_turn_deadline_limits_call(self):
+        tools = {tool.name: tool for tool in await InProcessTools().list_tools()}
+
+        async def slow(*args, **kwargs):
+            await asyncio.sleep(10)
+
+        with patch.object(server.services.geo, "get_coordinates", slow), turn_scope(0.05):
+            with pytest.raises(ToolException, match="Превышено время ожидания"):
+                await tools["get_coord"].coroutine(city="Москва")
+
+    @pytest.mark.asyncio
+    async def test_services_started_for_agent_lifetime(self):
+        tools = InProcessTools()
+
+        await tools.start()
+        assert server.services.started is True
+        await tools.close()
+        assert server.services.started is False
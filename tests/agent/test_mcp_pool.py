@@ -0,0 +1,148 @@
+import asyncio
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import patch, MagicMock, AsyncMock
+
+import anyio
+import httpx
+from mcp import types
+from mcp.shared.exceptions import McpError
+
+from src.agent.mcp_pool import SessionPool, bind_to_pool, slot_connections
+
+
+def text_result(text: str) -> types.CallToolResult:
+    return types.CallToolResult(content=[types.TextContent(type="text", text=text)])
+
+
+class FakeServer:
+    """Подменяет create_session: каждая новая сессия — новый «процесс» сервера."""
+
+    def __init__(self):
+        self.sessions: list[MagicMock] = []
+
+    def new_session(self) -> MagicMock:
+        session = MagicMock()
+        session.initialize = AsyncMock()
+        session.send_ping = AsyncMock()
+        session.send_request = AsyncMock(return_value=text_result(f"сессия {len(self.sessions)}"))
+        return session
+
+    @asynccontextmanager
+    async def create_session(self, connection):
+        session = self.new_session()
+        self.sessions.append(session)
+        yield session
+
+
+@pytest.fixture
+def server():
+    fake = FakeServer()
+    with patch("src.agent.mcp_pool.create_session", fake.create_session):
+        yield fake
+
+
+async def wait_for_spawns(pool: SessionPool, count: int) -> None:
+    async def spawned():
+        while pool.spawned < count or pool.stats()["ready"] < pool.stats()["size"]:
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(spawned(), 1.0)
+
+
+class TestSessionPool:
+
+    @pytest.mark.asyncio
+    async def test_calls_reuse_long_lived_sessions(self, server):
+        pool = SessionPool({"transport": "stdio"}, size=2)
+        await pool.start()
+        try:
+            results = [await pool.call_tool("get_coord", {"city": "Москва"}) for _ in range(4)]
+        finally:
+            await pool.close()
+
+        assert len(server.sessions) == 2
+        assert [result.content[0].text for result in results] == ["сессия 0", "сессия 1"] * 2
+        for session in server.sessions:
+            session.initialize.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_broken_session_respawned(self, server):
+        pool = SessionPool({"transport": "stdio"}, respawn_delay=0)
+        await pool.start()
+        server.sessions[0].send_request.side_effect = anyio.ClosedResourceError()
+        try:
+            with pytest.raises(anyio.ClosedResourceError):
+                await pool.call_tool("get_coord", {"city": "Москва"})
+            await wait_for_spawns(pool, 2)
+            result = await pool.call_tool("get_coord", {"city": "Москва"})
+        finally:
+            await pool.close()
+
+        assert result.content[0].text == "сессия 1"
+        assert pool.restarts == 1
+
+    @pytest.mark.asyncio
+    async def test_session_without_ping_respawned(self, server):
+        pool = SessionPool({"transport": "stdio"}, ping_interval=0.01, respawn_delay=0)
+        await pool.start()
+        server.sessions[0].send_ping.side_effect = RuntimeError("нет ответа")
+        try:
+            await wait_for_spawns(pool, 2)
+        finally:
+            await pool.close()
+
+        assert pool.ping_failures >= 1
+
+    @pytest.mark.asyncio
+    async def test_tool_timeout_keeps_session(self, server):
+        pool = SessionPool({"transport": "stdio"})
+        await pool.start()
+        timeout = McpError(types.ErrorData(code=httpx.codes.REQUEST_TIMEOUT, message="Timed out"))
+        server.sessions[0].send_request.side_effect = timeout
+        try:
+            with pytest.raises(McpError):
+                await pool.call_tool("get_coord", {"city": "Москва"})
+            await asyncio.sleep(0.05)
+        finally:
+            await pool.close()
+
+        assert len(server.sessions) == 1
+
+    @pytest.mark.asyncio
+    async def test_bound_tool_calls_through_pool(self, server):
+        pool = SessionPool({"transport": "stdio"})
+        await pool.start()
+        tool = MagicMock()
+        tool.name = "get_coord"
+        tool.model_copy = lambda update: MagicMock(**update)
+        try:
+            bound = bind_to_pool(tool, pool)
+            content, artifacts = await bound.coroutine(city="Москва")
+        finally:
+            await pool.close()
+
+        assert content == "сессия 0"
+        request, _ = server.sessions[0].send_request.await_args.args
+        assert request.root.params.arguments == {"city": "Москва"}
+
+
+class TestSlotConnections:
+
+    def test_stdio_processes_share_nominatim_limit(self):
+        connection = {"transport": "stdio", "command": "python", "args": ["server.py"], "env": {"A": "1"}}
+
+        with patch("src.agent.mcp_pool.settings.nominatim_rate_limit", 1.0):
+            connections = slot_connections(connection, 4)
+
+        assert [c["env"]["NOMINATIM_RATE_LIMIT"] for c in connections] == ["0.25"] * 4
+        assert [c["env"].get("WARMER_ENABLED") for c in connections] == [None, "false", "false", "false"]
+        assert all(c["env"]["A"] == "1" for c in connections)
+        assert connection["env"] == {"A": "1"}
+
+    def test_single_process_and_http_unchanged(self):
+        stdio = {"transport": "stdio", "command": "python", "args": []}
+        http = {"transport": "streamable_http", "url": "http://localhost:8000/mcp"}
+
+        assert slot_connections(stdio, 1) == [stdio]
+        assert slot_connections(http, 3) == [http] * 3
@@ -0,0 +1,162 @@
+import json
+from typing import Optional
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.tools import StructuredTool
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.prebuilt import create_react_agent
+
+from src.agent import react_agent
+from src.agent.router import CURRENT, FORECAST, HISTORY, FastPathRouter, Route, match
+
+
+class FakeModel(FakeMessagesListChatModel):
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+def fake_tool(name: str, answer: str) -> StructuredTool:
+    """Инструмент с JSON схемой аргументов, как у загруженных из MCP."""
+    return StructuredTool(
+        name=name,
+        description=name,
+        args_schema={"type": "object", "properties": {}},
+        coroutine=AsyncMock(return_value=answer)
+    )
+
+
+def weather_tools(coord_answer: Optional[str] = None, current_answer: Optional[str] = None) -> list[StructuredTool]:
+    coordinates = coord_answer or json.dumps({"name": "Казань, Россия", "lat": 55.79, "lon": 49.12})
+    return [
+        fake_tool("get_city_current_weather", current_answer or "🌤️ Текущая погода в Москва"),
+        fake_tool("get_coord", coordinates),
+        fake_tool("get_weather", "📅 Прогноз для координат 55.79, 49.12"),
+        fake_tool("get_city_historical_weather", "📊 История для Сочи")
+    ]
+
+
+class TestMatch:
+
+    @pytest.mark.parametrize("text, route", [
+        ("погода в Москве", Route(CURRENT, "Москва")),
+        ("Какая погода в Санкт-Петербурге сейчас?", Route(CURRENT, "Санкт-Петербург")),
+        ("What's the weather in New York?", Route(CURRENT, "New York")),
+        ("погода в Казани на завтра", Route(FORECAST, "Казань", days=2)),
+        ("weather in London tomorrow", Route(FORECAST, "London", days=2)),
+        ("прогноз погоды в Сочи на 5 дней", Route(FORECAST, "Сочи", days=5)),
+        ("5-day forecast for Tokyo", Route(FORECAST, "Tokyo", days=5)),
+        ("прогноз погоды в Омске", Route(FORECAST, "Омск", days=3)),
+        ("погода в Сочи с 2024-01-01 по 2024-01-10", Route(HISTORY, "Сочи", start_date="2024-01-01", end_date="2024-01-10")),
+        ("weather in Berlin on 2024-01-15", Route(HISTORY, "Berlin", start_date="2024-01-15", end_date="2024-01-15")),
+        ("погода в Ростове-на-Дону", Route(CURRENT, "Ростов-на-Дону")),
+        ("погода в Перми", Route(CURRENT, "Пермь"))
+    ])
+    def test_simple_queries(self, text, route):
+        assert match(text) == route
+
+    @pytest.mark.parametrize("text", [
+        "погода в Москве и Казани",
+        "сравни погоду в Москве и Казани",
+        "погода в Москве на 30 дней",
+        "какая будет средняя температура в Москве в январе",
+        "расскажи анекдот",
+        "weather in london yesterday",
+        "погода в Москве завтра утром",
+        "погода в Москве на выходные",
+        "погода в Москве через неделю",
+        "погода в Москве вчера вечером",
+        "weather in Paris this weekend",
+        "погода в Туле",
+        "погода в Нижнем Новгороде"
+    ])
+    def test_complex_queries_fall_through(self, text):
+        assert match(text) is None
+
+
+class TestFastPathRouter:
+
+    @pytest.mark.asyncio
+    async def test_current_weather_rendered_by_tool(self):
+        tools = weather_tools()
+        router = FastPathRouter(tools)
+
+        answer = await router.answer("погода в Москве")
+
+        assert answer.text == answer.data == "🌤️ Текущая погода в Москва"
+        tools[0].coroutine.assert_awaited_once_with(city="Москва")
+        assert router.stats() == {"hits": 1, "misses": 0}
+
+    @pytest.mark.asyncio
+    async def test_forecast_uses_coordinates_and_city_name(self):
+        tools = weather_tools()
+        router = FastPathRouter(tools)
+
+        answer = await router.answer("погода в Казани на завтра")
+
+        assert answer.text.startswith("📍 Казань, Россия\n\n📅 Прогноз")
+        tools[1].coroutine.assert_awaited_once_with(city="Казань", output_format="json")
+        tools[2].coroutine.assert_awaited_once_with(lat=55.79, lon=49.12, count_days=2)
+
+    @pytest.mark.asyncio
+    async def test_tool_error_falls_through(self):
+        router = FastPathRouter(weather_tools(coord_answer="Ошибка при поиске города: не найден"))
+
+        assert await router.answer("forecast for Atlantis") is None
+        assert router.stats() == {"hits": 0, "misses": 1}
+
+    @pytest.mark.asyncio
+    async def test_answer_phrased_with_single_model_call(self):
+        model = FakeModel(responses=[AIMessage(content="В Москве тепло и солнечно.")])
+        router = FastPathRouter(weather_tools(), model=model)
+
+        answer = await router.answer("погода в Москве")
+
+        assert answer.text == "В Москве тепло и солнечно."
+        assert answer.data == "🌤️ Текущая погода в Москва"
+
+    @pytest.mark.asyncio
+    async def test_model_error_returns_server_text(self):
+        model = MagicMock()
+        model.ainvoke = AsyncMock(side_effect=RuntimeError("quota exceeded"))
+        router = FastPathRouter(weather_tools(), model=model)
+
+        answer = await router.answer("погода в Москве")
+
+        assert answer.text == "🌤️ Текущая погода в Москва"
+
+
+class TestAgentFastPath:
+
+    @pytest.mark.asyncio
+    async def test_fast_answer_kept_in_thread_memory(self):
+        with patch.object(react_agent.settings, "LLM_MODEL", "gemini-2.0-flash"):
+            agent = react_agent.ModernLangChainReActAgent(api_key="test")
+        model = FakeModel(responses=[AIMessage(content="А завтра прохладнее.")])
+        agent.agent = create_react_agent(model=model, tools=[], checkpointer=InMemorySaver())
+        agent.router = FastPathRouter(weather_tools())
+        agent.initialized = True
+
+        first = await agent.chat("погода в Москве", thread_id="thread")
+        second = await agent.chat("а завтра?", thread_id="thread")
+
+        state = await agent.agent.aget_state({"configurable": {"thread_id": "thread"}})
+        assert first == "🌤️ Текущая погода в Москва"
+        assert second == "А завтра прохладнее."
+        assert [message.content for message in state.values["messages"]] == [
+            "погода в Москве", first, "а завтра?", second
+        ]
+
+    @pytest.mark.asyncio
+    async def test_router_returning_plain_text_supported(self):
+        with patch.object(react_agent.settings, "LLM_MODEL", "gemini-2.0-flash"):
+            agent = react_agent.ModernLangChainReActAgent(api_key="test")
+        agent.agent = create_react_agent(model=FakeModel(responses=[]), tools=[], checkpointer=InMemorySaver())
+        agent.router = MagicMock()
+        agent.router.answer = AsyncMock(return_value="🌤️ Тепло")
+        agent.initialized = True
+
+        assert await agent.chat("погода в Москве", thread_id="thread") == "🌤️ Тепло"
@@ -0,0 +1,86 @@
+import asyncio
+import time
+import pytest
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import StructuredTool
+
+from src.agent.mcp_tools import remaining_budget
+from src.agent.tool_node import create_tool_node
+
+CITIES = ["Москва", "Казань", "Сочи", "Омск", "Пермь"]
+
+
+def city_tool(delay: float | dict, stats: dict) -> StructuredTool:
+    async def get_city_weather(city: str) -> str:
+        stats["running"] += 1
+        stats["peak"] = max(stats["peak"], stats["running"])
+        stats["budgets"].append(remaining_budget())
+        try:
+            await asyncio.sleep(delay[city] if isinstance(delay, dict) else delay)
+        finally:
+            stats["running"] -= 1
+        return f"Погода в {city}"
+
+    return StructuredTool.from_function(coroutine=get_city_weather, name="get_city_weather", description="Погода")
+
+
+def turn(cities: list[str]) -> dict:
+    calls = [
+        {"name": "get_city_weather", "args": {"city": city}, "id": f"call-{i}", "type": "tool_call"}
+        for i, city in enumerate(cities)
+    ]
+    return {"messages": [AIMessage(content="", tool_calls=calls)]}
+
+
+@pytest.fixture
+def stats() -> dict:
+    return {"running": 0, "peak": 0, "budgets": []}
+
+
+class TestBoundedToolNode:
+
+    @pytest.mark.asyncio
+    async def test_calls_of_one_turn_run_concurrently_in_order(self, stats):
+        # Первый город отвечает дольше всех, но его ответ должен остаться первым
+        delays = dict(zip(CITIES, [0.2, 0.05, 0.1, 0.05, 0.1]))
+        node = create_tool_node([city_tool(delays, stats)], max_concurrency=5)
+
+        started = time.monotonic()
+        result = await node.ainvoke(turn(CITIES))
+        elapsed = time.monotonic() - started
+
+        assert [message.content for message in result["messages"]] == [f"Погода в {city}" for city in CITIES]
+        assert [message.tool_call_id for message in result["messages"]] == [f"call-{i}" for i in range(5)]
+        assert stats["peak"] == 5
+        assert elapsed < 0.4
+
+    @pytest.mark.asyncio
+    async def test_concurrency_capped(self, stats):
+        node = create_tool_node([city_tool(0.02, stats)], max_concurrency=2)
+
+        result = await node.ainvoke(turn(CITIES))
+
+        assert len(result["messages"]) == 5
+        assert stats["peak"] == 2
+
+    @pytest.mark.asyncio
+    async def test_slow_call_times_out_alone(self, stats, monkeypatch):
+        monkeypatch.setattr("src.agent.tool_node.RESPONSE_GRACE", 0.0)
+        delays = {"Москва": 10, "Казань": 0.01}
+        node = create_tool_node([city_tool(delays, stats)], call_timeout=0.05)
+
+        result = await node.ainvoke(turn(["Москва", "Казань"]))
+
+        slow, fast = result["messages"]
+        assert slow.status == "error"
+        assert "не ответил за 0.05 с" in slow.content
+        assert fast.content == "Погода в Казань"
+
+    @pytest.mark.asyncio
+    async def test_call_timeout_passed_as_budget(self, stats):
+        node = create_tool_node([city_tool(0.0, stats)], call_timeout=5.0)
+
+        await node.ainvoke(turn(["Москва"]))
+
+        assert 0 < stats["budgets"][0] <= 5.0
@@ -0,0 +1,22 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path / 'src'))
+
+# Сервисы, созданные при импорте модулей (контейнер сервера), держат кеши только в памяти
+os.environ["CACHE_DIR"] = ""
+
+# Модули сервера и агента импортируют настройки как utils.config и src.utils.config
+from utils.config import settings as server_settings
+from src.utils.config import settings as agent_settings
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Персистентные кеши каждого теста — во временном каталоге, а не в <repo>/.cache."""
+    for settings in (server_settings, agent_settings):
+        monkeypatch.setattr(settings, "cache_dir", str(tmp_path))
@@ -0,0 +1,206 @@
+import pytest
+from datetime import date, timedelta
+from unittest.mock import patch, AsyncMock
+
+from src.weather_mcp.cache.archive import ArchiveStore, coalesce_ranges, date_ranges
+from src.weather_mcp.cache.grid import snap
+from src.weather_mcp.cache.sqlite import connect
+from src.weather_mcp.tools.weather import WeatherService
+
+
+def archive_response(start: date, end: date, lat: float = 55.8, lon: float = 37.6) -> dict:
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "timezone": "Europe/Moscow",
+        "daily": {
+            "time": [day.isoformat() for day in days],
+            "temperature_2m_max": [float(day.day) for day in days],
+            "temperature_2m_min": [-float(day.day) for day in days],
+            "precipitation_sum": [0.5 for _ in days],
+            "wind_speed_10m_max": [None for _ in days],
+            "weather_code": [61 for _ in days]
+        }
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    archive = ArchiveStore(tmp_path / "archive.sqlite3", grid_step=0.1, settle_days=7)
+    yield archive
+    archive.close()
+
+
+class TestArchiveHelpers:
+
+    def test_snap(self):
+        assert snap(55.7558, 0.1) == 55.8
+        assert snap(37.6176, 0.1) == 37.6
+        assert snap(-0.04, 0.1) == 0.0
+
+    def test_date_ranges(self):
+        days = [date(2024, 1, 1), date(2024, 1, 2), date(2024, 1, 5)]
+        assert date_ranges(days) == [
+            (date(2024, 1, 1), date(2024, 1, 2)),
+            (date(2024, 1, 5), date(2024, 1, 5))
+        ]
+
+    def test_coalesce_ranges(self):
+        ranges = [
+            (date(2024, 1, 1), date(2024, 1, 2)),
+            (date(2024, 1, 5), date(2024, 1, 6)),
+            (date(2024, 3, 1), date(2024, 3, 2))
+        ]
+        assert coalesce_ranges(ranges, 3) == [
+            (date(2024, 1, 1), date(2024, 1, 6)),
+            (date(2024, 3, 1), date(2024, 3, 2))
+        ]
+
+
+class TestArchiveStore:
+
+    def test_write_and_read_roundtrip(self, store):
+        cell = store.cell(55.7558, 37.6176)
+        data = archive_response(date(2023, 12, 30), date(2024, 1, 2))
+
+        saved = store.write(cell, data, today=date(2025, 1, 1))
+        daily = store.read(cell, date(2023, 12, 30), date(2024, 1, 2))
+
+        assert saved == 4
+        assert daily["time"] == data["daily"]["time"]
+        assert daily["temperature_2m_max"] == data["daily"]["temperature_2m_max"]
+        assert daily["wind_speed_10m_max"] == [None] * 4
+        assert daily["weather_code"] == [61] * 4
+        assert store.location(cell)["timezone"] == "Europe/Moscow"
+
+    def test_missing_ranges(self, store):
+        cell = store.cell(55.75, 37.61)
+        store.write(cell, archive_response(date(2024, 1, 10), date(2024, 1, 20)), today=date(2025, 1, 1))
+
+        assert store.missing_ranges(cell, date(2024, 1, 1), date(2024, 1, 31)) == [
+            (date(2024, 1, 1), date(2024, 1, 9)),
+            (date(2024, 1, 21), date(2024, 1, 31))
+        ]
+        assert store.missing_ranges(cell, date(2024, 1, 12), date(2024, 1, 15)) == []
+
+    def test_recent_days_are_not_stored(self, store):
+        cell = store.cell(55.75, 37.61)
+        today = date(2024, 1, 20)
+
+        saved = store.write(cell, archive_response(date(2024, 1, 10), date(2024, 1, 19)), today=today)
+
+        assert saved == 4
+        assert store.missing_ranges(cell, date(2024, 1, 10), date(2024, 1, 19)) == [
+            (date(2024, 1, 14), date(2024, 1, 19))
+        ]
+
+
+    def test_write_skipped_while_file_locked(self, store):
+        cell = store.cell(55.75, 37.61)
+        store.location(cell)
+        other = connect(store.path)
+        other.execute("BEGIN IMMEDIATE")
+        try:
+            saved = store.write(cell, archive_response(date(2024, 1, 10), date(2024, 1, 20)), today=date(2025, 1, 1))
+        finally:
+            other.rollback()
+            other.close()
+
+        assert saved is None
+        assert store.missing_ranges(cell, date(2024, 1, 10), date(2024, 1, 20)) == [
+            (date(2024, 1, 10), date(2024, 1, 20))
+        ]
+
+    def test_concurrent_writers_keep_each_others_days(self, store):
+        other = ArchiveStore(store.path, grid_step=0.1, settle_days=7)
+        cell = store.cell(55.75, 37.61)
+        load_blocks = store._load_blocks
+        saved = {}
+
+        def load_then_race(*args):
+            # Другой воркер пишет соседний кусок того же года между чтением и записью
+            blocks = load_blocks(*args)
+            saved["other"] = other.write(cell, archive_response(date(2024, 2, 1), date(2024, 2, 10)), today=date(2025, 1, 1))
+            return blocks
+
+        with patch.object(store, "_load_blocks", side_effect=load_then_race):
+            saved["store"] = store.write(cell, archive_response(date(2024, 1, 1), date(2024, 1, 10)), today=date(2025, 1, 1))
+        if saved["other"] is None:
+            other.write(cell, archive_response(date(2024, 2, 1), date(2024, 2, 10)), today=date(2025, 1, 1))
+        other.close()
+
+        assert saved["store"] == 10
+        assert store.missing_ranges(cell, date(2024, 1, 1), date(2024, 2, 10)) == [
+            (date(2024, 1, 11), date(2024, 1, 31))
+        ]
+
+
+class TestWeatherServiceArchiveStore:
+
+    @pytest.mark.asyncio
+    async def test_only_missing_days_are_fetched(self, store):
+        service = WeatherService(archive_store=store)
+        cell = store.cell(55.7558, 37.6176)
+        store.write(cell, archive_response(date(2023, 1, 1), date(2023, 6, 30)))
+
+        async def fake_fetch(lat, lon, start, end, **options):
+            return archive_response(start, end)
+
+        with patch.object(service, "_fetch_archive", AsyncMock(side_effect=fake_fetch)) as fetch:
+            result = await service.get_historical_weather(55.7558, 37.6176, date(2023, 1, 1), date(2023, 12, 31))
+
+        fetch.assert_awaited_once_with(55.8, 37.6, date(2023, 7, 1), date(2023, 12, 31), hourly=False)
+        assert result["success"] is True
+        forecast = result["data"]["daily_forecast"]
+        assert len(forecast) == 365
+        assert forecast[0]["date"] == "2023-01-01"
+        assert forecast[-1]["date"] == "2023-12-31"
+
+    @pytest.mark.asyncio
+    async def test_fully_stored_range_skips_upstream(self, store):
+        service = WeatherService(archive_store=store)
+        cell = store.cell(55.7558, 37.6176)
+        store.write(cell, archive_response(date(2023, 1, 1), date(2023, 1, 31)))
+
+        with patch.object(service, "_fetch_archive", AsyncMock()) as fetch:
+            result = await service.get_historical_weather(55.7558, 37.6176, date(2023, 1, 5), date(2023, 1, 10))
+
+        fetch.assert_not_awaited()
+        assert len(result["data"]["daily_forecast"]) == 6
+        assert result["data"]["location"]["latitude"] == 55.8
+
+    @pytest.mark.asyncio
+    async def test_recent_days_are_merged_from_upstream(self, store):
+        service = WeatherService(archive_store=store)
+        end = date.today() - timedelta(days=1)
+        start = end - timedelta(days=9)
+
+        async def fake_fetch(lat, lon, range_start, range_end, **options):
+            return archive_response(range_start, range_end)
+
+        with patch.object(service, "_fetch_archive", AsyncMock(side_effect=fake_fetch)) as fetch:
+            first = await service.get_historical_weather(55.75, 37.61, start, end)
+            second = await service.get_historical_weather(55.75, 37.61, start, end)
+
+        assert len(first["data"]["daily_forecast"]) == 10
+        assert [day["date"] for day in second["data"]["daily_forecast"]] == \
+            [day["date"] for day in first["data"]["daily_forecast"]]
+        # Второй вызов докачивает только неокончательные дни
+        assert fetch.await_args_list[1].args[2] == store.settled_until() + timedelta(days=1)
+
+    @pytest.mark.asyncio
+    async def test_unsaved_days_served_from_response(self, store):
+        service = WeatherService(archive_store=store)
+        cell = store.cell(55.7558, 37.6176)
+        store.write(cell, archive_response(date(2023, 1, 1), date(2023, 1, 10)))
+
+        async def fake_fetch(lat, lon, start, end, **options):
+            return archive_response(start, end)
+
+        with patch.object(service, "_fetch_archive", AsyncMock(side_effect=fake_fetch)), \
+                patch.object(store, "write", return_value=None):
+            result = await service.get_historical_weather(55.7558, 37.6176, date(2022, 12, 25), date(2023, 1, 20))
+
+        dates = [day["date"] for day in result["data"]["daily_forecast"]]
+        assert dates == [(date(2022, 12, 25) + timedelta(days=i)).isoformat() for i in range(27)]
@@ -0,0 +1,247 @@
+import asyncio
+import pytest
+import httpx
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from fastmcp.exceptions import ToolError
+from mcp import types
+
+from src.agent.mcp_tools import call_tool, turn_scope
+from src.weather_mcp.tools.http import fetch_json
+from src.weather_mcp.tools.resilience import CircuitBreaker, Upstream
+from src.weather_mcp.tools.singleflight import SingleFlight
+from src.weather_mcp.tools.weather import WeatherService
+from src.weather_mcp.cache.forecast import ForecastCache
+# Модули сервера импортируют дедлайн как weather_mcp.deadline
+from weather_mcp.deadline import DeadlineExceeded, DeadlineMiddleware, clamp, remaining, scope
+
+
+def server_error() -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://api.open-meteo.com/v1/forecast")
+    response = httpx.Response(503, request=request)
+    return httpx.HTTPStatusError("Service Unavailable", request=request, response=response)
+
+
+def tool_context(timeout=None) -> MagicMock:
+    context = MagicMock()
+    context.fastmcp_context.request_context.meta = types.RequestParams.Meta(timeout=timeout)
+    return context
+
+
+class TestDeadlineScope:
+
+    def test_inner_scope_cannot_extend_outer(self):
+        assert remaining() is None
+        with scope(1.0):
+            with scope(100.0):
+                assert remaining() <= 1.0
+            with scope(0.5):
+                assert remaining() <= 0.5
+        assert remaining() is None
+
+    def test_clamp(self):
+        assert clamp(30.0) == 30.0
+        with scope(2.0):
+            assert clamp(30.0) <= 2.0
+            assert clamp(1.0) == 1.0
+        with scope(-1.0):
+            with pytest.raises(DeadlineExceeded):
+                clamp(30.0)
+
+
+class TestDeadlinePropagation:
+
+    @pytest.mark.asyncio
+    async def test_http_timeout_clamped_to_remaining_budget(self):
+        client = MagicMock()
+        client.get = AsyncMock(return_value=MagicMock(json=MagicMock(return_value={})))
+
+        with scope(2.0):
+            await fetch_json(client, "https://example.com", {}, timeout=30.0)
+
+        assert client.get.await_args.kwargs["timeout"] <= 2.0
+
+    @pytest.mark.asyncio
+    async def test_expired_deadline_skips_request(self):
+        client = MagicMock()
+        client.get = AsyncMock()
+
+        with scope(-1.0):
+            with pytest.raises(DeadlineExceeded):
+                await fetch_json(client, "https://example.com", {})
+
+        client.get.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_no_retry_when_backoff_exceeds_budget(self):
+        upstream = Upstream("Open-Meteo", retries=2, backoff_base=5.0, backoff_max=5.0)
+        operation = AsyncMock(side_effect=server_error())
+
+        with patch("random.uniform", return_value=5.0), scope(1.0):
+            with pytest.raises(httpx.HTTPStatusError):
+                await upstream.call(operation)
+
+        operation.assert_awaited_once()
+        assert upstream.retried == 0
+
+    @pytest.mark.asyncio
+    async def test_deadline_timeout_not_counted_by_breaker(self):
+        upstream = Upstream("Open-Meteo", retries=0, breaker=CircuitBreaker(failure_threshold=1))
+
+        async def timed_out():
+            await asyncio.sleep(0.02)
+            raise httpx.ReadTimeout("timed out")
+
+        with scope(0.01):
+            with pytest.raises(httpx.ReadTimeout):
+                await upstream.call(timed_out)
+
+        assert upstream.breaker.failures == 0
+
+
+class TestSharedTasks:
+
+    @pytest.mark.asyncio
+    async def test_joiner_keeps_own_deadline(self):
+        flight = SingleFlight()
+        budgets = []
+
+        async def fetch():
+            budgets.append(remaining())
+            await asyncio.sleep(0.2)
+            budgets.append(remaining())
+            return "ok"
+
+        async def leader():
+            with scope(0.05):
+                return await flight.do("key", fetch)
+
+        async def joiner():
+            await asyncio.sleep(0)
+            with scope(30.0):
+                return await flight.do("key", fetch)
+
+        results = await asyncio.gather(leader(), joiner(), return_exceptions=True)
+
+        assert isinstance(results[0], DeadlineExceeded)
+        assert results[1] == "ok"
+        # Запрос идёт до самого позднего дедлайна ожидающих
+        assert budgets[0] <= 30.0 and budgets[1] > 10.0
+
+    @pytest.mark.asyncio
+    async def test_coalesced_fetch_clamped_to_waiters_budget(self):
+        flight = SingleFlight()
+        client = MagicMock()
+        client.get = AsyncMock(return_value=MagicMock(json=MagicMock(return_value={})))
+
+        with scope(2.0):
+            await flight.do("key", lambda: fetch_json(client, "https://example.com", {}, timeout=30.0))
+
+        assert client.get.await_args.kwargs["timeout"] <= 2.0
+
+    @pytest.mark.asyncio
+    async def test_waiter_without_deadline_lifts_limit(self):
+        flight = SingleFlight()
+        gate = asyncio.Event()
+        budgets = []
+
+        async def fetch():
+            await gate.wait()
+            budgets.append(remaining())
+
+        with scope(5.0):
+            leader = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        joiner = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0.01)
+        gate.set()
+        await asyncio.gather(leader, joiner)
+
+        assert budgets == [None]
+
+    @pytest.mark.asyncio
+    async def test_background_refresh_runs_without_deadline(self):
+        service = WeatherService(forecast_cache=ForecastCache())
+        budgets = []
+
+        async def refresh(*args):
+            budgets.append(remaining())
+
+        with patch.object(service, "_refresh_forecast", refresh):
+            with scope(0.1):
+                service._schedule_refresh("key", 55.75, 37.62, 1, True)
+            await asyncio.gather(*service._refresh_tasks.values())
+
+        assert budgets == [None]
+
+
+class TestDeadlineMiddleware:
+
+    @pytest.mark.asyncio
+    async def test_client_budget_limits_tool_call(self):
+        seen = []
+
+        async def call_next(context):
+            seen.append(remaining())
+            return "ok"
+
+        result = await DeadlineMiddleware().on_call_tool(tool_context(timeout=5.0), call_next)
+
+        assert result == "ok"
+        assert seen[0] <= 5.0
+
+    @pytest.mark.asyncio
+    async def test_slow_call_cancelled_after_budget(self):
+        cancelled = asyncio.Event()
+
+        async def call_next(context):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(ToolError, match="Превышено время ожидания"):
+            await DeadlineMiddleware().on_call_tool(tool_context(timeout=0.05), call_next)
+
+        assert cancelled.is_set()
+
+    @pytest.mark.asyncio
+    async def test_server_limit_applies_without_client_budget(self):
+        seen = []
+
+        async def call_next(context):
+            seen.append(remaining())
+
+        with patch("weather_mcp.deadline.settings.tool_timeout", 3.0):
+            await DeadlineMiddleware().on_call_tool(tool_context(), call_next)
+
+        assert 0 < seen[0] <= 3.0
+
+
+class TestAgentToolCall:
+
+    @pytest.mark.asyncio
+    async def test_remaining_turn_budget_sent_in_meta(self):
+        session = MagicMock()
+        session.send_request = AsyncMock(return_value=types.CallToolResult(content=[]))
+
+        with turn_scope(20.0):
+            await call_tool(session, "get_coord", {"city": "Москва"})
+
+        request, _ = session.send_request.await_args.args
+        params = request.root.params
+        assert params.name == "get_coord"
+        assert 0 < params.meta.timeout <= 20.0
+        assert session.send_request.await_args.kwargs["request_read_timeout_seconds"].total_seconds() <= 21.0
+
+    @pytest.mark.asyncio
+    async def test_no_meta_without_turn_deadline(self):
+        session = MagicMock()
+        session.send_request = AsyncMock(return_value=types.CallToolResult(content=[]))
+
+        await call_tool(session, "get_coord", {"city": "Москва"})
+
+        request, _ = session.send_request.await_args.args
+        assert request.root.params.meta is None
+        assert session.send_request.await_args.kwargs["request_read_timeout_seconds"] is None
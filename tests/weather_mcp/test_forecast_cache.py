@@ -0,0 +1,145 @@
+import asyncio
+import pytest
+from unittest.mock import patch, AsyncMock
+
+from src.weather_mcp.cache.forecast import ForecastCache, FRESH, STALE, MISSING
+from src.weather_mcp.tools.weather import WeatherService
+
+
+def forecast_response(temperature: float = 15.2) -> dict:
+    return {
+        "latitude": 55.75,
+        "longitude": 37.6,
+        "timezone": "Europe/Moscow",
+        "current_weather": {
+            "temperature": temperature,
+            "windspeed": 5.1,
+            "weathercode": 0,
+            "time": "2024-01-01T12:00"
+        },
+        "daily": {
+            "time": ["2024-01-01"],
+            "temperature_2m_max": [18.5],
+            "temperature_2m_min": [10.2],
+            "precipitation_sum": [0.0],
+            "weather_code": [0],
+            "wind_speed_10m_max": [12.5]
+        }
+    }
+
+
+class TestForecastCache:
+
+    def test_nearby_points_share_key(self):
+        cache = ForecastCache(grid_step=0.05)
+
+        assert cache.key(55.7558, 37.6176, 1, True) == cache.key(55.7612, 37.6049, 1, True)
+        assert cache.key(55.7558, 37.6176, 1, True) != cache.key(55.7558, 37.6176, 3, True)
+        assert cache.key(55.7558, 37.6176, 1, True) != cache.key(59.9386, 30.3141, 1, True)
+
+    def test_entry_freshness_follows_model_updates(self):
+        cache = ForecastCache(update_interval=3600, max_stale=600)
+
+        with patch("src.weather_mcp.cache.forecast.time.time", return_value=7200 + 100):
+            cache.set("k", {"value": 1})
+        with patch("src.weather_mcp.cache.forecast.time.time", return_value=7200 + 3500):
+            assert cache.get("k")[1] == FRESH
+        with patch("src.weather_mcp.cache.forecast.time.time", return_value=10800 + 300):
+            assert cache.get("k")[1] == STALE
+        with patch("src.weather_mcp.cache.forecast.time.time", return_value=10800 + 700):
+            assert cache.get("k") == (None, MISSING)
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["stale_hits"], stats["misses"]) == (1, 1, 1)
+
+
+class TestSharedForecastCache:
+    """Два экземпляра кеша на одном файле — как два воркера сервера."""
+
+    def test_fill_in_one_worker_visible_in_another(self, tmp_path):
+        first = ForecastCache(path=tmp_path / "forecast.sqlite3")
+        second = ForecastCache(path=tmp_path / "forecast.sqlite3")
+        data = WeatherService()._format_weather_data(forecast_response())
+
+        first.set("k", data)
+        entry, freshness = second.get("k")
+
+        assert freshness == FRESH
+        assert entry.value["current"]["temperature"] == 15.2
+        assert entry.value["daily_forecast"].values("temperature_max").tolist() == [18.5]
+        assert second.stats()["disk_hits"] == 1
+        assert second.disk.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        first.close()
+        second.close()
+
+    def test_fresher_disk_entry_replaces_stale_memory(self, tmp_path):
+        first = ForecastCache(path=tmp_path / "forecast.sqlite3", update_interval=3600, max_stale=900)
+        second = ForecastCache(path=tmp_path / "forecast.sqlite3", update_interval=3600, max_stale=900)
+
+        with patch("src.weather_mcp.cache.forecast.time.time", return_value=3600.0):
+            second.set("k", {"value": 1})
+        with patch("src.weather_mcp.cache.forecast.time.time", return_value=7200.0 + 60):
+            first.set("k", {"value": 2})
+            entry, freshness = second.get("k")
+
+        assert (entry.value, freshness) == ({"value": 2}, FRESH)
+        first.close()
+        second.close()
+
+
+class TestWeatherServiceForecastCache:
+
+    @pytest.mark.asyncio
+    async def test_second_call_served_from_cache(self):
+        service = WeatherService(forecast_cache=ForecastCache(grid_step=0.05))
+
+        with patch.object(service, "_fetch_forecast", AsyncMock(return_value=forecast_response())) as fetch:
+            first = await service.get_weather(55.7558, 37.6176)
+            second = await service.get_weather(55.7601, 37.6101)
+
+        fetch.assert_awaited_once_with(55.75, 37.6, 1, True, hourly=False)
+        assert first == second
+        assert second["data"]["current"]["temperature"] == 15.2
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_returned_while_refreshing(self):
+        cache = ForecastCache(update_interval=3600, max_stale=900)
+        service = WeatherService(forecast_cache=cache)
+
+        with patch("src.weather_mcp.cache.forecast.time.time", return_value=3600.0):
+            with patch.object(service, "_fetch_forecast", AsyncMock(return_value=forecast_response(10.0))):
+                await service.get_weather(55.75, 37.6)
+
+        refreshed = asyncio.Event()
+
+        async def slow_fetch(*args, **options):
+            await refreshed.wait()
+            return forecast_response(20.0)
+
+        with patch("src.weather_mcp.cache.forecast.time.time", return_value=7200.0 + 60):
+            with patch.object(service, "_fetch_forecast", AsyncMock(side_effect=slow_fetch)) as fetch:
+                stale = await service.get_weather(55.75, 37.6)
+                assert stale["data"]["current"]["temperature"] == 10.0
+                assert len(service._refresh_tasks) == 1
+
+                # Повторный запрос не запускает второе обновление
+                await service.get_weather(55.75, 37.6)
+                assert len(service._refresh_tasks) == 1
+
+                refreshed.set()
+                await asyncio.gather(*service._refresh_tasks.values())
+                fresh = await service.get_weather(55.75, 37.6)
+
+        fetch.assert_awaited_once()
+        assert fresh["data"]["current"]["temperature"] == 20.0
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_is_not_cached(self):
+        service = WeatherService(forecast_cache=ForecastCache())
+
+        with patch.object(service, "_fetch_forecast", AsyncMock(side_effect=Exception("boom"))):
+            result = await service.get_weather(55.75, 37.6)
+
+        assert result["success"] is False
+        assert "boom" in result["error"]
+        assert len(service.forecast_cache.memory) == 0
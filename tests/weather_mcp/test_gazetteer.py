@@ -0,0 +1,103 @@
+import zipfile
+import pytest
+from unittest.mock import patch, AsyncMock
+
+from src.weather_mcp.tools.gazetteer import Gazetteer, within_one_edit
+from src.weather_mcp.tools.geo import GeocodingService
+
+
+def geonames_row(geoname_id, name, alternate_names, lat, lon, country, population, feature_class="P"):
+    ascii_name = name
+    return "\t".join([
+        str(geoname_id), name, ascii_name, ",".join(alternate_names), str(lat), str(lon),
+        feature_class, "PPLC", country, "", "", "", "", "", str(population),
+        "", "150", "Europe/Moscow", "2024-01-01"
+    ])
+
+
+ROWS = [
+    geonames_row(524901, "Moscow", ["Moskva", "Москва"], 55.75222, 37.61556, "RU", 10381222),
+    geonames_row(4601463, "Moscow", ["Москоу"], 46.73239, -117.00017, "US", 25060),
+    geonames_row(498817, "Saint Petersburg", ["Санкт-Петербург", "Питер"], 59.93863, 30.31413, "RU", 5351935),
+    geonames_row(551487, "Kazan", ["Казань"], 55.78874, 49.12214, "RU", 1104738),
+    geonames_row(524905, "Moscow Oblast", [], 55.7, 37.5, "RU", 0, feature_class="A"),
+]
+
+
+@pytest.fixture
+def dump(tmp_path):
+    path = tmp_path / "cities.txt"
+    path.write_text("\n".join(ROWS) + "\n", encoding="utf-8")
+    return path
+
+
+class TestGazetteer:
+
+    def test_exact_lookup_prefers_largest_city(self, dump):
+        gazetteer = Gazetteer(dump)
+
+        place = gazetteer.lookup("  МОСКВА ")
+        assert (place.lat, place.lon, place.country) == (55.75222, 37.61556, "RU")
+        assert gazetteer.lookup("Moscow").country == "RU"
+        assert gazetteer.lookup("Москоу").country == "US"
+
+    def test_only_populated_places_are_loaded(self, dump):
+        gazetteer = Gazetteer(dump)
+
+        assert len(gazetteer) == 4
+        assert gazetteer.lookup("Moscow Oblast") is None
+
+    def test_typo_and_prefix_lookup(self, dump):
+        gazetteer = Gazetteer(dump)
+
+        assert gazetteer.lookup("Казнь").name == "Kazan"
+        assert gazetteer.lookup("Мосвка") is None  # две правки
+        assert gazetteer.lookup("Санкт-Пет").name == "Saint Petersburg"
+        assert gazetteer.lookup("Лондон") is None
+
+    def test_min_population_filter(self, dump):
+        gazetteer = Gazetteer(dump, min_population=100_000)
+
+        assert gazetteer.lookup("Москоу") is None
+
+    def test_zip_archive(self, dump, tmp_path):
+        archive = tmp_path / "cities15000.zip"
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.write(dump, "cities15000.txt")
+
+        assert Gazetteer(archive).lookup("Питер").name == "Saint Petersburg"
+
+    def test_within_one_edit(self):
+        assert within_one_edit("kazan", "kazan")
+        assert within_one_edit("kazan", "kazam")
+        assert within_one_edit("kazan", "kazn")
+        assert within_one_edit("kazan", "kazann")
+        assert not within_one_edit("kazan", "kaz")
+        assert not within_one_edit("kazan", "kzaan")
+
+
+class TestGeocodingServiceGazetteer:
+
+    @pytest.mark.asyncio
+    async def test_gazetteer_hit_skips_network(self, dump):
+        service = GeocodingService(gazetteer=Gazetteer(dump))
+
+        with patch("src.weather_mcp.tools.geo.fetch_json", AsyncMock()) as fetch:
+            result = await service.get_coordinates("Казань")
+
+        fetch.assert_not_awaited()
+        assert result == {
+            "success": True,
+            "data": {"lat": 55.78874, "lon": 49.12214, "display_name": "Kazan, RU", "city": "Казань"}
+        }
+
+    @pytest.mark.asyncio
+    async def test_gazetteer_miss_falls_back_to_nominatim(self, dump):
+        service = GeocodingService(gazetteer=Gazetteer(dump))
+        response = [{"lat": "51.5074", "lon": "-0.1278", "display_name": "London, UK"}]
+
+        with patch("src.weather_mcp.tools.geo.fetch_json", AsyncMock(return_value=response)) as fetch:
+            result = await service.get_coordinates("Лондон")
+
+        fetch.assert_awaited_once()
+        assert result["data"]["display_name"] == "London, UK"
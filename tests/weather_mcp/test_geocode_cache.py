@@ -0,0 +1,156 @@
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.weather_mcp.cache.geocode import GeocodeCache, normalize_city
+from src.weather_mcp.cache.sqlite import connect
+from src.weather_mcp.tools.geo import GeocodingService
+
+
+MOSCOW = {
+    "success": True,
+    "data": {"lat": 55.75, "lon": 37.61, "display_name": "Moscow, Russia", "city": "Moscow"}
+}
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return tmp_path / "geocode.sqlite3"
+
+
+class TestGeocodeCache:
+
+    def test_normalize_city(self):
+        assert normalize_city("  Saint   Petersburg ") == "saint petersburg"
+        assert normalize_city("МОСКВА") == normalize_city("москва")
+
+    def test_memory_hit(self):
+        cache = GeocodeCache()
+        cache.set("Moscow", MOSCOW)
+
+        assert cache.get("moscow") == MOSCOW
+        assert cache.stats()["memory_hits"] == 1
+        assert cache.stats()["misses"] == 0
+
+    def test_disk_tier_survives_restart(self, cache_path):
+        cache = GeocodeCache(path=cache_path)
+        cache.set("Moscow", MOSCOW)
+        cache.close()
+
+        restarted = GeocodeCache(path=cache_path)
+        assert restarted.get("Moscow") == MOSCOW
+        assert restarted.stats()["disk_hits"] == 1
+
+        # Повторное обращение обслуживается уже из памяти
+        restarted.get("Moscow")
+        assert restarted.stats()["memory_hits"] == 1
+        restarted.close()
+
+    def test_negative_entries_use_short_ttl(self):
+        cache = GeocodeCache(ttl=1000, negative_ttl=10)
+        not_found = {"success": False, "error": "Город 'Nowhere' не найден"}
+
+        with patch("src.weather_mcp.cache.geocode.time.time", return_value=100.0):
+            cache.set("Nowhere", not_found, negative=True)
+            cache.set("Moscow", MOSCOW)
+
+        with patch("src.weather_mcp.cache.geocode.time.time", return_value=105.0):
+            assert cache.get("Nowhere") == not_found
+            assert cache.stats()["negative_hits"] == 1
+
+        with patch("src.weather_mcp.cache.geocode.time.time", return_value=120.0):
+            assert cache.get("Nowhere") is None
+            assert cache.get("Moscow") == MOSCOW
+
+    def test_lru_eviction(self):
+        cache = GeocodeCache(max_memory_entries=2)
+        cache.set("a", MOSCOW)
+        cache.set("b", MOSCOW)
+        cache.get("a")
+        cache.set("c", MOSCOW)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == MOSCOW
+        assert cache.stats()["memory_evictions"] == 1
+
+    def test_disk_size_bound(self, cache_path):
+        cache = GeocodeCache(path=cache_path, max_disk_entries=3)
+        for i in range(5):
+            cache.set(f"city-{i}", MOSCOW)
+        cache.disk.prune()
+
+        assert len(cache.disk) == 3
+        cache.close()
+
+    def test_write_skipped_while_file_locked(self, cache_path):
+        cache = GeocodeCache(path=cache_path)
+        cache.set("Moscow", MOSCOW)
+        other = connect(cache_path)
+        other.execute("BEGIN IMMEDIATE")
+        try:
+            started = time.monotonic()
+            cache.set("Kazan", MOSCOW)
+            assert time.monotonic() - started < 1.0
+            # Чтение в режиме WAL не ждёт пишущего
+            assert cache.disk.get("moscow") is not None
+        finally:
+            other.rollback()
+            other.close()
+
+        assert cache.get("Kazan") == MOSCOW
+        assert cache.disk.get("kazan") is None
+        cache.set("Kazan", MOSCOW)
+        assert cache.disk.get("kazan") is not None
+        cache.close()
+
+
+class TestGeocodingServiceCache:
+
+    @pytest.mark.asyncio
+    async def test_repeat_lookup_served_from_cache(self):
+        mock_response = MagicMock()
+        mock_response.json.return_value = [
+            {"lat": "55.75", "lon": "37.61", "display_name": "Moscow, Russia"}
+        ]
+        service = GeocodingService(cache=GeocodeCache())
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_instance = mock_client.return_value.__aenter__.return_value
+            mock_instance.get.return_value = mock_response
+
+            first = await service.get_coordinates("Moscow")
+            second = await service.get_coordinates(" moscow ")
+
+            mock_instance.get.assert_called_once()
+
+        assert first == second
+
+    @pytest.mark.asyncio
+    async def test_not_found_is_cached(self):
+        mock_response = MagicMock()
+        mock_response.json.return_value = []
+        service = GeocodingService(cache=GeocodeCache())
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_instance = mock_client.return_value.__aenter__.return_value
+            mock_instance.get.return_value = mock_response
+
+            await service.get_coordinates("Nowhere")
+            result = await service.get_coordinates("Nowhere")
+
+            mock_instance.get.assert_called_once()
+
+        assert result["success"] is False
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self):
+        service = GeocodingService(cache=GeocodeCache())
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_instance = mock_client.return_value.__aenter__.return_value
+            mock_instance.get.side_effect = Exception("Network error")
+
+            await service.get_coordinates("Moscow")
+            await service.get_coordinates("Moscow")
+
+            assert mock_instance.get.call_count == 2
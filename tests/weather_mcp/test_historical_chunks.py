@@ -0,0 +1,105 @@
+import asyncio
+import pytest
+import httpx
+from datetime import date
+from unittest.mock import patch, AsyncMock
+
+from src.weather_mcp.cache.archive import ArchiveStore, split_range
+from src.weather_mcp.tools.weather import WeatherService
+from tests.weather_mcp.test_archive_store import archive_response
+
+
+def server_error() -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://archive-api.open-meteo.com/v1/archive")
+    response = httpx.Response(503, request=request)
+    return httpx.HTTPStatusError("Service Unavailable", request=request, response=response)
+
+
+class TestSplitRange:
+
+    def test_split_range(self):
+        assert split_range(date(2020, 1, 1), date(2020, 1, 10), 4) == [
+            (date(2020, 1, 1), date(2020, 1, 4)),
+            (date(2020, 1, 5), date(2020, 1, 8)),
+            (date(2020, 1, 9), date(2020, 1, 10))
+        ]
+        assert split_range(date(2020, 1, 1), date(2020, 1, 1), 366) == [(date(2020, 1, 1), date(2020, 1, 1))]
+
+
+class TestChunkedHistory:
+
+    @pytest.mark.asyncio
+    async def test_decade_fetched_concurrently_and_merged_in_order(self):
+        service = WeatherService()
+        service.archive_semaphore = asyncio.Semaphore(3)
+        running = 0
+        peak = 0
+
+        async def fake_fetch(lat, lon, start, end, **options):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return archive_response(start, end)
+
+        with patch.object(service, "_fetch_archive", AsyncMock(side_effect=fake_fetch)) as fetch:
+            result = await service.get_historical_weather(55.8, 37.6, date(2010, 1, 1), date(2019, 12, 31))
+
+        assert result["success"] is True
+        days = result["data"]["daily_forecast"]
+        assert len(days) == 3652
+        assert days[0]["date"] == "2010-01-01"
+        assert days[-1]["date"] == "2019-12-31"
+        assert fetch.await_count == 10
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_chunk_is_retried_alone(self):
+        service = WeatherService()
+        failures = {date(2011, 1, 2): 1}
+
+        async def flaky_fetch(lat, lon, start, end, **options):
+            if failures.get(start):
+                failures[start] -= 1
+                raise server_error()
+            return archive_response(start, end)
+
+        with patch("src.weather_mcp.tools.weather.asyncio.sleep", AsyncMock()):
+            with patch.object(service, "_fetch_archive", AsyncMock(side_effect=flaky_fetch)) as fetch:
+                result = await service.get_historical_weather(55.8, 37.6, date(2010, 1, 1), date(2012, 12, 31))
+
+        assert result["success"] is True
+        assert len(result["data"]["daily_forecast"]) == 1096
+        assert fetch.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self):
+        service = WeatherService()
+
+        with patch.object(service, "_fetch_archive", AsyncMock(side_effect=ValueError("bad range"))) as fetch:
+            result = await service.get_historical_weather(55.8, 37.6, date(2010, 1, 1), date(2010, 1, 5))
+
+        assert result["success"] is False
+        assert "bad range" in result["error"]
+        fetch.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_stored_chunks_kept_when_another_fails(self, tmp_path):
+        store = ArchiveStore(tmp_path / "archive.sqlite3", grid_step=0.1, settle_days=7)
+        service = WeatherService(archive_store=store)
+        service.archive_upstream.retries = 0
+
+        async def partly_failing(lat, lon, start, end, **options):
+            if start != date(2010, 1, 1):
+                raise server_error()
+            return archive_response(start, end)
+
+        with patch.object(service, "_fetch_archive", AsyncMock(side_effect=partly_failing)):
+            failed = await service.get_historical_weather(55.8, 37.6, date(2010, 1, 1), date(2011, 12, 31))
+
+        assert failed["success"] is False
+        assert store.missing_ranges(store.cell(55.8, 37.6), date(2010, 1, 1), date(2011, 12, 31)) == [
+            (date(2011, 1, 2), date(2011, 12, 31))
+        ]
+        store.close()
@@ -0,0 +1,113 @@
+import json
+import pytest
+from datetime import date, datetime, timedelta
+from unittest.mock import patch, AsyncMock, MagicMock
+
+from src.weather_mcp.series import HourlySeries, choose_hourly_step
+from src.weather_mcp.tools.weather import WeatherService
+
+
+def hourly_block(hours: int, start: datetime = datetime(2024, 1, 1)) -> dict:
+    times = [start + timedelta(hours=i) for i in range(hours)]
+    return {
+        "time": [moment.strftime("%Y-%m-%dT%H:%M") for moment in times],
+        "temperature_2m": [float(i % 24) for i in range(hours)],
+        "relative_humidity_2m": [80] * hours,
+        "precipitation": [0.5 if i % 24 == 12 else 0.0 for i in range(hours)],
+        "wind_speed_10m": [float(i % 5) for i in range(hours)],
+        "weather_code": [61 if i % 24 == 12 else 1 for i in range(hours)]
+    }
+
+
+class TestHourlySeries:
+
+    def test_downsample_to_six_hour_buckets(self):
+        buckets = HourlySeries(hourly_block(48)).downsample(6)
+
+        assert len(buckets) == 8
+        assert buckets.hours == 6
+        assert buckets[2] == {
+            "time": "2024-01-01T12:00",
+            "temperature_min": 12.0,
+            "temperature_mean": 14.5,
+            "temperature_max": 17.0,
+            "humidity_mean": 80.0,
+            "precipitation": 0.5,
+            "wind_speed_mean": 2.0,
+            "wind_speed_max": 4.0,
+            "weather_code": 61
+        }
+        assert buckets[4]["time"] == "2024-01-02T00:00"
+
+    def test_buckets_align_to_midnight_and_skip_missing(self):
+        data = hourly_block(5, start=datetime(2024, 1, 1, 22))
+        data["temperature_2m"] = [None, 5.0, None, None, None]
+
+        buckets = HourlySeries(data).downsample(24)
+
+        assert [row["time"] for row in buckets] == ["2024-01-01T00:00", "2024-01-02T00:00"]
+        assert buckets[0]["temperature_mean"] == 5.0
+        assert buckets[1]["temperature_min"] is None
+
+    def test_choose_hourly_step(self):
+        assert choose_hourly_step(3, 24, 96) == 3
+        assert choose_hourly_step(1, 16 * 24, 96) == 4
+        assert choose_hourly_step(5, 24, 96) == 6
+        assert choose_hourly_step(1, 366 * 24, 96) == 24
+
+
+class TestWeatherServiceHourly:
+
+    @pytest.mark.asyncio
+    async def test_forecast_requests_hourly_variables(self):
+        service = WeatherService()
+        response = {"latitude": 55.75, "longitude": 37.6, "hourly": hourly_block(24)}
+
+        with patch("src.weather_mcp.tools.weather.fetch_json", AsyncMock(return_value=response)) as fetch:
+            result = await service.get_weather(55.75, 37.6, hourly=True)
+
+        params = fetch.await_args.args[2]
+        assert "temperature_2m" in params["hourly"]
+        assert len(result["data"]["hourly"]) == 24
+        assert result["data"]["hourly"].values("temperature").max() == 23.0
+
+    @pytest.mark.asyncio
+    async def test_hourly_history_bypasses_daily_store(self):
+        store = MagicMock()
+        service = WeatherService(archive_store=store)
+        response = {"latitude": 55.8, "longitude": 37.6, "daily": {"time": []}, "hourly": hourly_block(48)}
+
+        with patch.object(service, "_fetch_archive", AsyncMock(return_value=response)) as fetch:
+            result = await service.get_historical_weather(55.8, 37.6, date(2024, 1, 1), date(2024, 1, 2), hourly=True)
+
+        fetch.assert_awaited_once_with(55.8, 37.6, date(2024, 1, 1), date(2024, 1, 2), hourly=True)
+        store.write.assert_not_called()
+        assert len(result["data"]["hourly"]) == 48
+
+
+class TestHourlyTools:
+
+    @pytest.mark.asyncio
+    async def test_forecast_tool_renders_buckets(self):
+        from src.weather_mcp import server
+
+        data = {"location": {"timezone": "Europe/Moscow"}, "hourly": HourlySeries(hourly_block(24))}
+        result = {"success": True, "data": data}
+
+        with patch.object(server.services.weather, "get_weather", AsyncMock(return_value=result)) as get_weather:
+            text = await server.get_weather.fn(55.75, 37.6, hourly_step=6)
+            payload = json.loads(await server.get_weather.fn(55.75, 37.6, hourly_step=6, output_format="json"))
+
+        assert get_weather.await_args.kwargs["hourly"] is True
+        assert "⏱️ По 6 ч:\n" in text
+        assert "2024-01-01T12:00 | 12.0…17.0 | 0.5 | 4.0 | 61\n" in text
+        assert payload["hourly"]["hours"] == 6
+        assert payload["hourly"]["temperature_max"] == [5.0, 11.0, 17.0, 23.0]
+
+    @pytest.mark.asyncio
+    async def test_invalid_step_rejected(self):
+        from src.weather_mcp import server
+
+        text = await server.get_weather.fn(55.75, 37.6, hourly_step=5)
+
+        assert text.startswith("❌ Шаг почасовых данных")
@@ -0,0 +1,144 @@
+import pytest
+import httpx
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from src.weather_mcp.tools.http import create_client, client_scope
+from src.weather_mcp.tools.geo import GeocodingService
+from src.weather_mcp.tools.gazetteer import Gazetteer
+from src.weather_mcp.services import ServiceContainer
+
+
+class TestHttpClient:
+
+    @pytest.mark.asyncio
+    async def test_create_client_uses_pool_settings(self):
+        with patch.multiple(
+            "src.weather_mcp.tools.http.settings",
+            http_max_connections=7,
+            http_max_keepalive_connections=3,
+            http_keepalive_expiry=12.0,
+            http_timeout=4.0
+        ):
+            client = create_client(http2=False)
+        try:
+            pool = client._transport._pool
+            assert pool._max_connections == 7
+            assert pool._max_keepalive_connections == 3
+            assert pool._keepalive_expiry == 12.0
+            assert pool._http2 is False
+            assert client.timeout == httpx.Timeout(4.0)
+        finally:
+            await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_create_client_falls_back_without_h2(self):
+        with patch("src.weather_mcp.tools.http.http2_available", return_value=False):
+            client = create_client(http2=True)
+        try:
+            assert client._transport._pool._http2 is False
+        finally:
+            await client.aclose()
+
+    def test_create_client_enables_http2_with_h2(self):
+        with patch("src.weather_mcp.tools.http.http2_available", return_value=True), \
+                patch("httpx.AsyncClient") as mock_client:
+            create_client(http2=True)
+
+        assert mock_client.call_args.kwargs["http2"] is True
+
+    @pytest.mark.asyncio
+    async def test_client_scope_reuses_shared_client(self):
+        shared = MagicMock()
+        shared.aclose = AsyncMock()
+
+        async with client_scope(shared) as client:
+            assert client is shared
+
+        # Общий клиент не должен закрываться после запроса
+        shared.aclose.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_client_scope_creates_temporary_client(self):
+        with patch("httpx.AsyncClient") as mock_client:
+            async with client_scope(None) as client:
+                assert client is mock_client.return_value.__aenter__.return_value
+
+    @pytest.mark.asyncio
+    async def test_geocoding_uses_injected_client(self):
+        mock_response = MagicMock()
+        mock_response.json.return_value = [
+            {"lat": "55.75", "lon": "37.61", "display_name": "Moscow, Russia"}
+        ]
+        shared = MagicMock()
+        shared.get = AsyncMock(return_value=mock_response)
+
+        service = GeocodingService(client=shared)
+        with patch("httpx.AsyncClient") as mock_client:
+            result = await service.get_coordinates("Moscow")
+            mock_client.assert_not_called()
+
+        assert result["success"] is True
+        shared.get.assert_awaited_once()
+
+
+class TestServiceContainer:
+
+    @pytest.mark.asyncio
+    async def test_start_injects_and_stop_closes_clients(self):
+        container = ServiceContainer()
+
+        async with container.running():
+            geo_client = container.geo.client
+            assert geo_client is not None
+            assert container.weather.forecast_client is not None
+            assert container.weather.archive_client is not None
+
+        assert container.geo.client is None
+        assert geo_client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_nested_lifespans_share_one_pool(self):
+        container = ServiceContainer()
+
+        await container.start()
+        first = container.geo.client
+        await container.start()
+        assert container.geo.client is first
+
+        await container.stop()
+        assert first.is_closed is False
+
+        await container.stop()
+        assert first.is_closed
+        assert container.started is False
+
+    @pytest.mark.asyncio
+    async def test_broken_gazetteer_falls_back_to_nominatim(self, tmp_path):
+        container = ServiceContainer()
+        container.geo.gazetteer = Gazetteer(tmp_path / "missing.txt")
+
+        async with container.running():
+            assert container.geo.gazetteer is None
+            assert container.geo.client is not None
+
+    @pytest.mark.asyncio
+    async def test_failed_start_closes_created_clients(self):
+        container = ServiceContainer()
+        created = []
+
+        def client_factory():
+            if len(created) == 2:
+                raise RuntimeError("нет ресурсов")
+            created.append(create_client(http2=False))
+            return created[-1]
+
+        with patch("src.weather_mcp.services.create_client", client_factory):
+            with pytest.raises(RuntimeError):
+                await container.start()
+
+        assert container.started is False
+        assert all(client.is_closed for client in created)
+        assert container.geo.client is None
+
+        async with container.running():
+            assert container.weather.archive_client is not None
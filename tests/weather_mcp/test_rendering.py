@@ -0,0 +1,144 @@
+import json
+import pytest
+from datetime import date, timedelta
+from unittest.mock import patch, AsyncMock
+
+from src.weather_mcp.series import DailySeries
+from src.weather_mcp.rendering import (
+    batch_payload,
+    place_for,
+    render_batch,
+    render_coordinates,
+    render_current,
+    render_forecast,
+    render_history,
+    render_json,
+    use_json,
+    weather_payload
+)
+
+
+def weather_data(days: int = 1, current: bool = True) -> dict:
+    start = date(2024, 1, 1)
+    data = {
+        "location": {"latitude": 55.75, "longitude": 37.6, "timezone": "Europe/Moscow"},
+        "daily_forecast": DailySeries({
+            "time": [(start + timedelta(days=i)).isoformat() for i in range(days)],
+            "temperature_2m_max": [18.5] * days,
+            "temperature_2m_min": [10.2] * days,
+            "precipitation_sum": [0.0] * days,
+            "weather_code": [0] * days,
+            "wind_speed_10m_max": [12.5] * days
+        })
+    }
+    if current:
+        data["current"] = {"temperature": 15.2, "wind_speed": 5.1, "weather_code": 0, "time": "2024-01-01T12:00"}
+    return data
+
+
+class TestRendering:
+
+    def test_forecast_matches_tool_format(self):
+        text = render_forecast(place_for(55.75, 37.6), weather_data())
+
+        assert text == (
+            "🌤️ Прогноз погоды для координат 55.75, 37.6\n\n"
+            "📍 Текущая погода:\n"
+            "🌡️ Температура: 15.2°C\n"
+            "💨 Скорость ветра: 5.1 км/ч\n"
+            "📅 Время: 2024-01-01T12:00\n\n"
+            "📈 Прогноз на 1 дн.:\n"
+            "📅 2024-01-01:\n"
+            "  🌡️ 10.2°C - 18.5°C\n"
+            "  🌧️ Осадки: 0.0 мм\n"
+            "  💨 Макс. ветер: 12.5 км/ч\n\n"
+            "🕒 Часовой пояс: Europe/Moscow"
+        )
+
+    def test_current_with_coordinates(self):
+        text = render_current("Москва", weather_data(), 55.75, 37.6)
+
+        assert text.startswith("🌤️ Текущая погода для Москва\n\n📍 Сейчас:\n")
+        assert "🔢 Код погоды: 0\n\n" in text
+        assert text.endswith("🕒 Часовой пояс: Europe/Moscow\n📍 Координаты: 55.75, 37.6")
+
+    def test_long_history_rendered_as_table(self):
+        data = weather_data(days=365, current=False)
+
+        text = render_history("Москва", "2024-01-01", "2024-12-30", data)
+
+        assert "📈 Данные за 365 дн.:\nДата | Мин °C | Макс °C | Осадки мм | Ветер км/ч\n" in text
+        assert "2024-12-30 | 10.2 | 18.5 | 0.0 | 12.5\n" in text
+        assert text.count("\n") < 380
+        assert len(text) < len(render_history("Москва", "2024-01-01", "2024-12-30", data, table=False)) / 2
+
+    def test_missing_values_shown_as_na(self):
+        data = weather_data(current=False)
+        data["daily_forecast"] = DailySeries({"time": ["2024-01-01"], "temperature_2m_max": [None]})
+
+        text = render_history("Москва", "2024-01-01", "2024-01-01", data)
+
+        assert "🌡️ N/A°C - N/A°C" in text
+
+    def test_batch(self):
+        results = [
+            {"success": True, "data": weather_data()},
+            {"success": False, "error": "boom"}
+        ]
+
+        text = render_batch([(55.75, 37.6), (10.0, 1.0)], results)
+
+        assert text.startswith("🌤️ Прогноз погоды для 2 точек\n")
+        assert "🌡️ Сейчас: 15.2°C, ветер 5.1 км/ч\n" in text
+        assert "📅 2024-01-01: 10.2°C - 18.5°C, осадки 0.0 мм, ветер до 12.5 км/ч\n" in text
+        assert "📍 10.0, 1.0\n❌ Ошибка при получении погоды: boom\n" in text
+
+    def test_coordinates(self):
+        assert render_coordinates("Москва", 55.75, 37.61) == (
+            "📍 Координаты для Москва:\n\n🌍 Широта: 55.75\n🌍 Долгота: 37.61\n📍 Полное название: Москва"
+        )
+
+
+class TestStructuredOutput:
+
+    def test_weather_payload_is_columnar(self):
+        payload = weather_payload(weather_data(days=2), 55.75, 37.6, "Москва")
+
+        assert payload["location"] == {"lat": 55.75, "lon": 37.6, "name": "Москва", "timezone": "Europe/Moscow"}
+        assert payload["current"]["temperature"] == 15.2
+        assert payload["daily"]["date"] == ["2024-01-01", "2024-01-02"]
+        assert payload["daily"]["temperature_max"] == [18.5, 18.5]
+
+    def test_json_is_much_shorter_than_text(self):
+        data = weather_data(days=16)
+
+        structured = render_json(weather_payload(data, 55.75, 37.6))
+        text = render_forecast(place_for(55.75, 37.6), data)
+
+        assert json.loads(structured)["daily"]["precipitation"] == [0.0] * 16
+        assert len(structured) < len(text) * 0.6
+
+    def test_batch_payload_reports_errors(self):
+        payload = batch_payload(
+            [(55.75, 37.6), (10.0, 1.0)],
+            [{"success": True, "data": weather_data()}, {"success": False, "error": "boom"}]
+        )
+
+        assert payload["points"][0]["current"]["wind_speed"] == 5.1
+        assert payload["points"][1] == {"location": {"lat": 10.0, "lon": 1.0}, "error": "boom"}
+
+    def test_format_falls_back_to_server_setting(self):
+        assert use_json("json") is True
+        assert use_json("text") is False
+        with patch("src.weather_mcp.rendering.settings.tool_output_format", "json"):
+            assert use_json(None) is True
+
+    @pytest.mark.asyncio
+    async def test_tool_returns_json_on_request(self):
+        from src.weather_mcp import server
+
+        result = {"success": True, "data": weather_data()}
+        with patch.object(server.services.weather, "get_weather", AsyncMock(return_value=result)):
+            text = await server.get_weather.fn(55.75, 37.6, output_format="json")
+
+        assert json.loads(text)["location"]["timezone"] == "Europe/Moscow"
@@ -0,0 +1,194 @@
+import asyncio
+import pytest
+import httpx
+from unittest.mock import patch, AsyncMock
+
+from src.weather_mcp.tools.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Upstream,
+    CLOSED,
+    HALF_OPEN,
+    OPEN
+)
+from src.weather_mcp.tools.weather import WeatherService
+from tests.weather_mcp.test_forecast_cache import forecast_response
+
+
+def status_error(code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://api.open-meteo.com/v1/forecast")
+    response = httpx.Response(code, request=request)
+    return httpx.HTTPStatusError(str(code), request=request, response=response)
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_threshold_and_probes_once(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+
+        with patch("src.weather_mcp.tools.resilience.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+            assert breaker.state == CLOSED
+            breaker.record_failure()
+            assert breaker.state == OPEN
+            assert breaker.allow() is False
+
+        with patch("src.weather_mcp.tools.resilience.time.monotonic", return_value=111.0):
+            assert breaker.state == HALF_OPEN
+            assert breaker.allow() is True
+            assert breaker.allow() is False
+            breaker.record_success()
+            assert breaker.state == CLOSED
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+
+        with patch("src.weather_mcp.tools.resilience.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+        with patch("src.weather_mcp.tools.resilience.time.monotonic", return_value=111.0):
+            assert breaker.allow() is True
+            breaker.record_failure()
+            assert breaker.state == OPEN
+        assert breaker.opened == 2
+
+    def test_released_probe_allows_next(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+
+        with patch("src.weather_mcp.tools.resilience.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+        with patch("src.weather_mcp.tools.resilience.time.monotonic", return_value=111.0):
+            assert breaker.allow() is True
+            breaker.release_probe()
+            assert breaker.state == HALF_OPEN
+            assert breaker.allow() is True
+
+
+class TestUpstream:
+
+    @pytest.mark.asyncio
+    async def test_transient_errors_retried_with_jitter(self):
+        upstream = Upstream("test", retries=2, backoff_base=0.2)
+        operation = AsyncMock(side_effect=[status_error(503), httpx.ConnectError("reset"), "ok"])
+
+        with patch("src.weather_mcp.tools.resilience.asyncio.sleep", AsyncMock()) as sleep:
+            assert await upstream.call(operation) == "ok"
+
+        assert operation.await_count == 3
+        delays = [call.args[0] for call in sleep.await_args_list]
+        assert 0 <= delays[0] <= 0.2 and 0 <= delays[1] <= 0.4
+        assert upstream.breaker.failures == 0
+
+    @pytest.mark.asyncio
+    async def test_client_errors_not_retried(self):
+        upstream = Upstream("test", retries=2)
+        operation = AsyncMock(side_effect=status_error(400))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await upstream.call(operation)
+
+        operation.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self):
+        upstream = Upstream("Open-Meteo", retries=0, breaker=CircuitBreaker(failure_threshold=2))
+        operation = AsyncMock(side_effect=status_error(502))
+
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                await upstream.call(operation)
+        with pytest.raises(CircuitOpenError) as error:
+            await upstream.call(operation)
+
+        assert operation.await_count == 2
+        assert "Open-Meteo временно недоступен" in str(error.value)
+        assert upstream.stats()["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_releases_slot(self):
+        upstream = Upstream("test", retries=0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0))
+        upstream.breaker.record_failure()
+        started = asyncio.Event()
+
+        async def hanging():
+            started.set()
+            await asyncio.sleep(10)
+
+        probe = asyncio.create_task(upstream.call(hanging))
+        await started.wait()
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        assert await upstream.call(AsyncMock(return_value="ok")) == "ok"
+        assert upstream.breaker.state == CLOSED
+
+    @pytest.mark.asyncio
+    async def test_local_errors_do_not_touch_breaker(self):
+        upstream = Upstream("test", retries=0, breaker=CircuitBreaker(failure_threshold=2))
+        upstream.breaker.record_failure()
+
+        with pytest.raises(ValueError):
+            await upstream.call(AsyncMock(side_effect=ValueError("Expecting value")))
+        assert upstream.breaker.failures == 1
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await upstream.call(AsyncMock(side_effect=status_error(404)))
+        assert upstream.breaker.failures == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_request_is_hedged(self):
+        upstream = Upstream("test", hedge_percentile=50, hedge_min_samples=3)
+        for _ in range(3):
+            upstream.latency.add(0.01)
+        calls = 0
+
+        async def operation():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(10)
+                return "slow"
+            return "fast"
+
+        result = await asyncio.wait_for(upstream.call(operation), timeout=1)
+
+        assert result == "fast"
+        assert (upstream.hedged, upstream.hedge_wins) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_no_hedging_before_enough_samples(self):
+        upstream = Upstream("test", hedge_percentile=50, hedge_min_samples=3)
+
+        assert upstream.hedge_delay() is None
+        assert await upstream.call(AsyncMock(return_value="ok")) == "ok"
+        assert upstream.hedged == 0
+
+
+class TestServiceResilience:
+
+    @pytest.mark.asyncio
+    async def test_forecast_outage_fails_fast(self):
+        service = WeatherService()
+        service.forecast_upstream.retries = 0
+        service.forecast_upstream.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        fetch = AsyncMock(side_effect=status_error(503))
+
+        with patch("src.weather_mcp.tools.weather.fetch_json", fetch):
+            first = await service.get_weather(55.75, 37.6)
+            second = await service.get_weather(59.93, 30.31)
+
+        fetch.assert_awaited_once()
+        assert first["success"] is False and second["success"] is False
+        assert "временно недоступен" in second["error"]
+
+    @pytest.mark.asyncio
+    async def test_forecast_retried_transparently(self):
+        service = WeatherService()
+        fetch = AsyncMock(side_effect=[httpx.ReadTimeout("slow"), forecast_response()])
+
+        with patch("src.weather_mcp.tools.weather.fetch_json", fetch), \
+                patch("src.weather_mcp.tools.resilience.asyncio.sleep", AsyncMock()):
+            result = await service.get_weather(55.75, 37.6)
+
+        assert result["success"] is True
+        assert fetch.await_count == 2
@@ -0,0 +1,128 @@
+import asyncio
+import pytest
+import httpx
+from unittest.mock import patch, AsyncMock, MagicMock
+
+from src.weather_mcp.tools.scheduler import RequestScheduler, INTERACTIVE, BACKGROUND
+from src.weather_mcp.tools.geo import GeocodingService
+
+
+class TestRequestScheduler:
+
+    @pytest.mark.asyncio
+    async def test_requests_are_spaced_by_rate(self):
+        scheduler = RequestScheduler(rate=20.0, burst=1)
+        loop = asyncio.get_running_loop()
+        granted = []
+
+        async def request():
+            await scheduler.acquire()
+            granted.append(loop.time())
+
+        await asyncio.gather(*(request() for _ in range(4)))
+        await scheduler.close()
+
+        gaps = [b - a for a, b in zip(granted, granted[1:])]
+        assert all(gap >= 0.04 for gap in gaps)
+        assert scheduler.stats()["granted"] == 4
+
+    @pytest.mark.asyncio
+    async def test_interactive_requests_served_before_background(self):
+        scheduler = RequestScheduler(rate=50.0, burst=1)
+        order = []
+
+        async def request(name, priority):
+            await scheduler.acquire(priority)
+            order.append(name)
+
+        await scheduler.acquire()  # Израсходовать запас, дальше все встают в очередь
+        tasks = [asyncio.create_task(request("background", BACKGROUND))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(request("interactive", INTERACTIVE)))
+        await asyncio.gather(*tasks)
+        await scheduler.close()
+
+        assert order == ["interactive", "background"]
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_wait_would_exceed_limit(self):
+        scheduler = RequestScheduler(rate=1.0, burst=1, max_wait=0.5)
+
+        await scheduler.acquire()
+        with pytest.raises(Exception, match="перегружен"):
+            await scheduler.acquire()
+
+        assert scheduler.stats()["rejected"] == 1
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_is_full(self):
+        scheduler = RequestScheduler(rate=10.0, burst=1, max_queue=1, max_wait=5.0)
+
+        await scheduler.acquire()
+        waiting = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Exception, match="переполнена"):
+            await scheduler.acquire()
+
+        await waiting
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_pause_delays_next_request(self):
+        scheduler = RequestScheduler(rate=100.0, burst=5)
+        loop = asyncio.get_running_loop()
+
+        scheduler.pause(0.1)
+        started = loop.time()
+        await scheduler.acquire()
+        await scheduler.close()
+
+        assert loop.time() - started >= 0.09
+
+
+class TestGeocodingServiceScheduler:
+
+    @pytest.mark.asyncio
+    async def test_request_waits_for_scheduler(self):
+        scheduler = MagicMock()
+        scheduler.acquire = AsyncMock()
+        service = GeocodingService(scheduler=scheduler)
+        response = [{"lat": "55.75", "lon": "37.61", "display_name": "Москва"}]
+
+        with patch("src.weather_mcp.tools.geo.fetch_json", AsyncMock(return_value=response)):
+            result = await service.get_coordinates("Москва", priority=BACKGROUND)
+
+        assert result["success"] is True
+        scheduler.acquire.assert_awaited_once_with(BACKGROUND)
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_response_pauses_scheduler(self):
+        scheduler = MagicMock()
+        scheduler.acquire = AsyncMock()
+        service = GeocodingService(scheduler=scheduler)
+        service.upstream.retries = 0
+
+        request = httpx.Request("GET", "https://nominatim.openstreetmap.org/search")
+        response = httpx.Response(429, headers={"Retry-After": "5"}, request=request)
+        error = httpx.HTTPStatusError("Too Many Requests", request=request, response=response)
+
+        with patch("src.weather_mcp.tools.geo.fetch_json", AsyncMock(side_effect=error)):
+            result = await service.get_coordinates("Москва")
+
+        assert result["success"] is False
+        scheduler.pause.assert_called_once_with(5.0)
+
+    @pytest.mark.asyncio
+    async def test_busy_scheduler_reported_as_error(self):
+        service = GeocodingService(scheduler=RequestScheduler(rate=1.0, burst=1, max_wait=0.1))
+        response = [{"lat": "55.75", "lon": "37.61", "display_name": "Москва"}]
+
+        with patch("src.weather_mcp.tools.geo.fetch_json", AsyncMock(return_value=response)):
+            first = await service.get_coordinates("Москва")
+            second = await service.get_coordinates("Казань")
+
+        await service.scheduler.close()
+        assert first["success"] is True
+        assert second["success"] is False
+        assert "перегружен" in second["error"]
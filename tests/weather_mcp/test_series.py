@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from src.weather_mcp.series import DailySeries
+from src.weather_mcp.tools.weather import WeatherService
+
+
+@pytest.fixture
+def daily():
+    return {
+        "time": ["2024-01-01", "2024-01-02", "2024-01-03"],
+        "temperature_2m_max": [18.5, 20.1, None],
+        "temperature_2m_min": [10.2, 12.3, 9.0],
+        "precipitation_sum": [0.0, 2.5, 1.0],
+        "weather_code": [0, 61, 3],
+        "wind_speed_10m_max": [12.5, 15.2, 8.1]
+    }
+
+
+class TestDailySeries:
+
+    def test_behaves_like_list_of_rows(self, daily):
+        series = DailySeries(daily)
+
+        assert len(series) == 3
+        assert series[0] == {
+            "date": "2024-01-01",
+            "temperature_max": 18.5,
+            "temperature_min": 10.2,
+            "precipitation": 0.0,
+            "weather_code": 0,
+            "wind_speed_max": 12.5
+        }
+        assert series[-1]["date"] == "2024-01-03"
+        assert [day["date"] for day in series[1:]] == ["2024-01-02", "2024-01-03"]
+        assert [day["weather_code"] for day in series] == [0, 61, 3]
+        with pytest.raises(IndexError):
+            series[3]
+
+    def test_columns_are_not_copied(self, daily):
+        series = DailySeries(daily)
+
+        assert series.column("precipitation") is daily["precipitation_sum"]
+
+    def test_values_are_numpy_arrays(self, daily):
+        series = DailySeries(daily)
+
+        temperature = series.values("temperature_max")
+        assert temperature.dtype == np.float64
+        assert np.isnan(temperature[2])
+        assert np.nanmax(temperature) == 20.1
+        assert series.values("temperature_max") is temperature
+        assert series.values("date")[1] == np.datetime64("2024-01-02")
+
+    def test_missing_column(self, daily):
+        del daily["weather_code"]
+        series = DailySeries(daily)
+
+        assert series[0]["weather_code"] is None
+        assert np.isnan(series.values("weather_code")).all()
+
+    def test_equality_with_list(self, daily):
+        series = DailySeries(daily)
+
+        assert series == series.to_list()
+        assert series == DailySeries(dict(daily))
+        assert series != DailySeries({"time": []})
+
+    def test_format_weather_data_returns_series(self, daily):
+        formatted = WeatherService()._format_weather_data({"daily": daily})
+
+        assert len(formatted["daily_forecast"]) == 3
+        assert formatted["daily_forecast"].column("date") is daily["time"]
@@ -0,0 +1,139 @@
+import asyncio
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.weather_mcp.tools.singleflight import SingleFlight, request_key
+from src.weather_mcp.tools.geo import GeocodingService
+
+
+class TestRequestKey:
+
+    def test_params_order_does_not_matter(self):
+        assert request_key("u", {"a": 1, "b": 2}) == request_key("u", {"b": 2, "a": 1})
+
+    def test_lists_are_joined(self):
+        assert request_key("u", {"daily": ["x", "y"]}) == "u?daily=x,y"
+
+
+class TestSingleFlight:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = 0
+        gate = asyncio.Event()
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await gate.wait()
+            return "result"
+
+        waiters = [asyncio.create_task(flight.do("k", fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        gate.set()
+
+        assert await asyncio.gather(*waiters) == ["result"] * 5
+        assert calls == 1
+        assert flight.stats() == {"started": 1, "coalesced": 4, "in_flight": 0}
+
+    @pytest.mark.asyncio
+    async def test_error_propagates_to_all_waiters(self):
+        flight = SingleFlight()
+        gate = asyncio.Event()
+
+        async def fetch():
+            await gate.wait()
+            raise ValueError("upstream failed")
+
+        waiters = [asyncio.create_task(flight.do("k", fetch)) for _ in range(3)]
+        await asyncio.sleep(0)
+        gate.set()
+
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        assert len(flight) == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_others(self):
+        flight = SingleFlight()
+        gate = asyncio.Event()
+
+        async def fetch():
+            await gate.wait()
+            return 42
+
+        first = asyncio.create_task(flight.do("k", fetch))
+        second = asyncio.create_task(flight.do("k", fetch))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        gate.set()
+
+        assert await second == 42
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    @pytest.mark.asyncio
+    async def test_last_waiter_cancellation_cancels_request(self):
+        flight = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def fetch():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiter = asyncio.create_task(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        waiter.cancel()
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        assert len(flight) == 0
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_are_not_shared(self):
+        flight = SingleFlight()
+        values = iter([1, 2])
+
+        async def fetch():
+            return next(values)
+
+        assert await flight.do("k", fetch) == 1
+        assert await flight.do("k", fetch) == 2
+
+
+class TestGeocodingServiceCoalescing:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_make_one_request(self):
+        mock_response = MagicMock()
+        mock_response.json.return_value = [
+            {"lat": "55.75", "lon": "37.61", "display_name": "Moscow, Russia"}
+        ]
+        gate = asyncio.Event()
+
+        async def slow_get(*args, **kwargs):
+            await gate.wait()
+            return mock_response
+
+        service = GeocodingService()
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_instance = mock_client.return_value.__aenter__.return_value
+            mock_instance.get.side_effect = slow_get
+
+            tasks = [
+                asyncio.create_task(service.get_coordinates(city))
+                for city in ("Moscow", "moscow", " MOSCOW ")
+            ]
+            await asyncio.sleep(0)
+            gate.set()
+            results = await asyncio.gather(*tasks)
+
+            assert mock_instance.get.call_count == 1
+
+        assert [r["data"]["city"] for r in results] == ["Moscow", "moscow", " MOSCOW "]
+        assert all(r["data"]["lat"] == 55.75 for r in results)
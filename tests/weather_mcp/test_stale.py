@@ -0,0 +1,125 @@
+import json
+import pytest
+import httpx
+from unittest.mock import patch, AsyncMock
+
+from src.weather_mcp.cache.forecast import ForecastCache
+from src.weather_mcp.cache.geocode import GeocodeCache
+from src.weather_mcp.rendering import place_for, render_batch, render_forecast, weather_payload
+from src.weather_mcp.tools.geo import GeocodingService
+from src.weather_mcp.tools.weather import WeatherService
+from tests.weather_mcp.test_forecast_cache import forecast_response
+
+
+def outage() -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://api.open-meteo.com/v1/forecast")
+    return httpx.HTTPStatusError("503 Service Unavailable", request=request, response=httpx.Response(503, request=request))
+
+
+def cached_service(grace: float = 6 * 3600) -> WeatherService:
+    service = WeatherService(forecast_cache=ForecastCache(update_interval=3600, max_stale=900, stale_if_error=grace))
+    service.forecast_upstream.retries = 0
+    return service
+
+
+async def fill(service: WeatherService) -> None:
+    with patch("src.weather_mcp.cache.forecast.time.time", return_value=3600.0), \
+            patch.object(service, "_fetch_forecast", AsyncMock(return_value=forecast_response(10.0))):
+        await service.get_weather(55.75, 37.6)
+
+
+class TestStaleForecast:
+
+    @pytest.mark.asyncio
+    async def test_expired_forecast_served_on_error(self):
+        service = cached_service()
+        await fill(service)
+
+        with patch("src.weather_mcp.cache.forecast.time.time", return_value=7200.0 + 3000), \
+                patch.object(service, "_fetch_forecast", AsyncMock(side_effect=outage())):
+            result = await service.get_weather(55.75, 37.6)
+
+        assert result["success"] is True
+        assert result["data"]["current"]["temperature"] == 10.0
+        assert result["data"]["stale"] == {"as_of": "1970-01-01T01:00:00+00:00", "reason": "503 Service Unavailable"}
+        assert service.forecast_cache.stats()["stale_on_error"] == 1
+
+    @pytest.mark.asyncio
+    async def test_grace_window_is_limited(self):
+        service = cached_service(grace=600)
+        await fill(service)
+
+        with patch("src.weather_mcp.cache.forecast.time.time", return_value=7200.0 + 3000), \
+                patch.object(service, "_fetch_forecast", AsyncMock(side_effect=outage())):
+            result = await service.get_weather(55.75, 37.6)
+
+        assert result["success"] is False
+        assert "Ошибка прогноза погоды" in result["error"]
+
+    @pytest.mark.asyncio
+    async def test_batch_points_fall_back_individually(self):
+        service = cached_service()
+        await fill(service)
+
+        with patch("src.weather_mcp.cache.forecast.time.time", return_value=7200.0 + 3000), \
+                patch.object(service, "_fetch_forecast_many", AsyncMock(side_effect=outage())):
+            result = await service.get_weather_many([(55.75, 37.6), (10.0, 1.0)])
+
+        stale, failed = result["data"]
+        assert stale["data"]["stale"]["reason"] == "503 Service Unavailable"
+        assert failed["success"] is False
+
+
+class TestStaleGeocode:
+
+    @pytest.mark.asyncio
+    async def test_expired_coordinates_served_when_nominatim_down(self):
+        cache = GeocodeCache(ttl=10)
+        service = GeocodingService(cache=cache)
+        service.upstream.retries = 0
+        with patch("src.weather_mcp.cache.geocode.time.time", return_value=1000.0):
+            cache.set("Москва", {"success": True, "data": {"lat": 55.75, "lon": 37.61, "display_name": "Москва"}})
+
+        with patch("src.weather_mcp.cache.geocode.time.time", return_value=2000.0), \
+                patch("src.weather_mcp.tools.geo.fetch_json", AsyncMock(side_effect=httpx.ConnectTimeout("timeout"))):
+            result = await service.get_coordinates("москва")
+
+        assert result["success"] is True
+        assert result["data"]["lat"] == 55.75
+        assert result["data"]["stale"]["reason"] == "Таймаут запроса геокодирования"
+
+    def test_not_found_answers_are_not_served_stale(self):
+        cache = GeocodeCache(negative_ttl=0)
+        cache.set("Атлантида", {"success": False, "error": "не найден"}, negative=True)
+
+        assert cache.get_stale("Атлантида") is None
+
+
+class TestStaleRendering:
+
+    def test_marker_in_text_and_json(self):
+        data = WeatherService()._format_weather_data(forecast_response())
+        data["stale"] = {"as_of": "2024-01-01T12:00:00+00:00", "reason": "503"}
+
+        text = render_forecast(place_for(55.75, 37.6), data)
+        batch = render_batch([(55.75, 37.6)], [{"success": True, "data": data}])
+
+        assert text.startswith(
+            "🌤️ Прогноз погоды для координат 55.75, 37.6\n\n"
+            "⚠️ Данные устарели: источник недоступен (503). Показаны последние известные данные на 2024-01-01T12:00:00+00:00\n\n"
+        )
+        assert "⚠️ Устаревшие данные на 2024-01-01T12:00:00+00:00\n" in batch
+        assert weather_payload(data, 55.75, 37.6)["stale"]["reason"] == "503"
+
+    @pytest.mark.asyncio
+    async def test_coordinates_tool_reports_staleness(self):
+        from src.weather_mcp import server
+
+        stale = {"as_of": "2024-01-01T12:00:00+00:00", "reason": "Таймаут запроса геокодирования"}
+        result = {"success": True, "data": {"lat": 55.75, "lon": 37.61, "display_name": "Москва", "stale": stale}}
+        with patch.object(server.services.geo, "get_coordinates", AsyncMock(return_value=result)):
+            text = await server.get_coord.fn("Москва")
+            payload = json.loads(await server.get_coord.fn("Москва", output_format="json"))
+
+        assert text.startswith("⚠️ Данные устарели")
+        assert payload["stale"] == stale
@@ -0,0 +1,102 @@
+import json
+import pytest
+from datetime import date, timedelta
+from unittest.mock import patch, AsyncMock
+
+from src.weather_mcp.series import DailySeries
+from src.weather_mcp.statistics import summarize
+
+
+def series(days: int, start: date = date(2023, 1, 1), **overrides) -> DailySeries:
+    dates = [start + timedelta(days=i) for i in range(days)]
+    columns = {
+        "time": [day.isoformat() for day in dates],
+        "temperature_2m_max": [float(i) for i in range(days)],
+        "temperature_2m_min": [float(i) - 10 for i in range(days)],
+        "precipitation_sum": [2.0 if i % 2 else 0.0 for i in range(days)],
+        "weather_code": [0] * days,
+        "wind_speed_10m_max": [10.0] * days
+    }
+    columns.update(overrides)
+    return DailySeries(columns)
+
+
+class TestSummarize:
+
+    def test_summary(self):
+        result = summarize(series(10), percentiles=[50], temperature_above=5, temperature_below=-8)
+        summary = result["summary"]
+
+        assert "groups" not in result
+        assert summary["days"] == 10
+        assert summary["temperature_max"] == {"mean": 4.5, "min": 0.0, "max": 9.0, "p50": 4.5}
+        assert summary["temperature_min"]["min"] == -10.0
+        assert summary["precipitation"] == {"total": 10.0, "max": 2.0, "days_above": 5}
+        assert summary["wind_speed_max"] == {"mean": 10.0, "max": 10.0}
+        assert summary["days_temperature_max_above"] == 4
+        assert summary["days_temperature_min_below"] == 2
+
+    def test_missing_values_are_ignored(self):
+        data = series(3, temperature_2m_max=[1.0, None, 3.0], precipitation_sum=[None, None, None])
+
+        summary = summarize(data, temperature_above=0)["summary"]
+
+        assert summary["temperature_max"]["mean"] == 2.0
+        assert summary["precipitation"] == {"total": None, "max": None, "days_above": 0}
+        assert summary["days_temperature_max_above"] == 2
+
+    def test_group_by_month(self):
+        groups = summarize(series(365), group_by="month")["groups"]
+
+        assert len(groups) == 12
+        assert groups[0]["label"] == "2023-01"
+        assert (groups[0]["start"], groups[0]["end"]) == ("2023-01-01", "2023-01-31")
+        assert groups[1]["days"] == 28
+        assert groups[0]["temperature_max"]["mean"] == 15.0
+
+    def test_group_by_week_starts_on_monday(self):
+        # 2023-01-01 — воскресенье
+        groups = summarize(series(9), group_by="week")["groups"]
+
+        assert [(group["label"], group["days"]) for group in groups] == [
+            ("2022-W52", 1), ("2023-W01", 7), ("2023-W02", 1)
+        ]
+        assert groups[1]["start"] == "2023-01-02"
+
+    def test_unknown_grouping(self):
+        with pytest.raises(ValueError):
+            summarize(series(3), group_by="year")
+
+
+class TestStatisticsTool:
+
+    @pytest.mark.asyncio
+    async def test_tool_returns_summary_instead_of_days(self):
+        from src.weather_mcp import server
+
+        result = {
+            "success": True,
+            "data": {"location": {"timezone": "Europe/Moscow"}, "daily_forecast": series(365)}
+        }
+        with patch.object(server.services.weather, "get_historical_weather", AsyncMock(return_value=result)):
+            text = await server.get_weather_statistics.fn(
+                55.75, 37.6, "2023-01-01", "2023-12-31", group_by="month", temperature_above=300
+            )
+            payload = json.loads(await server.get_weather_statistics.fn(
+                55.75, 37.6, "2023-01-01", "2023-12-31", output_format="json"
+            ))
+
+        assert "📅 Период: 2023-01-01 - 2023-12-31 (365 дн.)" in text
+        assert "🔥 Дней с максимумом выше 300°C: 64" in text
+        assert "2023-12 | 349.0 |" in text
+        assert text.count("\n") < 30
+        assert payload["summary"]["temperature_max"]["max"] == 364.0
+        assert payload["location"]["timezone"] == "Europe/Moscow"
+
+    @pytest.mark.asyncio
+    async def test_invalid_period(self):
+        from src.weather_mcp import server
+
+        text = await server.get_weather_statistics.fn(55.75, 37.6, "2023-12-31", "2023-01-01")
+
+        assert text == "❌ Начальная дата должна быть раньше конечной"
@@ -0,0 +1,64 @@
+import pytest
+from unittest.mock import patch
+from starlette.testclient import TestClient
+
+import mcp_weather_server
+from src.weather_mcp import server
+
+
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-06-18",
+        "capabilities": {},
+        "clientInfo": {"name": "test", "version": "1.0"}
+    }
+}
+HEADERS = {"Accept": "application/json, text/event-stream"}
+
+
+class TestHttpTransport:
+
+    def test_services_kept_running_for_app_lifetime(self):
+        app = server.create_http_app("/mcp")
+
+        assert server.services.started is False
+        with TestClient(app) as client:
+            assert server.services.started is True
+            response = client.post("/mcp/", json=INITIALIZE, headers=HEADERS)
+            assert response.status_code == 200
+            assert "weather-agent" in response.text
+            assert server.services.started is True
+        assert server.services.started is False
+
+    def test_cli_defaults_come_from_settings(self):
+        with patch.object(mcp_weather_server.settings, "mcp_transport", "http"), \
+                patch.object(mcp_weather_server.settings, "server_port", 9100):
+            args = mcp_weather_server.parse_args([])
+
+        assert (args.transport, args.port, args.path) == ("http", 9100, "/mcp")
+        assert mcp_weather_server.parse_args(["--transport", "stdio"]).transport == "stdio"
+
+    def test_http_mode_serves_app_with_uvicorn(self):
+        with patch("uvicorn.run") as run:
+            mcp_weather_server.main(["--transport", "http", "--host", "127.0.0.1", "--port", "9100"])
+
+        assert run.call_args.kwargs["host"] == "127.0.0.1"
+        assert run.call_args.kwargs["port"] == 9100
+
+    def test_workers_share_rate_limit_and_use_import_string(self):
+        with patch("uvicorn.run") as run, patch.dict("os.environ"):
+            mcp_weather_server.main(["--transport", "http", "--workers", "4"])
+
+        assert run.call_args.args == ("weather_mcp.asgi:app",)
+        assert run.call_args.kwargs["workers"] == 4
+
+    def test_nominatim_rate_split_between_workers(self):
+        from src.weather_mcp.tools.scheduler import RequestScheduler
+
+        with patch("src.weather_mcp.tools.scheduler.settings.server_workers", 4):
+            scheduler = RequestScheduler.from_settings()
+
+        assert scheduler.rate == pytest.approx(0.25)
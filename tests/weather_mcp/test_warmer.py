@@ -0,0 +1,146 @@
+import pytest
+from collections import Counter
+from unittest.mock import patch, AsyncMock, MagicMock
+
+from src.weather_mcp.cache.forecast import ForecastCache, FRESH
+from src.weather_mcp.tools.resilience import CircuitBreaker
+from src.weather_mcp.tools.weather import WeatherService
+from src.weather_mcp.warmer import CacheWarmer, WarmerLease, decay
+from tests.weather_mcp.test_forecast_cache import forecast_response
+
+
+def geo_service(cities: dict) -> MagicMock:
+    geo = MagicMock()
+    geo.demand = Counter()
+
+    async def get_coordinates(city, priority=None):
+        if city not in cities:
+            return {"success": False, "error": "не найден"}
+        lat, lon = cities[city]
+        return {"success": True, "data": {"lat": lat, "lon": lon}}
+
+    geo.get_coordinates = AsyncMock(side_effect=get_coordinates)
+    return geo
+
+
+def batch_response(points, *args, **kwargs):
+    return [forecast_response() for _ in points]
+
+
+class TestCacheWarmer:
+
+    @pytest.mark.asyncio
+    async def test_configured_and_popular_locations_refreshed(self):
+        weather = WeatherService(forecast_cache=ForecastCache(grid_step=0.05))
+        geo = geo_service({"москва": (55.7558, 37.6176), "Казань": (55.79, 49.12)})
+        warmer = CacheWarmer(geo, weather, cities=["Казань", "Атлантида"], request_interval=0)
+        geo.demand["москва"] = 10
+        weather.demand[(59.95, 30.3, 3, True, False)] = 4
+
+        with patch.object(weather, "_fetch_forecast_many", AsyncMock(side_effect=batch_response)) as fetch:
+            refreshed = await warmer.warm()
+
+        assert refreshed == 3
+        assert fetch.await_count == 2
+        city_cells, *options = fetch.await_args_list[0].args
+        assert city_cells == [(55.8, 49.1), (55.75, 37.6)]
+        assert options == [1, True, False]
+        assert fetch.await_args_list[1].args == ([(59.95, 30.3)], 3, True, False)
+
+        cache = weather.forecast_cache
+        assert cache.get(cache.key(55.7558, 37.6176, 1, True))[1] == FRESH
+        assert cache.get(cache.key(59.95, 30.3, 3, True))[1] == FRESH
+        # Спрос уполовинивается после прохода, запросы прогрева его не увеличивают
+        assert geo.demand["москва"] == 5
+        assert weather.demand[(59.95, 30.3, 3, True, False)] == 2
+
+    @pytest.mark.asyncio
+    async def test_stops_while_upstream_circuit_is_open(self):
+        weather = WeatherService(forecast_cache=ForecastCache())
+        weather.forecast_upstream.breaker = CircuitBreaker(failure_threshold=1)
+        weather.forecast_upstream.breaker.record_failure()
+        warmer = CacheWarmer(geo_service({"Казань": (55.79, 49.12)}), weather, cities=["Казань"])
+
+        with patch.object(weather, "_fetch_forecast_many", AsyncMock()) as fetch:
+            assert await warmer.warm() == 0
+
+        fetch.assert_not_awaited()
+
+    def test_runs_shortly_after_model_update(self):
+        weather = WeatherService(forecast_cache=ForecastCache(update_interval=3600))
+        warmer = CacheWarmer(MagicMock(), weather, delay=60)
+
+        assert warmer.next_run(7200 + 30) == 7200 + 60
+        assert warmer.next_run(7200 + 61) == 10800 + 60
+
+    @pytest.mark.asyncio
+    async def test_only_lease_holder_warms_shared_cache(self, tmp_path):
+        lock = tmp_path / "warmer.lock"
+        warmers = []
+        for _ in range(2):
+            weather = WeatherService(forecast_cache=ForecastCache())
+            warmers.append(CacheWarmer(
+                geo_service({"Казань": (55.79, 49.12)}), weather,
+                cities=["Казань"], request_interval=0, lease=WarmerLease(lock)
+            ))
+        first, second = warmers
+        second.weather.demand[(59.95, 30.3, 3, True, False)] = 4
+
+        with patch.object(WeatherService, "_fetch_forecast_many", AsyncMock(side_effect=batch_response)) as fetch:
+            assert await first.run_once() == 1
+            assert await second.run_once() == 0
+
+            assert fetch.await_count == 1
+            assert second.stats()["skipped"] == 1
+            assert second.weather.demand[(59.95, 30.3, 3, True, False)] == 2
+
+            # Право переходит к другому процессу, когда держатель остановился
+            await first.stop()
+            assert await second.run_once() == 2
+        assert second.lease.held
+        second.lease.release()
+
+    def test_decay(self):
+        counter = Counter({"a": 5, "b": 1})
+
+        decay(counter)
+
+        assert counter == Counter({"a": 2})
+
+
+class TestDemandTracking:
+
+    @pytest.mark.asyncio
+    async def test_interactive_requests_counted(self):
+        weather = WeatherService(forecast_cache=ForecastCache(grid_step=0.05))
+        CacheWarmer(geo_service({}), weather)
+
+        with patch.object(weather, "_fetch_forecast", AsyncMock(return_value=forecast_response())):
+            await weather.get_weather(55.7558, 37.6176, forecast_days=3)
+            await weather.get_weather(55.7601, 37.6101, forecast_days=3)
+
+        assert weather.demand == Counter({(55.75, 37.6, 3, True, False): 2})
+
+    @pytest.mark.asyncio
+    async def test_background_geocoding_not_counted(self):
+        from src.weather_mcp.tools.geo import GeocodingService
+        from src.weather_mcp.tools.scheduler import BACKGROUND
+
+        geo = GeocodingService()
+        CacheWarmer(geo, WeatherService(forecast_cache=ForecastCache()))
+        response = [{"lat": "55.75", "lon": "37.61", "display_name": "Москва"}]
+
+        with patch("src.weather_mcp.tools.geo.fetch_json", AsyncMock(return_value=response)):
+            await geo.get_coordinates("  Москва ")
+            await geo.get_coordinates("Москва", priority=BACKGROUND)
+
+        assert geo.demand == Counter({"москва": 1})
+
+    @pytest.mark.asyncio
+    async def test_not_counted_without_warmer(self):
+        weather = WeatherService(forecast_cache=ForecastCache())
+
+        with patch.object(weather, "_fetch_forecast", AsyncMock(return_value=forecast_response())):
+            await weather.get_weather(55.7558, 37.6176)
+
+        assert weather.demand is None
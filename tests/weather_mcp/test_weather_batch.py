@@ -0,0 +1,119 @@
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+
+from src.weather_mcp.cache.forecast import ForecastCache
+from src.weather_mcp.tools.weather import WeatherService
+
+
+def location_response(lat: float, lon: float) -> dict:
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "timezone": "GMT",
+        "current_weather": {"temperature": lat, "windspeed": 1.0, "weathercode": 0, "time": "2024-01-01T12:00"},
+        "daily": {
+            "time": ["2024-01-01"],
+            "temperature_2m_max": [lat + 1],
+            "temperature_2m_min": [lat - 1],
+            "precipitation_sum": [0.0],
+            "weather_code": [0],
+            "wind_speed_10m_max": [5.0]
+        }
+    }
+
+
+def batch_get(url, params=None, **kwargs):
+    lats = [float(v) for v in str(params["latitude"]).split(",")]
+    lons = [float(v) for v in str(params["longitude"]).split(",")]
+    payload = [location_response(lat, lon) for lat, lon in zip(lats, lons)]
+    response = MagicMock()
+    response.json.return_value = payload if len(payload) > 1 else payload[0]
+    return response
+
+
+class TestGetWeatherMany:
+
+    @pytest.mark.asyncio
+    async def test_points_are_packed_into_batches(self):
+        service = WeatherService()
+        service.batch_size = 2
+        points = [(10.0, 1.0), (20.0, 2.0), (30.0, 3.0)]
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_instance = mock_client.return_value.__aenter__.return_value
+            mock_instance.get.side_effect = batch_get
+
+            result = await service.get_weather_many(points)
+
+            assert mock_instance.get.call_count == 2
+            first_params = mock_instance.get.call_args_list[0].kwargs["params"]
+            assert first_params["latitude"] == "10.0,20.0"
+
+        assert result["success"] is True
+        temperatures = [point["data"]["current"]["temperature"] for point in result["data"]]
+        assert temperatures == [10.0, 20.0, 30.0]
+
+    @pytest.mark.asyncio
+    async def test_duplicate_points_fetched_once(self):
+        service = WeatherService()
+
+        with patch.object(service, "_fetch_forecast_many", AsyncMock(
+            return_value=[location_response(10.0, 1.0)]
+        )) as fetch:
+            result = await service.get_weather_many([(10.0, 1.0), (10.0, 1.0)])
+
+        fetch.assert_awaited_once()
+        assert result["data"][0] == result["data"][1]
+
+    @pytest.mark.asyncio
+    async def test_cached_points_are_not_refetched(self):
+        service = WeatherService(forecast_cache=ForecastCache(grid_step=0.05))
+
+        with patch.object(service, "_fetch_forecast", AsyncMock(return_value=location_response(55.75, 37.6))):
+            await service.get_weather(55.7558, 37.6176)
+
+        with patch.object(service, "_fetch_forecast_many", AsyncMock(
+            return_value=[location_response(59.95, 30.3)]
+        )) as fetch:
+            result = await service.get_weather_many([(55.7558, 37.6176), (59.9386, 30.3141)])
+
+        fetch.assert_awaited_once_with([(59.95, 30.3)], 1, True)
+        assert result["data"][0]["data"]["current"]["temperature"] == 55.75
+        assert result["data"][1]["data"]["current"]["temperature"] == 59.95
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_marks_only_its_points(self):
+        service = WeatherService()
+        service.batch_size = 1
+
+        async def fetch(points, *args):
+            if points[0][0] == 20.0:
+                raise Exception("boom")
+            return [location_response(*points[0])]
+
+        with patch.object(service, "_fetch_forecast_many", AsyncMock(side_effect=fetch)):
+            result = await service.get_weather_many([(10.0, 1.0), (20.0, 2.0)])
+
+        assert result["data"][0]["success"] is True
+        assert result["data"][1]["success"] is False
+        assert "boom" in result["data"][1]["error"]
+
+
+@pytest.mark.asyncio
+async def test_get_weather_batch_tool():
+    from src.weather_mcp import server
+    from src.weather_mcp.schemas import Coordinates
+
+    batch = {
+        "success": True,
+        "data": [
+            {"success": True, "data": WeatherService()._format_weather_data(location_response(10.0, 1.0))},
+            {"success": False, "error": "Ошибка прогноза погоды: boom"}
+        ]
+    }
+    with patch.object(server.services.weather, "get_weather_many", AsyncMock(return_value=batch)):
+        text = await server.get_weather_batch.fn([Coordinates(lat=10.0, lon=1.0), Coordinates(lat=20.0, lon=2.0)])
+
+    assert "📍 10.0, 1.0" in text
+    assert "🌡️ Сейчас: 10.0°C" in text
+    assert "boom" in text